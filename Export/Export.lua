@@ -1,5 +1,5 @@
 -- === DCS -> Python Telemetry Export (UDP) ===
--- 坐标系: 世界坐标 (米) 轴向 x=东, y=海拔, z=北；机体坐标: LoGetVectorVelocity/AngularVelocity 返回机体系
+-- 坐标系: 世界坐标 (米) 轴向 x=北, y=海拔, z=东（与 kinematics.py 一致）；LoGetVectorVelocity 返回世界系速度，LoGetAngularVelocity 返回机体系角速度
 package.path   = package.path .. ";" .. lfs.currentdir() .. "/LuaSocket/?.lua"
 package.cpath  = package.cpath .. ";" .. lfs.currentdir() .. "/LuaSocket/?.dll"
 local socket   = require("socket")
@@ -7,7 +7,10 @@ local socket   = require("socket")
 -- 配置
 local HOST     = "127.0.0.1"
 local PORT     = 28777
-local INTERVAL = 0.02 -- 50 Hz
+local INTERVAL = 0.02 -- 50 Hz；可设 0.01（100 Hz）或 0.005（200 Hz），实际上限为 DCS 帧率
+                      -- 修改后同步设置 config.json 的 EXPORT_RATE = 1 / INTERVAL；CONTROL_RATE 高于它时
+                      -- 遥测驱动调度会自动改为定时调度（帧间用预测状态，见 README 的 EXPORT_RATE）
+local FORMAT   = "json" -- "json" 或 "binary"（固定布局二进制帧，Python 端自动识别）
 
 -- UDP
 local udp      = socket.udp()
@@ -16,6 +19,7 @@ udp:setpeername(HOST, PORT)
 
 -- 定时
 local next_time = 0.0
+local seq       = 0
 
 -- 数值安全
 local function safe_json_number(x)
@@ -25,9 +29,114 @@ local function safe_json_number(x)
     return x
 end
 
--- 采样并构造一行 JSON（末尾带换行）
+-- 二进制帧布局（小端，与 telemetry_protocol.py 保持一致）：
+--   "DHAT" version(u8) flags(u8) field_count(u16) seq(u32) model_time(f64)
+--   12 x f32（速度/加速度/姿态/角速度） + 3 x f64（位置）
+local FRAME_MAGIC   = "DHAT"
+local FRAME_VERSION = 1
+local FIELD_COUNT   = 15
+
+local function pack_uint(n, bytes)
+    local out = {}
+    for i = 1, bytes do
+        local b = n % 256
+        out[i] = string.char(b)
+        n = (n - b) / 256
+    end
+    return table.concat(out)
+end
+
+-- Lua 5.1 没有 string.pack，按 IEEE 754 手工编码（低位在前）
+local function pack_ieee(x, ebits, mbits)
+    local bias = 2 ^ (ebits - 1) - 1
+    local emax = 2 ^ ebits - 1
+    local sign, e, m = 0, 0, 0
+    x = safe_json_number(x)
+    if x < 0 then
+        sign = 1
+        x = -x
+    end
+    if x == math.huge then
+        e = emax
+    elseif x > 0 then
+        local fr, ex = math.frexp(x) -- x = fr * 2^ex, 0.5 <= fr < 1
+        e = ex + bias - 1
+        if e <= 0 then
+            -- 非规格化数
+            m = math.floor(x / 2 ^ (1 - bias - mbits) + 0.5)
+            e = 0
+        elseif e >= emax then
+            e = emax
+        else
+            m = math.floor((fr * 2 - 1) * 2 ^ mbits + 0.5)
+            if m == 2 ^ mbits then
+                m = 0
+                e = e + 1
+            end
+        end
+    end
+
+    local out, acc, nacc = {}, 0, 0
+    local parts = { { m, mbits }, { e, ebits }, { sign, 1 } }
+    for _, p in ipairs(parts) do
+        local v, n = p[1], p[2]
+        while n > 0 do
+            local take = math.min(8 - nacc, n)
+            local chunk = v % 2 ^ take
+            acc = acc + chunk * 2 ^ nacc
+            nacc = nacc + take
+            v = (v - chunk) / 2 ^ take
+            n = n - take
+            if nacc == 8 then
+                out[#out + 1] = string.char(acc)
+                acc, nacc = 0, 0
+            end
+        end
+    end
+    return table.concat(out)
+end
+
+local function pack_f32(x) return pack_ieee(x, 8, 23) end
+local function pack_f64(x) return pack_ieee(x, 11, 52) end
+
+local function encode_binary(t, s)
+    local parts = {
+        FRAME_MAGIC,
+        string.char(FRAME_VERSION, 0),
+        pack_uint(FIELD_COUNT, 2),
+        pack_uint(seq % 4294967296, 4),
+        pack_f64(t),
+    }
+    for i = 1, 12 do
+        parts[#parts + 1] = pack_f32(s[i])
+    end
+    for i = 13, 15 do
+        parts[#parts + 1] = pack_f64(s[i])
+    end
+    return table.concat(parts)
+end
+
+local function encode_json(t, s)
+    -- 拼 JSON 行（带换行）；Seq/ModelTime 供接收端检测丢包、乱序与过期
+    return string.format(
+        '{"Seq":%.0f,"ModelTime":%.4f,' ..
+        '"Vx":%.6f,"Vy":%.6f,"Vz":%.6f,' ..
+        '"Ax":%.6f,"Ay":%.6f,"Az":%.6f,' ..
+        '"Pitch":%.4f,"Roll":%.4f,"Yaw":%.4f,' ..
+        '"PitchRate":%.4f,"RollRate":%.4f,"YawRate":%.4f,' ..
+        '"PosX":%.3f,"PosY":%.3f,"PosZ":%.3f}\n',
+        seq % 4294967296, t,
+        safe_json_number(s[1]), safe_json_number(s[2]), safe_json_number(s[3]),
+        safe_json_number(s[4]), safe_json_number(s[5]), safe_json_number(s[6]),
+        safe_json_number(s[7]), safe_json_number(s[8]), safe_json_number(s[9]),
+        safe_json_number(s[10]), safe_json_number(s[11]), safe_json_number(s[12]),
+        safe_json_number(s[13]), safe_json_number(s[14]), safe_json_number(s[15])
+    )
+end
+
+-- 采样，按 telemetry_protocol.FIELDS 的顺序返回数组
 local function get_state()
-    local vel                          = LoGetVectorVelocity()    -- m/s, 机体坐标
+    local vel                          = LoGetVectorVelocity()    -- m/s, 世界坐标
     local accG                         = LoGetAccelerationUnits() -- G,   机体坐标
     local Pitch, Roll, Yaw             = LoGetADIPitchBankYaw()   -- rad
     local angRate                      = LoGetAngularVelocity()   -- rad/s, 机体坐标
@@ -51,24 +160,17 @@ local function get_state()
     end
 
     if sd and sd.Position then
-        -- DCS: Position: x=东, y=海拔, z=北
+        -- DCS: Position: x=北, y=海拔, z=东
         PosX, PosY, PosZ = sd.Position.x, sd.Position.y, sd.Position.z
     end
 
-    -- 拼 JSON 行（带换行）
-    local payload = string.format(
-        '{"Vx":%.6f,"Vy":%.6f,"Vz":%.6f,' ..
-        '"Ax":%.6f,"Ay":%.6f,"Az":%.6f,' ..
-        '"Pitch":%.4f,"Roll":%.4f,"Yaw":%.4f,' ..
-        '"PitchRate":%.4f,"RollRate":%.4f,"YawRate":%.4f,' ..
-        '"PosX":%.3f,"PosY":%.3f,"PosZ":%.3f}\n',
-        safe_json_number(Vx), safe_json_number(Vy), safe_json_number(Vz),
-        safe_json_number(Ax), safe_json_number(Ay), safe_json_number(Az),
-        safe_json_number(Pitch), safe_json_number(Roll), safe_json_number(Yaw),
-        safe_json_number(PitchRate), safe_json_number(RollRate), safe_json_number(YawRate),
-        safe_json_number(PosX), safe_json_number(PosY), safe_json_number(PosZ)
-    )
-    return payload
+    return {
+        Vx, Vy, Vz,
+        Ax, Ay, Az,
+        Pitch, Roll, Yaw,
+        PitchRate, RollRate, YawRate,
+        PosX, PosY, PosZ,
+    }
 end
 
 -- 备份原事件（如有）
@@ -83,8 +185,19 @@ end
 function LuaExportAfterNextFrame()
     local t = LoGetModelTime()
     if t and t >= next_time then
-        next_time = t + INTERVAL
-        local payload = get_state()
+        -- 按固定节拍推进（t + INTERVAL 会向帧边界累积，60 fps 下 50 Hz 只剩 30 Hz）；落后超过一拍（暂停）时重新对齐
+        next_time = next_time + INTERVAL
+        if next_time <= t then
+            next_time = t + INTERVAL
+        end
+        local s = get_state()
+        local payload
+        if FORMAT == "binary" then
+            payload = encode_binary(t, s)
+        else
+            payload = encode_json(t, s)
+        end
+        seq = seq + 1
         udp:send(payload)
     end
     if _LuaExportAfterNextFrame then _LuaExportAfterNextFrame() end
@@ -0,0 +1,257 @@
+from time import perf_counter_ns
+
+from motion_state import MotionState
+from telemetry_snapshot import TelemetrySnapshot
+from cyclic_helper import CyclicHelper
+from rudder_helper import RudderHelper
+from input_processor import InputProcessor
+from profiles import parse_profile
+
+
+LOOP_DT = 0.02  # 主循环周期（秒）
+
+# 遥测过期策略：freeze = 停止推进运动状态与 PID（输出保持，积分不再累加）；
+# release = 辅助让出，输出直接跟随飞行员输入，遥测恢复后辅助重新接管（PID 复位）
+STALE_POLICIES = ("freeze", "release")
+
+
+class AssistCore:
+    """
+    控制核心：模式状态 + 输入处理 + 运动状态 + 周期杆/方向舵辅助。
+    不依赖 vJoy/键盘/声音，供 HelicopterAssist、离线回放与测试共用。
+    """
+
+    def __init__(self, profile: dict = None):
+        # 模式/开关
+        self.cyclic_mode = 0
+        self.cyclic_enabled = False
+        self.cyclic_hovering = False
+        self.rudder_enabled = False
+
+        # 阻塞状态（例如键盘按下时暂停输出）
+        self.input_blocked = False
+        self.helper_blocked = False
+
+        # 整定档案（见 profiles.py；None 时全部取默认值）
+        profile = parse_profile(profile)
+
+        # 控制辅助
+        self.cyclic_helper = CyclicHelper(profile["cyclic"], params=profile["cyclic_params"])
+        self.rudder_helper = RudderHelper(profile["rudder"])
+        self.motion_state = MotionState()
+
+        # 遥测快照（预分配，每拍由 DcsTelemetry.read_into 原地刷新）
+        self.snapshot = TelemetrySnapshot()
+
+        # 手动原始输入：设置 manual_source（input_backends.AxisMailbox）时每拍从中取样，
+        # 否则由外部直接写（回放/仿真）
+        self.manual_cyclic_x = 0.0
+        self.manual_cyclic_y = 0.0
+        self.manual_rudder = 0.0
+        self.manual_collective = 0.0  # 预留：总距轴（可绑定，暂不参与控制）
+        self.manual_source = None
+
+        # 最近一次输出（帧驱动兜底步沿用）
+        self.cyclic_x = 0.0
+        self.cyclic_y = 0.0
+        self.rudder = 0.0
+
+        # 新增：统一输入处理器（限速 + 曲线整形）
+        self.inputs = InputProcessor(**profile["input"])
+
+        # 档案热加载（ProfileWatcher，可选）：每拍开始时应用新档案
+        self.profiles = None
+
+        # 阶段耗时统计（instrumentation.LoopInstruments，可选）
+        self.instruments = None
+
+        # 遥测过期：step 传入 now 时，最新帧的 RecvTime 早于 now - stale_timeout 即视为过期
+        # （DCS 暂停时 Export.lua 不发帧，断线、丢包同理）；stale_timeout <= 0 关闭
+        self.stale_timeout = 0.2
+        self.stale_policy = "freeze"
+        self.stale = False
+        self.stale_events = 0
+        self.stale_steps = 0
+
+        # 帧间预测：step 传入 now 时，未收到新帧的控制步把运动状态外推到 now 再运行辅助，
+        # 帧龄超过 predict_max 后保持上一输出（同不预测时）；<= 0 关闭。predicted_steps 为外推步数
+        self.predict_max = 0.0
+        self.predicted_steps = 0
+
+    def compute_outputs(self, snapshot: TelemetrySnapshot, new_frame: bool = True, dt: float = None, now: float = None):
+        # 读取最新快照（字段顺序见 telemetry_snapshot.SNAPSHOT_FIELDS）
+        (
+            _seq, model_time, recv_time,
+            vx, vy, vz,
+            ax, ay, az,
+            pitch, roll, yaw,
+            pitch_rate, roll_rate, yaw_rate,
+            pos_x, pos_y, pos_z,
+        ) = snapshot.values
+
+        # 分阶段计时只在挂载 instruments 且本拍被抽中时进行（由控制任务调用 next_tick，见 instrumentation.STAGE_SAMPLE）
+        instruments = self.instruments
+        timed = instruments is not None and instruments.sampled
+
+        # 更新运动状态（同一帧不重复更新）；帧间隔优先取模型时间，dt 为墙钟兜底
+        if timed:
+            t0 = perf_counter_ns()
+        if new_frame:
+            self.motion_state.update(
+                vx, vy, vz,
+                pitch, roll, yaw,
+                ax, ay, az,
+                pitch_rate, roll_rate, yaw_rate,
+                pos_x, pos_y, pos_z,
+                dt=dt, model_time=model_time,
+            )
+        # 预测：外推到本拍时刻，新帧也补上接收后的帧龄；辅助按本拍间隔推进
+        if self.predict_max > 0.0 and now is not None and not self.stale:
+            horizon = now - recv_time
+            if new_frame or horizon <= self.predict_max:
+                self.motion_state.predict(horizon, dt)
+                if not new_frame:
+                    self.predicted_steps += 1
+                    new_frame = True
+
+        if timed:
+            t1 = perf_counter_ns()
+
+        if self.input_blocked:
+            self.inputs.set_manual(0.0, 0.0, 0.0)
+
+        # 辅助让出：按键暂停，或遥测过期且策略为 release
+        assist_off = self.helper_blocked or (self.stale and self.stale_policy == "release")
+
+        # RUDDER 控制（使用处理后的手动输入）
+        if self.rudder_enabled and not assist_off:
+            if new_frame:
+                rudder = self.rudder_helper.update(self.motion_state, self.inputs.input_rudder)
+            else:
+                rudder = self.rudder
+        else:
+            rudder = self.inputs.input_rudder
+        if timed:
+            t2 = perf_counter_ns()
+
+        # CYCLIC 控制（使用处理后的手动输入）
+        if self.cyclic_enabled and not assist_off:
+            if self.cyclic_hovering and (abs(self.inputs.manual_cyclic_x) >= 0.02 or abs(self.inputs.manual_cyclic_y) >= 0.02):
+                self.cyclic_hovering = False
+                self.cyclic_mode = 1
+            if new_frame:
+                cyclic_x, cyclic_y = self.cyclic_helper.update(
+                    self.motion_state,
+                    self.inputs.input_cyclic_x,
+                    self.inputs.input_cyclic_y,
+                    self.cyclic_hovering,
+                )
+            else:
+                cyclic_x, cyclic_y = self.cyclic_x, self.cyclic_y
+        else:
+            cyclic_x = self.inputs.input_cyclic_x
+            cyclic_y = self.inputs.input_cyclic_y
+        if timed:
+            t3 = perf_counter_ns()
+            instruments.motion.record(t1 - t0)
+            instruments.rudder.record(t2 - t1)
+            instruments.cyclic.record(t3 - t2)
+
+        return cyclic_x, cyclic_y, rudder
+
+    def step(self, snapshot: TelemetrySnapshot, new_frame: bool = True, dt: float = LOOP_DT, now: float = None):
+        """
+        执行一个控制步：处理手动输入并计算输出（不写设备）。
+        now：本拍的 perf_counter 时刻，用于判断遥测过期与帧间预测；None 时不判断（回放/仿真）。
+        """
+        if now is not None and self.update_stale(snapshot, now):
+            self.stale_steps += 1
+            new_frame = False
+
+        if self.profiles is not None:
+            profile = self.profiles.take()
+            if profile is not None:
+                self.apply_profile(profile)
+
+        instruments = self.instruments
+        timed = instruments is not None and instruments.sampled
+
+        # 将外部写入的原始手动输入交给处理器，并更新（阻塞期间保持上一次取样）
+        if timed:
+            t0 = perf_counter_ns()
+        if self.manual_source is not None and not self.input_blocked and not self.helper_blocked:
+            (
+                self.manual_cyclic_x, self.manual_cyclic_y, self.manual_rudder, self.manual_collective,
+            ) = self.manual_source.sample()
+        self.inputs.set_manual(self.manual_cyclic_x, self.manual_cyclic_y, self.manual_rudder)
+        self.inputs.update(dt)
+        if timed:
+            instruments.inputs.record(perf_counter_ns() - t0)
+
+        cyclic_x, cyclic_y, rudder = self.compute_outputs(snapshot, new_frame, dt, now)
+
+        self.cyclic_x = cyclic_x
+        self.cyclic_y = cyclic_y
+        self.rudder = rudder
+        return cyclic_x, cyclic_y, rudder
+
+    def update_stale(self, snapshot: TelemetrySnapshot, now: float) -> bool:
+        """按最新帧的接收时刻更新过期状态并返回；恢复时按策略处理。尚未收到任何帧时不判断"""
+        stale = (
+            self.stale_timeout > 0.0
+            and snapshot.generation != 0
+            and now - snapshot.recv_time > self.stale_timeout
+        )
+        if stale != self.stale:
+            self.stale = stale
+            if stale:
+                self.stale_events += 1
+            elif self.stale_policy == "release":
+                # 让出期间由飞行员操纵，恢复时从当前状态重新接管
+                self.rudder_helper.reset()
+                self.cyclic_helper.reset()
+        return stale
+
+    def set_stale_policy(self, policy: str, timeout: float):
+        if policy not in STALE_POLICIES:
+            raise ValueError(f"unknown stale policy: {policy}")
+        self.stale_policy = policy
+        self.stale_timeout = timeout
+
+    def apply_profile(self, profile: dict):
+        """在两拍之间原地应用已校验的完整档案（profiles.parse_profile 的结果）"""
+        self.cyclic_helper.set_gains(profile["cyclic"])
+        self.cyclic_helper.set_params(profile["cyclic_params"])
+        self.rudder_helper.set_gains(profile["rudder"])
+        self.inputs.configure(**profile["input"])
+
+    def set_cyclic_mode(self, mode: int):
+        """0=OFF，1=ON（手动/自动），2=HOVERING"""
+        self.cyclic_mode = mode % 3
+        if self.cyclic_mode == 0:
+            self.cyclic_enabled = False
+            self.cyclic_hovering = False
+            self.cyclic_helper.reset()
+        elif self.cyclic_mode == 1:
+            self.cyclic_enabled = True
+            self.cyclic_hovering = False
+        elif self.cyclic_mode == 2:
+            self.cyclic_enabled = True
+            self.cyclic_hovering = True
+
+    def set_rudder_enabled(self, enabled: bool):
+        self.rudder_enabled = enabled
+        self.rudder_helper.reset()
+
+    def debug_print(self) -> str:
+        parts = []
+        if self.rudder_helper.target_yaw is not None:
+            parts.append(f"TargetYaw={self.rudder_helper.target_yaw:+.2f}")
+        if self.cyclic_helper.target_pitch is not None:
+            parts.append(f"TargetPitch={self.cyclic_helper.target_pitch:+.2f}")
+        # if self.cyclic_x is not None and self.cyclic_y is not None:
+        #     parts.append(f"CyclicX={self.cyclic_x:+.2f} CyclicY={self.cyclic_y:+.2f}")
+        # if self.rudder is not None:
+        #     parts.append(f"Rudder={self.rudder:+.2f}")
+        
+        return " ".join(parts)
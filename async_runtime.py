@@ -0,0 +1,374 @@
+"""
+asyncio 运行时：一个事件循环承载辅助的全部并发部分，均以任务运行：
+  telemetry   UDP 遥测（TelemetryProtocol）：socket 注册到事件循环，每次可读时取空排队数据报、只解析最新帧，
+              新帧直接唤醒控制任务
+  control     控制步（ControlScheduler.next_step_async，截止时间与抖动/丢帧统计同线程版本）
+  inputs      物理摇杆（AsyncJoystickSource）：evdev 设备注册到事件循环，其余设备沿用读取线程
+  commands    热键等外部线程通过 post() 投递的命令，在事件循环中依次执行（状态只在本线程修改）
+  diagnostics 诊断环形缓冲定期交给执行器线程输出
+  profiles    整定档案定期在执行器线程轮询
+  lag         事件循环延迟：唯一测量点，计入 instruments.lag
+stop() 后统一取消任务并释放 socket、输入设备、诊断、记录器与输出后端。
+多个 AssistRuntime 可在同一进程/事件循环中并存（各自的端口、核心与输出），便于测试与嵌入其他异步工具。
+飞行记录器仍使用自己的写盘线程（文件 I/O 不进事件循环）。
+"""
+import asyncio
+import socket
+import time
+from time import perf_counter_ns
+
+from assist_core import LOOP_DT
+from control_scheduler import ControlScheduler
+from dcs_telemetry import DatagramPool, TelemetryDecoder, open_socket
+from instrumentation import LoopInstruments
+
+
+def _expire(waiter):
+    if not waiter.done():
+        waiter.set_result(False)
+
+
+class TelemetryProtocol(TelemetryDecoder, asyncio.DatagramProtocol):
+    """
+    事件循环中接收遥测：start_reading 把 socket 注册到事件循环，可读时打点并取空排队的数据报，
+    交给 handle_batch 解析发布，并唤醒等待新帧的控制任务。
+    不支持 add_reader 的事件循环（Windows Proactor）退回 DatagramProtocol，逐包 datagram_received。
+    只支持一个等待者（控制任务）。
+    """
+
+    def __init__(self):
+        TelemetryDecoder.__init__(self)
+        self.transport = None
+        self._waiter = None
+        self._loop = None
+        self._sock = None
+        self._pool = None
+
+    def start_reading(self, loop, sock):
+        """sock：非阻塞 UDP socket（dcs_telemetry.open_socket）；事件循环不支持时抛 NotImplementedError"""
+        loop.add_reader(sock.fileno(), self._on_readable)
+        self._loop = loop
+        self._sock = sock
+        self._pool = DatagramPool()
+
+    def stop_reading(self):
+        if self._sock is None:
+            return
+        self._loop.remove_reader(self._sock.fileno())
+        self._sock.close()
+        self._sock = None
+
+    def _on_readable(self):
+        t0 = perf_counter_ns()
+        try:
+            packets = self._pool.drain(self._sock)
+        except OSError as e:
+            # Windows 上对端端口不可达（ICMP）会使 recv 报错，继续接收
+            self.last_error = f"{type(e).__name__}: {e}"
+            return
+        if packets:
+            self.handle_batch(packets, t0)
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.handle_packet(data, perf_counter_ns())
+
+    def error_received(self, exc):
+        # Windows 上对端端口不可达等 ICMP 错误，不影响接收
+        pass
+
+    def _publish(self):
+        self.buffer.publish()
+        waiter = self._waiter
+        if waiter is not None and not waiter.done():
+            waiter.set_result(True)
+
+    async def wait_for_frame_async(self, generation: int, timeout: float) -> bool:
+        """等待 generation 之后的新帧发布，超时返回 False"""
+        if self.buffer.generation != generation:
+            return True
+        loop = asyncio.get_running_loop()
+        waiter = self._waiter = loop.create_future()
+        handle = loop.call_later(timeout, _expire, waiter)
+        try:
+            return await waiter
+        finally:
+            handle.cancel()
+            self._waiter = None
+
+
+class _FdReader:
+    """注册在事件循环上的设备读取器（设备需提供 fileno / read_nowait）"""
+
+    def __init__(self, monitor, loop, dev, codes):
+        self.monitor = monitor
+        self.loop = loop
+        self.dev = dev
+        self.codes = codes
+        self.owned = set()
+        self.started = time.monotonic()
+        self.fd = dev.fileno()
+        loop.add_reader(self.fd, self._on_readable)
+
+    def _on_readable(self):
+        try:
+            events = self.dev.read_nowait()
+        except OSError as e:
+            print(f"[WARN] 摇杆断开: {self.dev.name} ({e})")
+            self.close(failed=True)
+            return
+        if events:
+            self.monitor.dispatch(self.codes, events, self.owned)
+
+    def close(self, failed=False):
+        if self.fd is None:
+            return
+        self.loop.remove_reader(self.fd)
+        self.fd = None
+        self.monitor.release(self.dev, self.owned, failed, self.started)
+
+
+class AsyncJoystickSource:
+    """
+    摇杆输入的异步版本：复用 JoystickMonitor 的绑定、mailbox、退避与统计（不启动其线程）。
+    设备枚举在执行器线程中进行；支持 fileno 的设备由事件循环回调读取，
+    阻塞式 API 的设备（inputs、Fake）仍各用一个读取线程。
+    """
+
+    def __init__(self, monitor):
+        self.monitor = monitor
+        self._loop = None
+
+    async def run(self):
+        monitor = self.monitor
+        if monitor.backend is None:
+            print("[WARN] 摇杆输入后端不可用，摇杆监控不可用")
+            return
+        self._loop = loop = asyncio.get_running_loop()
+        interval = monitor.rescan_min
+        while True:
+            devices = await loop.run_in_executor(None, monitor.scan_devices)
+            interval = monitor.rescan(devices, interval, self._start)
+            await asyncio.sleep(interval)
+
+    def _start(self, dev, codes):
+        if hasattr(dev, "fileno"):
+            return _FdReader(self.monitor, self._loop, dev, codes)
+        return self.monitor._start_thread(dev, codes)
+
+    def close(self):
+        self.monitor.stop()
+        for reader in list(self.monitor.readers.values()):
+            if isinstance(reader, _FdReader):
+                reader.close()
+
+
+class AssistRuntime:
+    """
+    core：AssistCore（或 HelicopterAssist）；output：output_backends.OutputBackend。
+    host/port：遥测监听地址，port=0 时由系统分配（实际地址见 start 后的 address）；
+    rcvbuf：遥测 socket 的 SO_RCVBUF（字节，0 为系统默认；实际值见 start 后的 rcvbuf）。
+    joystick（JoystickMonitor，不启动）、diagnostics（DiagnosticsChannel，不启动）、
+    recorder（FlightRecorder，由本运行时启动）、profiles（ProfileWatcher）均可选；
+    diagnostics 的 ConsoleSink 需要 instruments 时，可在构造后再赋值 runtime.diagnostics。
+    """
+
+    def __init__(
+        self, core, output, host="127.0.0.1", port=0, period=LOOP_DT, mode="telemetry",
+        joystick=None, diagnostics=None, recorder=None, profiles=None, lag_interval=0.05, rcvbuf=0,
+    ):
+        self.core = core
+        self.output = output
+        self.host = host
+        self.port = port
+        self.rcvbuf = rcvbuf
+        self.lag_interval = lag_interval
+
+        self.telemetry = TelemetryProtocol()
+        self.scheduler = ControlScheduler(self.telemetry, period=period, mode=mode)
+        self.instruments = core.instruments = LoopInstruments(self.telemetry.parse_hist, output)
+        self.joystick = AsyncJoystickSource(joystick) if joystick is not None else None
+        self.diagnostics = diagnostics
+        self.recorder = recorder
+        self.profiles = profiles
+
+        self.transport = None
+        self.address = None
+        self.error = None
+        self._loop = None
+        self._stop_event = None
+        self._commands = None
+        self._tasks = []
+
+    # -------------------------------
+    # 生命周期
+    # -------------------------------
+    async def run(self):
+        """启动并运行到 stop() 或被取消；任务异常时停止并在释放资源后重新抛出"""
+        await self.start()
+        try:
+            await self._stop_event.wait()
+        finally:
+            await self.shutdown()
+        if self.error is not None:
+            raise self.error
+
+    async def start(self):
+        loop = self._loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        self._commands = asyncio.Queue()
+        sock = open_socket(self.host, self.port, self.rcvbuf)
+        self.address = sock.getsockname()
+        self.rcvbuf = sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+        try:
+            self.telemetry.start_reading(loop, sock)
+        except NotImplementedError:
+            self.transport, _ = await loop.create_datagram_endpoint(lambda: self.telemetry, sock=sock)
+        print(f"[INFO] Telemetry: {self.address[0]}:{self.address[1]} (SO_RCVBUF {self.rcvbuf} bytes)")
+        if self.recorder is not None:
+            self.recorder.start()
+
+        self._spawn(self._control(), "control")
+        self._spawn(self._run_commands(), "commands")
+        self._spawn(self._measure_lag(), "lag")
+        if self.joystick is not None:
+            self._spawn(self.joystick.run(), "inputs")
+        if self.diagnostics is not None:
+            self._spawn(self._drain_diagnostics(), "diagnostics")
+        if self.profiles is not None:
+            self._spawn(self._poll_profiles(), "profiles")
+
+    def stop(self):
+        """请求停止（任意线程可调用）"""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._stop_event.set)
+
+    def stats(self) -> dict:
+        """遥测接收统计（序号丢失/重复/乱序、格式错误）与过期状态，可从任意线程读取"""
+        core = self.core
+        return {
+            "telemetry": self.telemetry.stats(),
+            "stale": core.stale,
+            "stale_events": core.stale_events,
+            "stale_steps": core.stale_steps,
+        }
+
+    def post(self, fn, *args):
+        """从其他线程（热键回调等）投递命令，在事件循环中执行；未运行时丢弃"""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._commands.put_nowait, (fn, args))
+
+    async def shutdown(self):
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        loop = self._loop
+        if self.joystick is not None:
+            self.joystick.close()
+        self.telemetry.stop_reading()
+        if self.transport is not None:
+            self.transport.close()
+            self.transport = None
+        # 最后一批诊断样本与记录器收尾涉及文件/网络 I/O，放到执行器线程
+        if self.diagnostics is not None:
+            await loop.run_in_executor(None, self.diagnostics.close)
+        if self.recorder is not None:
+            await loop.run_in_executor(None, self.recorder.close)
+        self.output.close()
+
+    def _spawn(self, coro, name):
+        task = asyncio.create_task(self._guard(coro, name), name=name)
+        self._tasks.append(task)
+
+    async def _guard(self, coro, name):
+        try:
+            await coro
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[ERROR] runtime task '{name}' failed: {e!r}")
+            self.error = e
+            self._stop_event.set()
+
+    # -------------------------------
+    # 任务
+    # -------------------------------
+    async def _control(self):
+        core = self.core
+        snapshot = core.snapshot
+        scheduler = self.scheduler
+        output = self.output
+        ins = self.instruments
+        # 定时模式下未收到新帧也按同一帧重新计算；开启预测时改由外推推进
+        rerun = scheduler.mode == "timer" and core.predict_max <= 0.0
+        last_time = time.perf_counter()
+
+        while True:
+            now, is_new = await scheduler.next_step_async(snapshot)
+            # 抽样计时：本拍未抽中时 core.step 与下面均不取时间戳（见 instrumentation.STAGE_SAMPLE）
+            sampled = ins.next_tick()
+            if sampled:
+                t0 = perf_counter_ns()
+            dt = now - last_time
+            last_time = now
+
+            # 帧驱动模式下，未收到新帧的兜底步不重复推进 PID（预测开启时按外推状态推进）
+            cyclic_x, cyclic_y, rudder = core.step(snapshot, is_new or rerun, dt, now)
+
+            if sampled:
+                t1 = perf_counter_ns()
+            if not core.helper_blocked:
+                output.write(cyclic_x, cyclic_y, rudder, now)
+            if sampled:
+                t2 = perf_counter_ns()
+
+            if self.recorder is not None:
+                self.recorder.record(core, now, dt)
+            if self.diagnostics is not None:
+                self.diagnostics.push(core, scheduler, now)
+
+            # read：scheduler 唤醒后复制快照；age：输出时所用遥测帧的帧龄
+            if sampled:
+                t3 = perf_counter_ns()
+                ins.read.record(t0 - int(now * 1e9))
+                ins.output.record(t2 - t1)
+                ins.record.record(t3 - t2)
+                ins.tick.record(t3 - int(now * 1e9))
+                if is_new:
+                    ins.age.record(t2 - int(snapshot.recv_time * 1e9))
+
+    async def _run_commands(self):
+        queue = self._commands
+        while True:
+            fn, args = await queue.get()
+            try:
+                fn(*args)
+            except Exception as e:
+                print(f"[WARN] command {getattr(fn, '__name__', fn)} failed: {e!r}")
+
+    async def _measure_lag(self):
+        loop = self._loop
+        interval = self.lag_interval
+        lag = self.instruments.lag
+        while True:
+            expected = loop.time() + interval
+            await asyncio.sleep(interval)
+            lag.record(max(0, int((loop.time() - expected) * 1e9)))
+
+    async def _drain_diagnostics(self):
+        loop = self._loop
+        diag = self.diagnostics
+        while True:
+            await asyncio.sleep(diag.interval)
+            await loop.run_in_executor(None, diag.drain)
+
+    async def _poll_profiles(self):
+        loop = self._loop
+        watcher = self.profiles
+        while True:
+            await asyncio.sleep(watcher.interval)
+            await loop.run_in_executor(None, watcher.poll)
@@ -0,0 +1,78 @@
+"""
+悬停漂移基准：HeliSim 闭环悬停（稳定风 + 阵风），比较 HOVER_MODE = "delta"（帧间位移）与 "anchor"（锚点），
+以 CyclicHelper.history（position_history.PositionHistory）的统计报告：
+  全程与最后 30 s 的水平位置误差 RMS、最大偏离、框内占比、平均漂移速度
+另测 PositionHistory 的写入与窗口查询耗时。
+
+用法：python benchmarks/bench_hover_drift.py [模拟秒数]
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from assist_core import AssistCore
+from heli_sim import HeliSim
+from position_history import PositionHistory
+
+DT = 0.02
+WINDOW = 30.0
+
+
+def run(seconds, hover_mode, wind, seed=1):
+    sim = HeliSim(wind=wind, gust_sigma=1.0, seed=seed)
+    core = AssistCore()
+    core.cyclic_helper.set_hover_mode(hover_mode)
+    core.set_cyclic_mode(2)
+    core.set_rudder_enabled(True)
+    outputs = (0.0, 0.0, 0.0)
+    for _ in range(int(seconds / DT)):
+        sim.step(*outputs, DT)
+        sim.fill_snapshot(core.snapshot)
+        outputs = core.step(core.snapshot, True, DT)
+    return core.cyclic_helper.history
+
+
+def timing(n=20000):
+    class State:
+        pass
+
+    from kinematics import HeadingFrame
+
+    ms = State()
+    ms.frame = HeadingFrame()
+    ms.x = ms.y = ms.z = 0.0
+    history = PositionHistory()
+    start = time.perf_counter()
+    for k in range(n):
+        ms.x = k * 1e-3
+        history.record(DT, ms)
+    record = (time.perf_counter() - start) / n
+    start = time.perf_counter()
+    for _ in range(n // 10):
+        history.box_stats(WINDOW)
+    query = (time.perf_counter() - start) / (n // 10)
+    return record, query
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 180.0
+    for wind in ((2.0, 0.0, 1.0), (3.0, 0.0, -2.0)):
+        print(f"{seconds:.0f} s hover, wind {wind[0]:+.0f}/{wind[2]:+.0f} m/s (N/E) + gusts 1.0")
+        for mode in ("delta", "anchor"):
+            history = run(seconds, mode, wind)
+            full = history.box_stats(seconds)
+            last = history.box_stats(WINDOW)
+            _, rate = history.drift(WINDOW)
+            print(
+                f"  {mode:>6}: all rms {full['rms']:6.2f} m max {full['max']:6.2f} m in box {full['in_box'] * 100:5.1f}%"
+                f" | last {WINDOW:.0f} s centre {abs(complex(last['center_north'], last['center_east'])):6.2f} m"
+                f" spread {last['spread']:5.2f} m drift {rate:5.3f} m/s"
+            )
+    record, query = timing()
+    print(f"PositionHistory: record {record * 1e6:.2f} us, box_stats({WINDOW:.0f} s) {query * 1e6:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
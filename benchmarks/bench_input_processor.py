@@ -0,0 +1,62 @@
+"""
+InputProcessor 基准：
+  1) 比较每拍 set_manual + update 的耗时：展开实现与原逐轴实现（_rate_limit + apply_curve）
+  2) 参考：expo 曲线查表（input_mapping.CurveTable）与直接 pow 的单次耗时
+两者的逐位等价由 tests/test_input_processor.py 校验（原实现 LegacyInputProcessor 也定义在其中）。
+
+用法：python benchmarks/bench_input_processor.py [拍数]
+"""
+import random
+import sys
+import time
+from functools import partial
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from input_mapping import CurveTable
+from input_processor import InputProcessor
+from tests.test_input_processor import LegacyInputProcessor
+from utils import apply_curve
+
+
+def tick(p, sticks, dt):
+    p.set_manual(*sticks)
+    p.update(dt)
+    return p.input_cyclic_x, p.input_cyclic_y, p.input_rudder
+
+
+def time_ticks(p, ticks):
+    sticks = [(0.3, -0.2, 0.05), (0.31, -0.2, 0.05), (0.31, -0.2, 0.05), (-0.1, 0.4, 0.0)]
+    start = time.perf_counter()
+    for k in range(ticks):
+        tick(p, sticks[k & 3], 0.02)
+    return (time.perf_counter() - start) / ticks
+
+
+def main():
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    legacy = time_ticks(LegacyInputProcessor(), ticks)
+    batched = time_ticks(InputProcessor(), ticks)
+    print(f"legacy  (3x _rate_limit + apply_curve): {legacy * 1e6:6.2f} us/tick")
+    print(f"batched (unrolled 3-axis update):       {batched * 1e6:6.2f} us/tick")
+    print(f"speedup: {legacy / batched:.2f}x")
+
+    table = CurveTable(partial(apply_curve, expo=0.5))
+    xs = [random.uniform(-1.0, 1.0) for _ in range(1000)]
+    start = time.perf_counter()
+    for _ in range(200):
+        for x in xs:
+            table(x)
+    t_table = (time.perf_counter() - start) / (200 * len(xs))
+    start = time.perf_counter()
+    for _ in range(200):
+        for x in xs:
+            x * (abs(x) ** 0.5)
+    t_pow = (time.perf_counter() - start) / (200 * len(xs))
+    err = max(abs(table(x) - apply_curve(x, 0.5)) for x in xs)
+    print(f"expo curve: table {t_table * 1e9:.0f} ns, pow {t_pow * 1e9:.0f} ns (table max error {err:.1e})")
+
+
+if __name__ == "__main__":
+    main()
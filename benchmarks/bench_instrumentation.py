@@ -0,0 +1,124 @@
+"""
+延迟统计的开销：Histogram.record 单次耗时、perf_counter_ns 单次耗时，
+以及一拍控制（AssistCore.step + async_runtime 控制任务中的计时与记录，不含输出设备）
+在挂载/不挂载 LoopInstruments 时的耗时（遥测来自 heli_sim 闭环预录）。
+
+用法：python benchmarks/bench_instrumentation.py [每轮拍数]
+"""
+import sys
+import time
+from array import array
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from assist_core import AssistCore
+from heli_sim import HeliSim
+from instrumentation import Histogram, LoopInstruments, STAGE_SAMPLE
+
+# 抽中计时的拍的记录次数与 perf_counter_ns 调用次数（assist_core + async_runtime），其余拍均为 0
+RECORDS_SAMPLED, CLOCKS_SAMPLED = 9, 8
+
+
+def per_call(fn, n):
+    start = time.perf_counter()
+    fn(n)
+    return (time.perf_counter() - start) / n * 1e9
+
+
+def bench_record(n):
+    hist = Histogram()
+    record = hist.record
+    for i in range(n):
+        record(i & 0xFFFFF)
+
+
+def bench_clock(n):
+    clock = time.perf_counter_ns
+    for _ in range(n):
+        clock()
+
+
+def bench_empty(n):
+    for i in range(n):
+        i & 0xFFFFF
+
+
+def prerecord(ticks):
+    """闭环录一段遥测，供两种配置重放同样的输入"""
+    sim = HeliSim(gust_sigma=0.5, seed=1)
+    sim.vx, sim.vz = 1.0, -0.5
+    core = AssistCore()
+    core.set_cyclic_mode(2)
+    core.set_rudder_enabled(True)
+    frames = []
+    outputs = (0.0, 0.0, 0.0)
+    for _ in range(ticks):
+        sim.step(*outputs, 0.02)
+        sim.fill_snapshot(core.snapshot)
+        frames.append(array("d", core.snapshot.values))
+        outputs = core.step(core.snapshot, True, 0.02)
+    return frames
+
+
+def bench_step(frames, instruments):
+    """逐帧执行 core.step，挂载 instruments 时同 async_runtime._control 抽样计时并记录 read/output/record/tick/age"""
+    core = AssistCore()
+    core.set_cyclic_mode(2)
+    core.set_rudder_enabled(True)
+    core.instruments = ins = instruments
+    snapshot = core.snapshot
+    clock = time.perf_counter_ns
+    start = time.perf_counter()
+    for values in frames:
+        snapshot.values[:] = values
+        now = time.perf_counter()
+        if ins is None:
+            core.step(snapshot, True, 0.02)
+            continue
+        sampled = ins.next_tick()
+        if sampled:
+            t0 = clock()
+        core.step(snapshot, True, 0.02)
+        if sampled:
+            t1 = clock()
+            t2 = clock()
+            t3 = clock()
+            ins.read.record(t0 - int(now * 1e9))
+            ins.output.record(t2 - t1)
+            ins.record.record(t3 - t2)
+            ins.tick.record(t3 - int(now * 1e9))
+            ins.age.record(t2 - int(now * 1e9))
+    return (time.perf_counter() - start) / len(frames) * 1e6
+
+
+def main():
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rounds = 31
+    n = 1_000_000
+    empty = per_call(bench_empty, n)
+    record_ns = per_call(bench_record, n) - empty
+    clock_ns = per_call(bench_clock, n) - empty
+    print(f"Histogram.record: {record_ns:.0f} ns/call")
+    print(f"perf_counter_ns:  {clock_ns:.0f} ns/call")
+    sampled = RECORDS_SAMPLED * record_ns + CLOCKS_SAMPLED * clock_ns
+    print(
+        f"estimated loop overhead: {sampled / STAGE_SAMPLE / 1e3:.2f} us/tick"
+        f" ({sampled / 1e3:.2f} us on the 1 in {STAGE_SAMPLE} ticks that are timed)"
+    )
+
+    frames = prerecord(ticks)
+    # 两种配置成对交替运行（每轮调换先后），报告各自最小值与逐轮差值的中位数，减小机器负载波动的影响
+    ins = LoopInstruments()
+    offs, ons = [], []
+    for k in range(rounds):
+        for instruments in ((None, ins) if k % 2 == 0 else (ins, None)):
+            (offs if instruments is None else ons).append(bench_step(frames, instruments))
+    off, on = min(offs), min(ons)
+    diff = sorted(b - a for a, b in zip(offs, ons))[rounds // 2]
+    print(f"control tick: {off:.2f} us without, {on:.2f} us with instruments (median paired difference {diff:+.2f} us)")
+    print(ins.report())
+
+
+if __name__ == "__main__":
+    main()
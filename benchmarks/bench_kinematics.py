@@ -0,0 +1,95 @@
+"""
+每拍坐标变换开销：旧实现（每次构造 NumPy 3x3 矩阵并 dot，每拍 3 次）
+对比 kinematics.HeadingFrame（每帧一次 sin/cos，纯浮点变换）
+与 kinematics.BodyFrame（每帧构造一次完整姿态方向余弦矩阵）。
+未安装 NumPy 时只测新实现。
+
+用法：python benchmarks/bench_kinematics.py [拍数]
+"""
+import math
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from kinematics import BodyFrame, HeadingFrame
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def legacy_world_to_body_velocity(Vx, Vy, Vz, pitch, roll, yaw):
+    # 原 utils.world_to_body_velocity（NumPy 版本）
+    cy = math.cos(-yaw)
+    sy = math.sin(-yaw)
+    R_yaw = np.array([
+        [cy, -sy, 0],
+        [sy,  cy, 0],
+        [ 0,   0, 1]
+    ])
+    V_world = np.array([Vx, Vz, Vy])
+    V_body = R_yaw.dot(V_world)
+    return V_body[0], V_body[1], V_body[2]
+
+
+V = (12.3, -0.4, 3.2)
+A = (0.5, -9.8, 0.01)
+D = (1.5, 0.2, -0.7)
+ATT = (0.05, -0.02, 2.3)
+
+
+def tick_legacy():
+    legacy_world_to_body_velocity(*V, *ATT)
+    legacy_world_to_body_velocity(*A, *ATT)
+    legacy_world_to_body_velocity(*D, *ATT)
+
+
+def tick_frame(frame):  # HeadingFrame 或 BodyFrame
+    frame.set_attitude(*ATT)
+    frame.world_to_body(*V)
+    frame.world_to_body(*A)
+    frame.world_to_body(*D)
+
+
+def main():
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    frame = HeadingFrame()
+
+    if np is not None:
+        frame.set_attitude(*ATT)
+        for vec in (V, A, D):
+            old = legacy_world_to_body_velocity(*vec, *ATT)
+            new = frame.world_to_body(*vec)
+            assert all(abs(a - b) < 1e-12 for a, b in zip(old, new)), (old, new)
+
+        start = time.perf_counter()
+        for _ in range(ticks):
+            tick_legacy()
+        legacy = (time.perf_counter() - start) / ticks
+        print(f"numpy (3 transforms/tick):        {legacy * 1e6:7.2f} us/tick")
+    else:
+        legacy = None
+        print("numpy not installed: skipping legacy measurement")
+
+    start = time.perf_counter()
+    for _ in range(ticks):
+        tick_frame(frame)
+    fast = (time.perf_counter() - start) / ticks
+    print(f"HeadingFrame (1 sin/cos + 3 transforms): {fast * 1e6:7.2f} us/tick")
+
+    body = BodyFrame()
+    start = time.perf_counter()
+    for _ in range(ticks):
+        tick_frame(body)
+    full = (time.perf_counter() - start) / ticks
+    print(f"BodyFrame (DCM + 3 transforms):          {full * 1e6:7.2f} us/tick")
+
+    if legacy is not None:
+        print(f"speedup vs numpy: heading {legacy / fast:.1f}x, body {legacy / full:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
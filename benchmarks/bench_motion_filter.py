@@ -0,0 +1,145 @@
+"""
+MotionState 状态滤波基准：MOTION_FILTER = "ema"（加速度 EMA）与 "kalman"（kalman.MotionEstimator）
+  1) 每帧 update 耗时
+  2) 各信号的相位滞后：无噪声输入下，使滤波输出与参考信号 RMS 差最小的时移（1 ms 分辨率）
+  3) 带噪声输入下与参考信号的 RMS 误差
+数据：默认由 HeliSim 生成（阵风悬停 + 周期杆脉冲，50 Hz，参考为真值，输入帧叠加模拟振动噪声）；
+给出录制文件（replay.py 格式）时回放该文件，参考为未滤波的原始信号（RMS 误差即滤掉的量，滞后同样相对原始信号）。
+
+用法：python benchmarks/bench_motion_filter.py [capture.jsonl] [--seconds 120]
+"""
+import argparse
+import math
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from assist_core import AssistCore
+from heli_sim import HeliSim
+from motion_state import MotionState
+from telemetry_snapshot import IDX_FIELDS, IDX_MODEL_TIME
+
+DT = 0.02
+
+# 模拟噪声（标准差，FIELDS 顺序）：速度、比力（旋翼振动）、姿态、角速度、位置
+NOISE = (0.01,) * 3 + (0.5,) * 3 + (0.001,) * 3 + (0.005,) * 3 + (0.02,) * 3
+
+SIGNALS = ("forward_acc", "right_acc", "forward_v", "right_v", "pitch_rate", "roll_rate", "pitch", "roll")
+
+
+def simulate(seconds, seed=1):
+    """返回 [(model_time, clean_values, noisy_values)]"""
+    rng = random.Random(seed)
+    sim = HeliSim(wind=(2.0, 0.0, 1.0), gust_sigma=1.5, seed=seed)
+    core = AssistCore()
+    core.set_cyclic_mode(2)
+    core.set_rudder_enabled(True)
+    frames = []
+    cx = cy = r = 0.0
+    for k in range(int(seconds / DT)):
+        # 每 4 s 一次 1 s 的周期杆脉冲（方向交替），考察滤波对快速变化的滞后
+        phase = (k * DT) % 8.0
+        core.manual_cyclic_x = 0.3 if 1.0 <= phase < 2.0 else -0.3 if 5.0 <= phase < 6.0 else 0.0
+        core.manual_cyclic_y = 0.2 if 3.0 <= phase < 4.0 else -0.2 if 7.0 <= phase < 8.0 else 0.0
+        sim.step(cx, cy, r, DT)
+        sim.fill_snapshot(core.snapshot)
+        cx, cy, r = core.step(core.snapshot, True, DT)
+        clean = tuple(core.snapshot.values[IDX_FIELDS:])
+        noisy = tuple(v + rng.gauss(0.0, s) for v, s in zip(clean, NOISE))
+        frames.append((sim.time, clean, noisy))
+    return frames
+
+
+def load(path):
+    from replay import load_frames
+
+    frames = []
+    for frame in load_frames(path):
+        values = tuple(frame.values[IDX_FIELDS:])
+        frames.append((frame.values[IDX_MODEL_TIME], values, values))
+    return frames
+
+
+def feed(ms, values, model_time):
+    Vx, Vy, Vz, Ax, Ay, Az, Pitch, Roll, Yaw, PitchRate, RollRate, YawRate, x, y, z = values
+    ms.update(Vx, Vy, Vz, Pitch, Roll, Yaw, Ax, Ay, Az, PitchRate, RollRate, YawRate, x, y, z, DT, model_time)
+
+
+def trace(frames, filter_mode, noisy=True, alpha=None):
+    ms = MotionState(DT, "heading", filter_mode)
+    if alpha is not None:
+        ms.ema_forward_acc.alpha = ms.ema_right_acc.alpha = ms.ema_up_acc.alpha = alpha
+    out = {name: [] for name in SIGNALS}
+    for model_time, clean, noisy_values in frames:
+        feed(ms, noisy_values if noisy else clean, model_time)
+        for name in SIGNALS:
+            out[name].append(getattr(ms, name))
+    return out
+
+
+def cost(frames, filter_mode):
+    ms = MotionState(DT, "heading", filter_mode)
+    start = time.perf_counter()
+    for model_time, _, values in frames:
+        feed(ms, values, model_time)
+    return (time.perf_counter() - start) / len(frames)
+
+
+def lag(signal, reference, max_lag=0.15):
+    """使 signal[k] 与 reference 在 t_k - 滞后 处（线性插值）RMS 差最小的滞后秒数"""
+    n = len(signal)
+    skip = int(max_lag / DT) + 1
+
+    def rms(shift):
+        total = 0.0
+        for k in range(skip, n - 1):
+            pos = k - shift / DT
+            i = int(pos)
+            frac = pos - i
+            total += (signal[k] - (reference[i] * (1.0 - frac) + reference[i + 1] * frac)) ** 2
+        return total
+
+    return min((rms(ms * 0.001), ms * 0.001) for ms in range(int(max_lag * 1000) + 1))[1]
+
+
+def rms_error(signal, reference):
+    return math.sqrt(sum((a - b) ** 2 for a, b in zip(signal, reference)) / len(signal))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MotionState filter cost and lag")
+    parser.add_argument("capture", nargs="?")
+    parser.add_argument("--seconds", type=float, default=120.0)
+    args = parser.parse_args()
+
+    modes = ("ema", "kalman")
+    if args.capture:
+        frames = load(args.capture)
+        print(f"{args.capture}: {len(frames)} frames, reference = unfiltered signal")
+    else:
+        frames = simulate(args.seconds)
+        print(f"HeliSim {args.seconds:.0f} s gusty hover with stick pulses, reference = noise-free truth")
+
+    for mode in modes:
+        print(f"{mode:>6}: update {cost(frames, mode) * 1e6:5.2f} us/frame")
+
+    # 参考：无噪声帧（回放数据即原始帧）的未滤波信号（加速度 EMA 系数取 1）
+    reference = trace(frames, "ema", noisy=False, alpha=1.0)
+    # 相位滞后在无噪声输入上测量（回放数据即原始帧），误差在带噪声输入上测量
+    clean = {mode: trace(frames, mode, noisy=False) for mode in modes}
+    noisy = {mode: trace(frames, mode) for mode in modes}
+
+    print(f"{'signal':>12} | {'ema lag':>8} {'rms err':>9} | {'kalman lag':>10} {'rms err':>9}")
+    for name in SIGNALS:
+        cells = [
+            f"{lag(clean[mode][name], reference[name]) * 1e3:6.0f} ms {rms_error(noisy[mode][name], reference[name]):9.5f}"
+            for mode in modes
+        ]
+        print(f"{name:>12} | {cells[0]} | {cells[1]:>20}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+悬停时的虚拟摇杆写入量：HeliSim 闭环悬停（静风 / 稳定风 / 阵风），比较
+  旧方式：每拍每轴 set_axis 一次（随机扰动保证值在变），即 3 次驱动调用/拍
+  新方式：output_backends 只写量化值变化的轴，静止轴每 OUTPUT_KEEPALIVE 秒 ±1 LSB 保活
+并报告每秒提交数、写轴数与每拍 write 耗时。
+
+用法：python benchmarks/bench_output_writes.py [模拟秒数]
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from assist_core import AssistCore, LOOP_DT
+from heli_sim import HeliSim
+from output_backends import RecordingBackend
+
+
+def run(seconds, wind, gust_sigma, keepalive=0.5):
+    sim = HeliSim(wind=wind, gust_sigma=gust_sigma, seed=1)
+    core = AssistCore()
+    core.set_cyclic_mode(2)
+    core.set_rudder_enabled(True)
+    out = RecordingBackend(keepalive)
+    steps = int(seconds / LOOP_DT)
+    cost = 0.0
+    cx = cy = r = 0.0
+    for k in range(steps):
+        sim.step(cx, cy, r, LOOP_DT)
+        sim.fill_snapshot(core.snapshot)
+        cx, cy, r = core.step(core.snapshot, True, LOOP_DT)
+        t0 = time.perf_counter()
+        out.write(cx, cy, r, k * LOOP_DT)
+        cost += time.perf_counter() - t0
+    return out.writes / seconds, out.axis_writes / seconds, cost / steps
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 120.0
+    legacy = 3 / LOOP_DT
+    print(f"legacy: {1 / LOOP_DT:.0f} ticks/s x 3 set_axis = {legacy:.0f} driver calls/s in any condition")
+    calm = (0.0, 0.0, 0.0)
+    wind = (2.0, 0.0, 1.0)
+    for label, w, gust in (("calm", calm, 0.0), ("steady wind", wind, 0.0), ("gusts 0.3", wind, 0.3), ("gusts 1.0", wind, 1.0)):
+        writes, axes, cost = run(seconds, w, gust)
+        print(
+            f"{label:12s}: {writes:6.1f} writes/s, {axes:6.1f} axis values/s"
+            f" ({legacy / max(writes, 1e-9):5.1f}x fewer driver calls), write() {cost * 1e6:.2f} us/tick"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+PIDBank 基准：比较 8 个控制器逐个更新（PIDCalculatorNew）与一次批量更新（PIDBank.update_many）的单拍耗时。
+与 PIDCalculatorNew 的逐位等价由 tests/test_pid_bank.py 校验。
+
+用法：python benchmarks/bench_pid_bank.py [拍数]
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pid_bank import PIDBank
+from pid_calculator_new import PIDCalculatorNew
+
+# 与 CyclicHelper 相同的 8 组参数
+GAINS = [
+    dict(Kp_base=0.0007, Ki=0.0001, Kd=0.01, integral_max=0.001, integral_leak=0.01, skip=2, max_auth=0.01),
+    dict(Kp_base=0.04, Ki=0.06, Kd=0.2, integral_max=0.08, skip=3, max_auth=0.15),
+    dict(Kp_base=0.7, Ki=0.02, Kd=0.06, integral_max=0.001, integral_leak=0.02, skip=4, max_auth=0.5),
+    dict(Kp_base=0.04, Ki=0.15, Kd=0.02, integral_max=0.08, integral_leak=0.001),
+    dict(Kp_base=0.01, Ki=0.0008, Kd=0.003, integral_max=0.01, integral_leak=0.01, skip=2, max_auth=2),
+    dict(Kp_base=0.05, Ki=0.02, Kd=0.1, integral_max=0.17, skip=3, max_auth=0.25),
+    dict(Kp_base=0.85, Ki=0.02, Kd=0.03, integral_max=0.001, integral_leak=0.02, skip=4, max_auth=10.5),
+    dict(Kp_base=0.18, Ki=0.03, Kd=0.04, integral_max=0.5, integral_leak=0.001, max_auth=0.5),
+]
+
+
+def bench(ticks):
+    errors = [0.1 * (i + 1) for i in range(len(GAINS))]
+    dts = [0.02] * len(GAINS)
+
+    ref = [PIDCalculatorNew(**g) for g in GAINS]
+    start = time.perf_counter()
+    for _ in range(ticks):
+        for p, e in zip(ref, errors):
+            p.update(error=e, rate=None, delta_time=0.02)
+    scalar = (time.perf_counter() - start) / ticks
+
+    bank = PIDBank()
+    indices = [bank.add(**g).index for g in GAINS]
+    start = time.perf_counter()
+    for _ in range(ticks):
+        bank.update_many(indices, errors, dts)
+    batched = (time.perf_counter() - start) / ticks
+
+    print(f"8 x PIDCalculatorNew.update: {scalar * 1e6:7.2f} us/tick")
+    print(f"PIDBank.update_many (8):     {batched * 1e6:7.2f} us/tick  ({scalar / batched:.2f}x)")
+
+
+def main():
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    bench(ticks)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+帧间预测基准：HeliSim 闭环悬停（稳定风 + 阵风），遥测按导出频率采样、经固定传输延迟到达，
+控制步按给定频率运行，比较
+  50 Hz 导出 / 50 Hz 定时控制（相位与导出错开）/ 不预测
+  50 Hz 导出 / 帧到达即控制（CONTROL_SCHEDULING = "telemetry"）/ 不预测
+  50 Hz 导出 / 200 Hz 控制 / 不预测（帧间保持输出）
+  50、100、200 Hz 导出 / 200 Hz 控制 / 预测（PREDICT_MAX）
+报告控制步所见运动状态与模拟器真值之差（姿态、机体速度 RMS）以及悬停水平漂移。
+模拟时间以 1 ms 为单位推进，控制输出保持到下一控制步。
+
+用法：python benchmarks/bench_prediction.py [模拟秒数]
+"""
+import math
+import sys
+from array import array
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from assist_core import AssistCore
+from heli_sim import HeliSim
+from kinematics import HeadingFrame
+from telemetry_snapshot import IDX_FIELDS, IDX_MODEL_TIME, IDX_RECV_TIME, IDX_SEQ
+
+TICK = 0.001
+LATENCY = 0.003      # 导出到接收的传输延迟（秒）
+PHASE = 0.007        # 定时控制相对导出的相位差（秒）
+PREDICT_MAX = 0.05
+
+
+def run(seconds, export_hz, control_hz, predict, on_arrival=False, seed=1):
+    sim = HeliSim(wind=(2.0, 0.0, 1.0), gust_sigma=1.0, max_substep=TICK, seed=seed)
+    core = AssistCore()
+    core.set_cyclic_mode(2)
+    core.set_rudder_enabled(True)
+    core.predict_max = PREDICT_MAX if predict else 0.0
+    snapshot = core.snapshot
+    ms = core.motion_state
+    truth = HeadingFrame()
+
+    export_ticks = round(1.0 / (export_hz * TICK))
+    control_ticks = round(1.0 / (control_hz * TICK))
+    phase_ticks = round(PHASE / TICK)
+    latency_ticks = round(LATENCY / TICK)
+
+    x0, z0 = sim.x, sim.z
+    pending = []
+    cx = cy = r = 0.0
+    last = 0.0
+    new = False
+    att_sq = vel_sq = drift_sq = 0.0
+    drift_max = 0.0
+    steps = 0
+    for k in range(1, int(seconds / TICK) + 1):
+        sim.step(cx, cy, r, TICK)
+        t = k * TICK
+        if k % export_ticks == 0:
+            sim.seq += 1
+            pending.append((k + latency_ticks, sim.seq, sim.time, array("d", sim.values())))
+
+        arrived = False
+        while pending and pending[0][0] <= k:
+            _, seq, model_time, values = pending.pop(0)
+            snapshot.values[IDX_SEQ] = seq
+            snapshot.values[IDX_MODEL_TIME] = model_time
+            snapshot.values[IDX_RECV_TIME] = t
+            snapshot.values[IDX_FIELDS:] = values
+            snapshot.generation += 1
+            arrived = new = True
+
+        if on_arrival:
+            if not arrived:
+                continue
+        elif (k - phase_ticks) % control_ticks:
+            continue
+
+        cx, cy, r = core.step(snapshot, new, t - last, t)
+        last = t
+        new = False
+
+        # 控制步所用状态与此刻真值之差（悬停时 heading 系即足够）
+        truth.set_attitude(sim.pitch, sim.roll, sim.yaw)
+        forward_v, right_v, _ = truth.world_to_body(sim.vx, sim.vy, sim.vz)
+        dyaw = (ms.yaw - sim.yaw + math.pi) % (2 * math.pi) - math.pi
+        att_sq += (ms.pitch - sim.pitch) ** 2 + (ms.roll - sim.roll) ** 2 + dyaw ** 2
+        vel_sq += (ms.forward_v - forward_v) ** 2 + (ms.right_v - right_v) ** 2
+        drift = math.hypot(sim.x - x0, sim.z - z0)
+        drift_sq += drift * drift
+        drift_max = max(drift_max, drift)
+        steps += 1
+
+    return (
+        math.degrees(math.sqrt(att_sq / (3 * steps))),
+        math.sqrt(vel_sq / (2 * steps)),
+        math.sqrt(drift_sq / steps),
+        drift_max,
+        core.predicted_steps,
+    )
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 60.0
+    print(f"{seconds:.0f} s hover, wind 2.2 m/s + gusts 1.0, link latency {LATENCY * 1e3:.0f} ms")
+    cases = (
+        ("50 Hz export, 50 Hz timer", 50, 50, False, False),
+        ("50 Hz export, on arrival", 50, 50, False, True),
+        ("50 Hz export, 200 Hz hold", 50, 200, False, False),
+        ("50 Hz export, 200 Hz predict", 50, 200, True, False),
+        ("100 Hz export, 200 Hz predict", 100, 200, True, False),
+        ("200 Hz export, 200 Hz predict", 200, 200, True, False),
+    )
+    for label, export_hz, control_hz, predict, on_arrival in cases:
+        att, vel, drift, drift_max, predicted = run(seconds, export_hz, control_hz, predict, on_arrival)
+        print(
+            f"{label:30s}: state error attitude {att:6.3f} deg  velocity {vel:6.4f} m/s"
+            f" | drift rms {drift:5.2f} m  max {drift_max:5.2f} m | predicted steps {predicted}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+遥测解码基准：比较 JSON 行与二进制帧在 TelemetryDecoder 中的单帧解码开销，
+并换算为 50 Hz 下每秒占用的 CPU 时间。
+
+用法：python benchmarks/bench_telemetry_decode.py [帧数]
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dcs_telemetry import TelemetryDecoder
+from telemetry_protocol import encode_binary
+
+RATE_HZ = 50
+
+
+def sample_values():
+    return (
+        12.345678, -0.123456, 3.210987,
+        0.456789, -9.806650, 0.012345,
+        0.0523, -0.0174, 2.3562,
+        0.0123, -0.0045, 0.0011,
+        -281234.125, 512.375, 647123.5,
+    )
+
+
+# 每轮发送的不同帧数（序号递增；回到开头时序号大幅回退，按发送端重启重新同步，每帧都会发布）
+CYCLE = 1024
+
+
+def json_packet(seq, model_time, values):
+    # 与 Export.lua 的 string.format 输出一致
+    return (
+        '{"Seq":%.0f,"ModelTime":%.4f,'
+        '"Vx":%.6f,"Vy":%.6f,"Vz":%.6f,'
+        '"Ax":%.6f,"Ay":%.6f,"Az":%.6f,'
+        '"Pitch":%.4f,"Roll":%.4f,"Yaw":%.4f,'
+        '"PitchRate":%.4f,"RollRate":%.4f,"YawRate":%.4f,'
+        '"PosX":%.3f,"PosY":%.3f,"PosZ":%.3f}\n' % ((seq, model_time) + values)
+    ).encode("utf-8")
+
+
+def bench(handler, packets, frames):
+    views = [memoryview(bytearray(p)) for p in packets]
+    start = time.perf_counter()
+    clock = time.perf_counter_ns
+    for k in range(frames):
+        handler(views[k % CYCLE], clock())
+    return (time.perf_counter() - start) / frames
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    values = sample_values()
+    json_tel = TelemetryDecoder()
+    binary_tel = TelemetryDecoder()
+
+    results = [
+        ("json", bench(json_tel.handle_packet, [json_packet(k, k * 0.02, values) for k in range(CYCLE)], frames)),
+        ("binary", bench(binary_tel.handle_packet, [encode_binary(k, k * 0.02, values) for k in range(CYCLE)], frames)),
+    ]
+    for tel in (json_tel, binary_tel):
+        assert tel.buffer.generation == frames, tel.stats()
+
+    print(f"frames={frames} rate={RATE_HZ} Hz")
+    for name, per_frame in results:
+        cpu_per_s = per_frame * RATE_HZ
+        print(f"{name:>6}: {per_frame * 1e6:8.2f} us/frame  {cpu_per_s * 1e3:7.3f} ms CPU/s ({cpu_per_s * 100:.4f}%)")
+    print(f"speedup: {results[0][1] / results[1][1]:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
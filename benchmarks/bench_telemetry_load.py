@@ -0,0 +1,133 @@
+"""
+遥测接收负载测试：子进程按给定速率成簇发送遥测（模拟 DCS 卡顿后一次性补发、网络成簇到达），比较
+  旧方式：阻塞 recv_into，每个数据报完整解析并发布
+  新方式：DcsTelemetry（select 唤醒后取空 socket，只解析每批最新帧）
+报告接收方 CPU 占用、完整解析的帧数，以及每簇最后一帧（最新状态）从发出到发布的延迟。
+发送端把 perf_counter 时刻写进 ModelTime，同一台机器上两进程的 perf_counter 可直接相减。
+
+用法：python benchmarks/bench_telemetry_load.py [--rate 2000] [--burst 8] [--seconds 3] [--format binary]
+"""
+import argparse
+import multiprocessing
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dcs_telemetry import DcsTelemetry, TelemetryDecoder, UDP_BUF
+from telemetry_protocol import encode_binary, encode_json
+from telemetry_snapshot import IDX_MODEL_TIME, IDX_SEQ
+
+VALUES = (
+    12.3, -0.1, 3.2, 0.4, -9.8, 0.01, 0.05, -0.02, 2.36, 0.01, -0.004, 0.001, -281234.1, 512.4, 647123.5,
+)
+
+
+def send(address, fmt, rate, burst, seconds, start):
+    """每 burst/rate 秒连发 burst 帧"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    encode = encode_binary if fmt == "binary" else (lambda seq, t, values: encode_json(values, seq, t))
+    period = burst / rate
+    seq = 0
+    deadline = start
+    while deadline < start + seconds:
+        while time.perf_counter() < deadline:
+            time.sleep(min(0.0005, max(0.0, deadline - time.perf_counter())))
+        for _ in range(burst):
+            seq += 1
+            sock.sendto(encode(seq, time.perf_counter(), VALUES), address)
+        deadline += period
+    sock.close()
+
+
+class LatencyProbe:
+    """记录每簇最后一帧的发布延迟（perf_counter 与发送时刻之差）"""
+
+    def _publish(self):
+        back = self.buffer.back()
+        if int(back[IDX_SEQ]) % self.burst == 0:
+            self.latencies.append(time.perf_counter() - back[IDX_MODEL_TIME])
+        super()._publish()
+
+
+class LegacyReceiver(LatencyProbe, TelemetryDecoder, threading.Thread):
+    # 原 DcsTelemetry.run：每个数据报一次阻塞 recv_into + 完整解析
+    def __init__(self, burst):
+        threading.Thread.__init__(self, daemon=True)
+        TelemetryDecoder.__init__(self)
+        self.burst = burst
+        self.latencies = []
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(("127.0.0.1", 0))
+
+    def run(self):
+        buf = bytearray(UDP_BUF)
+        view = memoryview(buf)
+        while True:
+            n = self.sock.recv_into(buf)
+            self.handle_packet(view[:n], time.perf_counter_ns())
+
+
+class BatchedReceiver(LatencyProbe, DcsTelemetry):
+    def __init__(self, burst, rcvbuf):
+        DcsTelemetry.__init__(self, "127.0.0.1", 0, rcvbuf)
+        self.burst = burst
+        self.latencies = []
+
+
+def percentile(values, q):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def run(receiver, args):
+    receiver.start()
+    start = time.perf_counter() + 0.2
+    sender = multiprocessing.Process(
+        target=send,
+        args=(receiver.sock.getsockname(), args.format, args.rate, args.burst, args.seconds, start),
+    )
+    sender.start()
+    cpu0 = time.process_time()
+    sender.join()
+    time.sleep(0.2)
+    cpu = time.process_time() - cpu0
+    stats = receiver.stats()
+    lat = receiver.latencies
+    print(
+        f"{type(receiver).__name__:16s} received {stats['frames']:7d}  decoded {stats['published']:7d}"
+        f"  superseded {stats['superseded']:7d}  lost {stats['lost']:5d}"
+        f"  CPU {cpu / args.seconds * 100:5.1f}%"
+        f"  newest-frame latency p50 {percentile(lat, 0.5) * 1e6:7.1f} us  p99 {percentile(lat, 0.99) * 1e6:8.1f} us"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="UDP telemetry receiver under burst load")
+    parser.add_argument("--rate", type=float, default=2000.0, help="frames per second")
+    parser.add_argument("--burst", type=int, default=8, help="frames sent back-to-back per burst")
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--format", choices=("binary", "json"), default="binary")
+    parser.add_argument("--rcvbuf", type=int, default=262144, help="SO_RCVBUF for the batched receiver")
+    args = parser.parse_args()
+
+    print(f"{args.format} frames, {args.rate:.0f}/s in bursts of {args.burst}, {args.seconds:.0f} s")
+    # 接收方各自在独立进程中运行，CPU 统计互不干扰
+    for kind in ("legacy", "batched"):
+        proc = multiprocessing.Process(target=_run_one, args=(kind, args))
+        proc.start()
+        proc.join()
+
+
+def _run_one(kind, args):
+    receiver = LegacyReceiver(args.burst) if kind == "legacy" else BatchedReceiver(args.burst, args.rcvbuf)
+    run(receiver, args)
+
+
+if __name__ == "__main__":
+    main()
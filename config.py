@@ -7,20 +7,48 @@ from typing import Any, Dict
 _DEFAULTS: Dict[str, Any] = {
     "UDP_HOST": "127.0.0.1",
     "UDP_PORT": 28777,
+    "UDP_RCVBUF": 262144,
     "VJOY_DEVICE_ID": 3,
+    "OUTPUT_BACKEND": "auto",
+    "OUTPUT_KEEPALIVE": 0.5,
+    "JOYSTICK_BACKEND": "auto",
+    "INPUT_BINDINGS": [
+        {"axis": "cyclic_x", "code": "ABS_X"},
+        {"axis": "cyclic_y", "code": "ABS_Y"},
+        {"axis": "rudder", "code": "ABS_RX"},
+    ],
     "TOGGLE_RUDDER_HOTKEY": "f8",
     "TOGGLE_CYCLIC_HOTKEY": "f9",
     "TOGGLE_PAUSE_HOTKEY": "left ctrl",
+    "DUMP_STATS_HOTKEY": "f10",
     "EMA_ALPHA": 0.25,
+    "CONTROL_SCHEDULING": "telemetry",
+    "CONTROL_RATE": 50.0,
+    "EXPORT_RATE": 50.0,
+    "PREDICT_MAX": 0.0,
+    "TELEMETRY_STALE_TIMEOUT": 0.2,
+    "TELEMETRY_STALE_POLICY": "freeze",
+    "BODY_FRAME_MODE": "heading",
+    "MOTION_FILTER": "ema",
+    "HOVER_MODE": "delta",
+    "HOVER_HISTORY": 600.0,
+    "HOVER_BOX": 2.0,
+    "RECORDER_PATH": "",
+    "DIAG_RATE": 10,
+    "DIAG_CONSOLE_INTERVAL": 1.0,
+    "DIAG_UDP": "",
+    "DIAG_CSV": "",
+    "PROFILE": "",
 }
 
-def _config_path() -> Path:
+def config_dir() -> Path:
     # 打包后优先读取可执行文件所在目录
     if getattr(sys, "frozen", False):
-        base = Path(sys.executable).parent
-    else:
-        base = Path(__file__).parent
-    return base / "config.json"
+        return Path(sys.executable).parent
+    return Path(__file__).parent
+
+def _config_path() -> Path:
+    return config_dir() / "config.json"
 
 def _load_config() -> Dict[str, Any]:
     path = _config_path()
@@ -45,18 +73,80 @@ def _load_config() -> Dict[str, Any]:
     merged.update({k: data[k] for k in data.keys() if k in _DEFAULTS})
     return merged
 
+def _coerce(values: Dict[str, Any]) -> Dict[str, Any]:
+    # 类型修正（确保外部使用时类型正确）
+    types = {
+        "UDP_HOST": str,
+        "UDP_PORT": int,
+        "UDP_RCVBUF": int,
+        "VJOY_DEVICE_ID": int,
+        "OUTPUT_BACKEND": str,
+        "OUTPUT_KEEPALIVE": float,
+        "JOYSTICK_BACKEND": str,
+        "INPUT_BINDINGS": list,
+        "TOGGLE_RUDDER_HOTKEY": str,
+        "TOGGLE_CYCLIC_HOTKEY": str,
+        "TOGGLE_PAUSE_HOTKEY": str,
+        "DUMP_STATS_HOTKEY": str,
+        "EMA_ALPHA": float,
+        "CONTROL_SCHEDULING": str,
+        "CONTROL_RATE": float,
+        "EXPORT_RATE": float,
+        "PREDICT_MAX": float,
+        "TELEMETRY_STALE_TIMEOUT": float,
+        "TELEMETRY_STALE_POLICY": str,
+        "BODY_FRAME_MODE": str,
+        "MOTION_FILTER": str,
+        "HOVER_MODE": str,
+        "HOVER_HISTORY": float,
+        "HOVER_BOX": float,
+        "RECORDER_PATH": str,
+        "DIAG_RATE": float,
+        "DIAG_CONSOLE_INTERVAL": float,
+        "DIAG_UDP": str,
+        "DIAG_CSV": str,
+        "PROFILE": str,
+    }
+    return {k: types[k](v) if k in types else v for k, v in values.items()}
+
 def reload_config() -> None:
-    """运行时重新加载配置（可在热键或命令触发）"""
-    globals().update(_load_config())
+    """
+    运行时重新加载配置（可在热键或命令触发）。
+    只更新本模块属性：需要随重载生效的代码应以 config.X 访问，而非 from config import。
+    """
+    globals().update(_coerce(_load_config()))
 
 # 加载并导出为模块常量（保持现有引用方式）
-globals().update(_load_config())
-
-# 类型修正（确保外部使用时类型正确）
-UDP_HOST: str = str(globals()["UDP_HOST"])
-UDP_PORT: int = int(globals()["UDP_PORT"])
-VJOY_DEVICE_ID: int = int(globals()["VJOY_DEVICE_ID"])
-TOGGLE_RUDDER_HOTKEY: str = str(globals()["TOGGLE_RUDDER_HOTKEY"])
-TOGGLE_CYCLIC_HOTKEY: str = str(globals()["TOGGLE_CYCLIC_HOTKEY"])
-TOGGLE_PAUSE_HOTKEY: str = str(globals()["TOGGLE_PAUSE_HOTKEY"])
-EMA_ALPHA: float = float(globals()["EMA_ALPHA"])
\ No newline at end of file
+globals().update(_coerce(_load_config()))
+
+# 供类型检查与补全
+UDP_HOST: str
+UDP_PORT: int
+UDP_RCVBUF: int
+VJOY_DEVICE_ID: int
+OUTPUT_BACKEND: str
+OUTPUT_KEEPALIVE: float
+JOYSTICK_BACKEND: str
+INPUT_BINDINGS: list
+TOGGLE_RUDDER_HOTKEY: str
+TOGGLE_CYCLIC_HOTKEY: str
+TOGGLE_PAUSE_HOTKEY: str
+DUMP_STATS_HOTKEY: str
+EMA_ALPHA: float
+CONTROL_SCHEDULING: str
+CONTROL_RATE: float
+EXPORT_RATE: float
+PREDICT_MAX: float
+TELEMETRY_STALE_TIMEOUT: float
+TELEMETRY_STALE_POLICY: str
+BODY_FRAME_MODE: str
+MOTION_FILTER: str
+HOVER_MODE: str
+HOVER_HISTORY: float
+HOVER_BOX: float
+RECORDER_PATH: str
+DIAG_RATE: float
+DIAG_CONSOLE_INTERVAL: float
+DIAG_UDP: str
+DIAG_CSV: str
+PROFILE: str
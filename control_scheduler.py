@@ -0,0 +1,116 @@
+import asyncio
+import time
+
+from telemetry_snapshot import TelemetrySnapshot
+
+# 遥测驱动时控制频率不能高于导出频率（Export.lua 的 1 / INTERVAL）：帧间会按兜底超时插入不规则的补步。
+# 此时改用定时模式，帧间的步运行在预测状态上；未设置 PREDICT_MAX 时预测上限取 AUTO_PREDICT_FRAMES 个导出间隔
+AUTO_PREDICT_FRAMES = 2
+
+
+def resolve_mode(mode, rate, export_rate, predict_max):
+    """
+    按控制频率 rate 与导出频率 export_rate（次/秒）确定实际调度模式与预测上限（秒）。
+    返回 (mode, predict_max, note)：note 为调整说明，未调整时为 None。
+    """
+    if mode != "telemetry" or rate <= export_rate:
+        return mode, predict_max, None
+    note = f"CONTROL_RATE {rate:g} Hz > EXPORT_RATE {export_rate:g} Hz: timer scheduling"
+    if predict_max <= 0.0:
+        predict_max = AUTO_PREDICT_FRAMES / export_rate
+        note += f", PREDICT_MAX {predict_max:g} s"
+    return "timer", predict_max, note
+
+
+class ControlScheduler:
+    """
+    控制步调度器：
+      - "telemetry"：新遥测帧到达即唤醒执行控制步；超过 period * fallback_factor
+        仍无新帧时退回定时步，之后按 period 的截止时间继续，直到新帧恢复
+      - "timer"：以 time.perf_counter 截止时间驱动的固定周期，扣除计算耗时，不累积漂移
+    统计：周期抖动、丢帧（两步之间跨过多于一帧）、重复帧（本步未见新帧）、超时重同步。
+    在 asyncio 任务中调用 next_step_async（telemetry 需提供 wait_for_frame_async 与 read_into）。
+    """
+
+    def __init__(self, telemetry, period=0.02, mode="telemetry", fallback_factor=1.5):
+        if mode not in ("telemetry", "timer"):
+            raise ValueError(f"unknown scheduling mode: {mode}")
+        self.telemetry = telemetry
+        self.period = period
+        self.mode = mode
+        self.fallback_timeout = period * fallback_factor
+
+        self._last_step = time.perf_counter()
+        self._deadline = self._last_step + (self.fallback_timeout if mode == "telemetry" else period)
+
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.steps = 0
+        self.missed_frames = 0
+        self.duplicate_steps = 0
+        self.overruns = 0
+        self._jitter_sum = 0.0
+        self._jitter_max = 0.0
+
+    async def next_step_async(self, snapshot: TelemetrySnapshot):
+        """
+        等待到下一个控制步（等待期间让出事件循环），并把最新帧读入 snapshot。
+        返回 (now, is_new)：now 为 perf_counter 时刻，is_new 表示是否为新帧。
+        """
+        prev_generation = snapshot.generation
+
+        timeout = self._deadline - time.perf_counter()
+        if timeout > 0:
+            if self.mode == "telemetry":
+                await self.telemetry.wait_for_frame_async(prev_generation, timeout)
+            else:
+                await asyncio.sleep(timeout)
+        return self._advance(snapshot, prev_generation)
+
+    def _advance(self, snapshot: TelemetrySnapshot, prev_generation: int):
+        now = time.perf_counter()
+        is_new = self.telemetry.read_into(snapshot)
+
+        # 推进截止时间：帧驱动时以本帧为基准，否则按固定周期累加
+        if is_new and self.mode == "telemetry":
+            self._deadline = now + self.fallback_timeout
+        else:
+            self._deadline += self.period
+            if self._deadline < now:
+                # 严重超时：重新对齐，避免连续补步
+                self.overruns += 1
+                self._deadline = now + self.period
+
+        # 统计
+        jitter = abs((now - self._last_step) - self.period)
+        self._last_step = now
+        self.steps += 1
+        self._jitter_sum += jitter
+        if jitter > self._jitter_max:
+            self._jitter_max = jitter
+        if is_new:
+            skipped = snapshot.generation - prev_generation - 1
+            if skipped > 0:
+                self.missed_frames += skipped
+        else:
+            self.duplicate_steps += 1
+
+        return now, is_new
+
+    def take_stats(self) -> tuple:
+        """返回本统计窗口的原始值并清零：(steps, jitter_sum, jitter_max, missed, dup, overruns)"""
+        stats = (
+            self.steps, self._jitter_sum, self._jitter_max,
+            self.missed_frames, self.duplicate_steps, self.overruns,
+        )
+        self.reset_stats()
+        return stats
+
+    def debug_print(self) -> str:
+        mean_jitter = self._jitter_sum / self.steps if self.steps else 0.0
+        return (
+            f"Sched[{self.mode}] steps={self.steps} jitter={mean_jitter * 1e3:.2f}ms"
+            f" max={self._jitter_max * 1e3:.2f}ms missed={self.missed_frames}"
+            f" dup={self.duplicate_steps} overrun={self.overruns}"
+        )
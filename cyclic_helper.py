@@ -1,55 +1,150 @@
 import math
-from numpy import sign
-from config import EMA_ALPHA
-from pid_calculator_new import PIDCalculatorNew
-from utils import EMA
+import config
+from gains import changed_gains, merge_gains
+from pid_bank import PIDBank
+from position_history import PositionHistory
+from utils import EMA, clamp, sign
+
+
+# 默认增益（PIDBank.add 参数）；可由增益文件按名称覆盖，见 gains.py
+DEFAULT_GAINS = {
+    "right_offset_pid": dict(Kp_base=0.0007, Ki=0.0001, Kd=0.01, integral_max=0.001, integral_leak=0.01, skip=2, max_auth=0.01),
+    "right_v_pid": dict(Kp_base=0.04, Ki=0.06, Kd=0.2, integral_max=0.08, skip=3, max_auth=0.15),
+    "roll_pid": dict(Kp_base=0.7, Ki=0.02, Kd=0.06, integral_max=0.001, integral_leak=0.02, skip=4, max_auth=0.5),
+    "roll_rate_pid": dict(Kp_base=0.04, Ki=0.15, Kd=0.02, integral_max=0.08, integral_leak=0.001),
+    "forward_offset_pid": dict(Kp_base=0.01, Ki=0.0008, Kd=0.003, integral_max=0.01, integral_leak=0.01, skip=2, max_auth=2),
+    "forward_v_pid": dict(Kp_base=0.05, Ki=0.02, Kd=0.1, integral_max=0.17, skip=3, max_auth=0.25),
+    "pitch_pid": dict(Kp_base=0.85, Ki=0.02, Kd=0.03, integral_max=0.001, integral_leak=0.02, skip=4, max_auth=10.5),
+    "pitch_rate_pid": dict(Kp_base=0.18, Ki=0.03, Kd=0.04, integral_max=0.5, integral_leak=0.001, max_auth=0.5),
+    # 锚点悬停（HOVER_MODE = "anchor"）：相对锚点的位置误差（米） -> 目标速度（米/秒）
+    "right_anchor_pid": dict(Kp_base=0.15, Ki=0.01, Kd=0.0, adaptive_factor=0.0, integral_max=0.3, skip=2, max_auth=1.0),
+    "forward_anchor_pid": dict(Kp_base=0.15, Ki=0.01, Kd=0.0, adaptive_factor=0.0, integral_max=0.3, skip=2, max_auth=1.0),
+}
+
+# 非 PID 参数（档案 cyclic_params 段，见 profiles.py）：
+#   pitch_rate_ki  手动 -> 自动交接后俯仰角速度环使用的 Ki
+#   hover_pitch_rate_integral_max  悬停期间俯仰角速度环的积分限幅（非悬停时取 pitch_rate_pid.integral_max）
+DEFAULT_PARAMS = {
+    "pitch_rate_ki": 0.35,
+    "hover_pitch_rate_integral_max": 0.05,
+}
+
+# 悬停位置保持："delta" 每次外环更新后以当前位置为新参考（只抑制帧间位移，原方式）；
+# "anchor" 保持进入悬停时记录的绝对位置
+HOVER_MODES = ("delta", "anchor")
+
+# 位置误差限幅（米）：delta 为帧间位移，anchor 为相对锚点的偏离
+DELTA_LIMIT = 1.0
+ANCHOR_LIMIT = 5.0
 
 
 class CyclicHelper:
-    def __init__(self):
-        # 参数
-        self.dt = 0.02
-
+    def __init__(self, gains=None, hover_mode=None, params=None):
         # 状态
         self.target_pitch = 0.0
         self.last_pos_x = 0.0
         self.last_pos_y = 0.0
         self.last_pos_z = 0.0
 
-
-        self.right_offset_pid = PIDCalculatorNew(Kp_base=0.0007, Ki=0.0001, Kd=0.01, integral_max=0.001, integral_leak=0.01, skip=2, max_auth=0.01)
-        self.right_v_pid = PIDCalculatorNew(Kp_base=0.04, Ki=0.06, Kd=0.2, integral_max=0.08, skip=3, max_auth=0.15)
-        self.roll_pid = PIDCalculatorNew(Kp_base=0.7, Ki=0.02, Kd=0.06, integral_max=0.001, integral_leak=0.02, skip=4, max_auth=0.5)
-        self.roll_rate_pid = PIDCalculatorNew(Kp_base=0.04, Ki=0.15, Kd=0.02, integral_max=0.08, integral_leak=0.001)
-
-        self.forward_offset_pid = PIDCalculatorNew(Kp_base=0.01, Ki=0.0008, Kd=0.003, integral_max=0.01, integral_leak=0.01, skip=2, max_auth=2)
-        self.forward_v_pid = PIDCalculatorNew(Kp_base=0.05, Ki=0.02, Kd=0.1, integral_max=0.17, skip=3, max_auth=0.25)
-        self.pitch_pid = PIDCalculatorNew(Kp_base=0.85, Ki=0.02, Kd=0.03, integral_max=0.001, integral_leak=0.02, skip=4, max_auth=10.5)
-        self.pitch_rate_pid = PIDCalculatorNew(Kp_base=0.18, Ki=0.03, Kd=0.04, integral_max=0.5, integral_leak=0.001, max_auth=0.5)
-        
-        self.ema_cyclic_x = EMA(EMA_ALPHA)
-        self.ema_cyclic_y = EMA(EMA_ALPHA)
-
-        self.pitch_rate_ki = 0.35
+        # 悬停位置历史：进入悬停时以当前位置为锚点清空，悬停期间每拍记录（见 position_history.py）
+        self.history = PositionHistory(config.HOVER_HISTORY, box=config.HOVER_BOX)
+        # False 时不记录（锚点仍在进入悬停时设置，输出不受影响）；离线回放默认关闭
+        self.record_history = True
+
+        # 10 个 PID 共用一个 PIDBank，横/纵两路按级联层成对批量更新（位置层两组按悬停模式二选一）
+        self.pids = PIDBank()
+        gains = merge_gains(DEFAULT_GAINS, gains)
+        # 最近一次应用的增益表：重载时只应用变化的项
+        self._gains = gains
+        self.right_offset_pid = self.pids.add(**gains["right_offset_pid"])
+        self.right_v_pid = self.pids.add(**gains["right_v_pid"])
+        self.roll_pid = self.pids.add(**gains["roll_pid"])
+        self.roll_rate_pid = self.pids.add(**gains["roll_rate_pid"])
+
+        self.forward_offset_pid = self.pids.add(**gains["forward_offset_pid"])
+        self.forward_v_pid = self.pids.add(**gains["forward_v_pid"])
+        self.pitch_pid = self.pids.add(**gains["pitch_pid"])
+        self.pitch_rate_pid = self.pids.add(**gains["pitch_rate_pid"])
+
+        self.right_anchor_pid = self.pids.add(**gains["right_anchor_pid"])
+        self.forward_anchor_pid = self.pids.add(**gains["forward_anchor_pid"])
+
+        # 各级联层的 (横向, 纵向) 控制器索引；位置层按悬停模式选择，见 set_hover_mode
+        self.set_hover_mode(hover_mode or config.HOVER_MODE)
+        self._v_pids = (self.right_v_pid.index, self.forward_v_pid.index)
+        self._attitude_pids = (self.roll_pid.index, self.pitch_pid.index)
+        self._rate_pids = (self.roll_rate_pid.index, self.pitch_rate_pid.index)
+
+        self.ema_cyclic_x = EMA(config.EMA_ALPHA)
+        self.ema_cyclic_y = EMA(config.EMA_ALPHA)
+
+        params = dict(DEFAULT_PARAMS, **(params or {}))
+        self.pitch_rate_ki = params["pitch_rate_ki"]
+        self.hover_integral_max = params["hover_pitch_rate_integral_max"]
 
         self.prev_manual_active = False
         self.prev_manual_cyclic_y = 0.0
         self.prev_hovering_active = False
 
+    def set_hover_mode(self, mode: str):
+        """切换悬停位置保持方式（见 HOVER_MODES）；悬停中切换时位置层从零开始"""
+        if mode not in HOVER_MODES:
+            raise ValueError(f"unknown hover mode: {mode}")
+        self.hover_mode = mode
+        if mode == "anchor":
+            self._hold_pids = (self.right_anchor_pid, self.forward_anchor_pid)
+        else:
+            self._hold_pids = (self.right_offset_pid, self.forward_offset_pid)
+        self._offset_pids = tuple(pid.index for pid in self._hold_pids)
+        for pid in self._hold_pids:
+            pid.reset()
+
+    def set_gains(self, gains: dict):
+        """
+        原地更新各 PID 参数（gains 为完整增益表，见 profiles.parse_profile），保留积分等状态。
+        只应用与上次不同的项：档案中未改动的增益不覆盖运行中设置的值（如交接后的俯仰角速度 Ki）。
+        """
+        for name, params in changed_gains(self._gains, gains).items():
+            pid = getattr(self, name)
+            self.pids.configure(pid.index, **params)
+        self._gains = gains
+        # 悬停期间的俯仰角速度积分限幅由模式切换设置，重载后保持
+        if self.prev_hovering_active:
+            self.pitch_rate_pid.update_max_integral(self.hover_integral_max)
+
+    def set_params(self, params: dict):
+        """原地更新非 PID 参数（见 DEFAULT_PARAMS）；交接 Ki 已生效时随之换算，悬停中的积分限幅立即更新"""
+        ki = params["pitch_rate_ki"]
+        if ki != self.pitch_rate_ki and self.pitch_rate_pid.Ki == self.pitch_rate_ki:
+            self.pitch_rate_pid.update_ki(ki)
+        self.pitch_rate_ki = ki
+        self.hover_integral_max = params["hover_pitch_rate_integral_max"]
+        if self.prev_hovering_active:
+            self.pitch_rate_pid.update_max_integral(self.hover_integral_max)
 
     def update(self, motion_state, manual_cyclic_x=0.0, manual_cyclic_y=0.0, hovering=False):
         manual_active = abs(manual_cyclic_x) >= 0.05 or abs(manual_cyclic_y) >= 0.05
+        # 本帧实际间隔；外环使用跳过期间累计的真实时间（无累计时按名义倍数）
+        dt = motion_state.dt
 
         if not self.prev_hovering_active and hovering:
+            # 速度环只在悬停时更新，但姿态环每次更新都为其累计间隔：进入悬停时清零，首次更新不按整个非悬停期积分
+            self.right_v_pid.reset()
+            self.forward_v_pid.reset()
             self.pitch_rate_pid.reset()
-            self.pitch_rate_pid.update_max_integral(0.05)
+            self.pitch_rate_pid.update_max_integral(self.hover_integral_max)
             self.target_pitch = 0.0
+            self.history.reset(motion_state.x, motion_state.y, motion_state.z)
         elif self.prev_hovering_active and not hovering:
             self.forward_v_pid.reset()
             self.forward_offset_pid.reset()
             self.right_v_pid.reset()
             self.right_offset_pid.reset()
-            self.pitch_rate_pid.update_max_integral(0.5)
+            self.forward_anchor_pid.reset()
+            self.right_anchor_pid.reset()
+            self.pitch_rate_pid.update_max_integral(self._gains["pitch_rate_pid"]["integral_max"])
+        if hovering and self.record_history:
+            self.history.record(dt, motion_state)
 
         if not hovering:
             self.target_pitch = None
@@ -60,7 +155,7 @@ class CyclicHelper:
             self.pitch_rate_pid.manual_override(
                 error=motion_state.pitch_rate,
                 rate=None,
-                delta_time=self.dt,
+                delta_time=dt,
                 manual_input=self.ema_cyclic_y.y,
                 prev_error=motion_state.prev_pitch_rate,
                 skip=self.pitch_rate_pid.skip
@@ -68,40 +163,63 @@ class CyclicHelper:
             self.pitch_rate_pid.update_ki(self.pitch_rate_ki)
             self.roll_pid.reset()
 
-        forward_offset, right_offset, up_offset = motion_state.get_position_delta(self.last_pos_x, self.last_pos_y, self.last_pos_z)
-        if abs(forward_offset) > 1:
-            forward_offset = sign(forward_offset) * 1
-        if abs(right_offset) > 1:
-            right_offset = sign(right_offset) * 1
+        right_hold, forward_hold = self._hold_pids
+        if self.hover_mode == "anchor":
+            history = self.history
+            forward_offset, right_offset, up_offset = motion_state.get_position_delta(history.anchor_x, history.anchor_y, history.anchor_z)
+            forward_offset = clamp(forward_offset, -ANCHOR_LIMIT, ANCHOR_LIMIT)
+            right_offset = clamp(right_offset, -ANCHOR_LIMIT, ANCHOR_LIMIT)
+        else:
+            forward_offset, right_offset, up_offset = motion_state.get_position_delta(self.last_pos_x, self.last_pos_y, self.last_pos_z)
+            if abs(forward_offset) > DELTA_LIMIT:
+                forward_offset = sign(forward_offset) * DELTA_LIMIT
+            if abs(right_offset) > DELTA_LIMIT:
+                right_offset = sign(right_offset) * DELTA_LIMIT
 
         if not manual_active:
+            pids = self.pids
             if hovering:
-                if self.right_offset_pid.is_available() and self.forward_offset_pid.is_available():
-                    self.right_offset_pid.update(error=right_offset, rate=None, delta_time=self.dt * self.right_v_pid.skip * self.roll_pid.skip * self.right_offset_pid.skip)
-                    self.forward_offset_pid.update(error=forward_offset, rate=None, delta_time=self.dt * self.forward_v_pid.skip * self.pitch_pid.skip * self.forward_offset_pid.skip)
+                if pids.all_available(self._offset_pids):
+                    offset_dts = (
+                        right_hold.take_elapsed(dt * self.right_v_pid.skip * self.roll_pid.skip * right_hold.skip),
+                        forward_hold.take_elapsed(dt * self.forward_v_pid.skip * self.pitch_pid.skip * forward_hold.skip),
+                    )
+                    pids.update_many(self._offset_pids, (right_offset, forward_offset), offset_dts)
                     self.last_pos_x = motion_state.x
                     self.last_pos_y = motion_state.y
                     self.last_pos_z = motion_state.z
-                if self.right_v_pid.is_available() and self.forward_v_pid.is_available():
-                    self.right_v_pid.update(error=-motion_state.right_v + self.right_offset_pid.auto, rate=None, delta_time=self.dt * self.right_v_pid.skip * self.roll_pid.skip)
-                    self.right_offset_pid.update_skip()
-                    self.forward_v_pid.update(error=-motion_state.forward_v + self.forward_offset_pid.auto, rate=None, delta_time=self.dt * self.forward_v_pid.skip * self.pitch_pid.skip)
-                    self.forward_offset_pid.update_skip()
-            if self.roll_pid.is_available() and self.pitch_pid.is_available():
-                if abs(motion_state.roll) < 0.1 or hovering:
-                    self.roll_pid.update(error=-motion_state.roll + math.asin(self.right_v_pid.auto), rate=None, delta_time=self.dt * self.roll_pid.skip)
-                self.right_v_pid.update_skip()
-                if self.target_pitch is not None:
-                    self.pitch_pid.update(error=motion_state.pitch + math.asin(self.forward_v_pid.auto) - self.target_pitch, rate=None, delta_time=self.dt * self.pitch_pid.skip)
-                self.forward_v_pid.update_skip()
+                if pids.all_available(self._v_pids):
+                    v_dts = (
+                        self.right_v_pid.take_elapsed(dt * self.right_v_pid.skip * self.roll_pid.skip),
+                        self.forward_v_pid.take_elapsed(dt * self.forward_v_pid.skip * self.pitch_pid.skip),
+                    )
+                    v_errors = (
+                        -motion_state.right_v + right_hold.auto,
+                        -motion_state.forward_v + forward_hold.auto,
+                    )
+                    pids.update_many(self._v_pids, v_errors, v_dts)
+                    pids.update_skip_many(self._offset_pids, v_dts)
+            if pids.all_available(self._attitude_pids):
+                attitude_dts = (
+                    self.roll_pid.take_elapsed(dt * self.roll_pid.skip),
+                    self.pitch_pid.take_elapsed(dt * self.pitch_pid.skip),
+                )
+                roll_due = abs(motion_state.roll) < 0.1 or hovering
+                pitch_due = self.target_pitch is not None
+                attitude_errors = (
+                    -motion_state.roll + math.asin(self.right_v_pid.auto) if roll_due else 0.0,
+                    motion_state.pitch + math.asin(self.forward_v_pid.auto) - self.target_pitch if pitch_due else 0.0,
+                )
+                pids.update_many(self._attitude_pids, attitude_errors, attitude_dts, mask=(roll_due, pitch_due))
+                pids.update_skip_many(self._v_pids, attitude_dts)
             error_roll_rate = -motion_state.roll_rate + self.roll_pid.auto
-            sign_correction = sign(error_roll_rate)
-            self.roll_rate_pid.update(error=sign_correction * math.sqrt(abs(error_roll_rate)), rate=None, delta_time=self.dt)
             error_pitch_rate = motion_state.pitch_rate + self.pitch_pid.auto
-            sign_correction = sign(error_pitch_rate)
-            self.pitch_rate_pid.update(error=sign_correction * math.sqrt(abs(error_pitch_rate)), rate=None, delta_time=self.dt)
-            self.roll_pid.update_skip()
-            self.pitch_pid.update_skip()
+            rate_errors = (
+                sign(error_roll_rate) * math.sqrt(abs(error_roll_rate)),
+                sign(error_pitch_rate) * math.sqrt(abs(error_pitch_rate)),
+            )
+            pids.update_many(self._rate_pids, rate_errors, (dt, dt))
+            pids.update_skip_many(self._attitude_pids, (dt, dt))
 
         
         x_result = self.roll_rate_pid.auto
@@ -127,6 +245,8 @@ class CyclicHelper:
         self.forward_offset_pid.reset()
         self.forward_v_pid.reset()
         self.pitch_pid.reset()
+        self.right_anchor_pid.reset()
+        self.forward_anchor_pid.reset()
         # self.pitch_rate_pid.reset()
         self.last_pos_x = 0.0
         self.last_pos_y = 0.0
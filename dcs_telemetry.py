@@ -1,63 +1,272 @@
 import json
+import select
+import struct
 import time
 import socket
 import threading
 
+from instrumentation import Histogram
+from telemetry_protocol import FIELDS, decode_binary, is_binary_frame, peek_seq
+from telemetry_snapshot import (
+    IDX_FIELDS,
+    IDX_MODEL_TIME,
+    IDX_RECV_TIME,
+    IDX_SEQ,
+    TelemetryBuffer,
+    TelemetrySnapshot,
+)
 
-class DcsTelemetry(threading.Thread):
+
+# 序号为 u32（发送端逐帧加一，回绕）
+SEQ_MASK = 0xFFFFFFFF
+SEQ_HALF = 0x80000000
+
+# 乱序窗口：比最新序号落后不超过该值的帧计为乱序或重复；落后更多视为发送端重启（任务重开、Export 重载）
+REORDER_WINDOW = 64
+_WINDOW_MASK = (1 << REORDER_WINDOW) - 1
+
+# 解析失败的异常类型（计为 malformed）：OverflowError 如 Seq 为 1e999，RecursionError 如深层嵌套的 JSON
+_MALFORMED = (ValueError, TypeError, AttributeError, OverflowError, RecursionError, struct.error)
+
+# 接收缓冲池：一次唤醒最多取出的数据报数与单个数据报上限
+POOL_SIZE = 64
+UDP_BUF = 4096
+
+
+def open_socket(host, port, rcvbuf=0) -> socket.socket:
+    """绑定遥测 UDP 端口（非阻塞）；rcvbuf > 0 时设置 SO_RCVBUF（系统可能调整，实际值见 getsockopt）"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    if rcvbuf > 0:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+    sock.bind((host, port))
+    sock.setblocking(False)
+    return sock
+
+
+class DatagramPool:
+    """预分配的接收缓冲池：drain 以非阻塞 recv_into 取空 socket 中排队的数据报，不分配新缓冲"""
+
+    def __init__(self, count=POOL_SIZE, size=UDP_BUF):
+        self.bufs = [bytearray(size) for _ in range(count)]
+        self.views = [memoryview(b) for b in self.bufs]
+        self.packets = []
+
+    def drain(self, sock) -> list:
+        """返回本次取出的数据报（memoryview，下次 drain 前有效）；池满时其余留待下次"""
+        packets = self.packets
+        packets.clear()
+        views = self.views
+        for i, buf in enumerate(self.bufs):
+            try:
+                n = sock.recv_into(buf)
+            except (BlockingIOError, InterruptedError):
+                break
+            packets.append(views[i][:n])
+        return packets
+
+
+class TelemetryDecoder:
     """
-    接收 Export.lua 发来的 JSON 行（UDP），解析为最新状态。
+    遥测解析与发布（与传输方式无关）：自动识别两种格式——JSON 行，
+    或固定布局的二进制帧（见 telemetry_protocol）。
+    接收方每次唤醒取出全部排队的数据报交给 handle_batch（每个数据报一帧）：
+    每帧只读帧头序号去重计数——重复帧与迟到的乱序帧只计数，跳号计为丢失；
+    通过检查的帧中只有最新一帧完整解析并发布，其余计为 superseded（可经 frame_sink 转交记录）。
+    不带序号的 JSON 帧（旧版 Export.lua）按到达顺序视为最新。
+    最新状态写入预分配的双缓冲，控制循环通过 read_into 无锁读取；
+    每次唤醒的解析耗时（纳秒）计入 parse_hist。
+    DcsTelemetry（接收线程）与 async_runtime.TelemetryProtocol（asyncio）共用。
     """
 
-    UDP_BUF = 4096
+    def __init__(self):
+        # 最近一次状态：双缓冲快照，接收方原地填充（缺失字段沿用上一帧）
+        self.buffer = TelemetryBuffer()
 
-    def __init__(self, host, port):
-        super().__init__(daemon=True)
-        self.host = host
-        self.port = port
+        # 解析耗时直方图（仅接收方写）
+        self.parse_hist = Histogram()
+
+        # 计数（自启动累计，仅接收方写）
+        self.frames = 0
+        self.superseded = 0
+        self.lost = 0
+        self.duplicates = 0
+        self.reordered = 0
+        self.malformed = 0
+        self.resets = 0
+        self.last_error = ""
+
+        # 可选：frame_sink(packet, recv_time) 按到达顺序收到每个通过序号检查的帧（含未解析的），
+        # 在接收方调用，packet 仅在调用期间有效
+        self.frame_sink = None
+
+        # 最新序号与其之前 REORDER_WINDOW 个序号的到达位图（bit k 对应 last_seq - k）
+        self._last_seq = None
+        self._seen = 0
+        self._admitted = []
+
+    def handle_packet(self, packet, t0: int):
+        """单个数据报，见 handle_batch"""
+        self.handle_batch((packet,), t0)
+
+    def handle_batch(self, packets, t0: int):
+        """
+        packets：一次唤醒取出的数据报（按到达顺序）；t0：取包时的 perf_counter_ns，作为 RecvTime。
+        最新一帧解析失败时退回前一帧。
+        """
+        recv_time = t0 * 1e-9
+        sink = self.frame_sink
+        admitted = self._admitted
+        for packet in packets:
+            try:
+                seq = peek_seq(packet)
+            except _MALFORMED as e:
+                self._count_malformed(e)
+                continue
+            if seq is None:
+                self.frames += 1
+            elif not self._accept(seq):
+                continue
+            admitted.append(packet)
+            if sink is not None:
+                sink(packet, recv_time)
+
+        n = len(admitted)
+        while n:
+            n -= 1
+            try:
+                self._decode(admitted[n], recv_time)
+                break
+            except _MALFORMED as e:
+                self._count_malformed(e)
+        self.superseded += n
+        admitted.clear()
+        self.parse_hist.record(time.perf_counter_ns() - t0)
+
+    def _count_malformed(self, e):
+        self.malformed += 1
+        self.last_error = f"{type(e).__name__}: {e}"
+
+    def _accept(self, seq: int) -> bool:
+        """按序号决定是否发布本帧，并更新丢失/重复/乱序计数"""
+        self.frames += 1
+        last = self._last_seq
+        if last is None:
+            self._sync(seq)
+            return True
+
+        ahead = (seq - last) & SEQ_MASK
+        if ahead == 0:
+            self.duplicates += 1
+            return False
+        if ahead < SEQ_HALF:
+            # 跳过的序号先计为丢失，迟到后再改计乱序
+            self.lost += ahead - 1
+            self._seen = ((self._seen << ahead) | 1) & _WINDOW_MASK if ahead < REORDER_WINDOW else 1
+            self._last_seq = seq
+            return True
+
+        behind = (last - seq) & SEQ_MASK
+        if behind < REORDER_WINDOW:
+            bit = 1 << behind
+            if self._seen & bit:
+                self.duplicates += 1
+            else:
+                self._seen |= bit
+                self.reordered += 1
+                self.lost -= 1
+            return False
+
+        self.resets += 1
+        self._sync(seq)
+        return True
+
+    def _sync(self, seq: int):
+        # 同步点之前的序号一律视为已到达：迟到的旧帧计为重复，不会把丢失数减成负数
+        self._last_seq = seq
+        self._seen = _WINDOW_MASK
+
+    def _decode(self, packet, recv_time):
+        """完整解析一帧并发布（序号已检查）"""
+        back = self.buffer.back()
+        if is_binary_frame(packet):
+            seq, model_time, values = decode_binary(packet)
+            back[IDX_SEQ] = seq
+            back[IDX_MODEL_TIME] = model_time
+            back[IDX_RECV_TIME] = recv_time
+            i = IDX_FIELDS
+            for v in values:
+                back[i] = v
+                i += 1
+        else:
+            # 一个数据报含多行时取最后一行
+            line = bytes(packet).decode("utf-8", errors="ignore").rstrip().rpartition("\n")[2]
+            obj = json.loads(line)
+            prev = self.buffer.front
+            back[IDX_SEQ] = int(obj.get("Seq", 0)) & SEQ_MASK
+            back[IDX_MODEL_TIME] = float(obj.get("ModelTime", 0.0))
+            back[IDX_RECV_TIME] = recv_time
+            i = IDX_FIELDS
+            for k in FIELDS:
+                back[i] = float(obj.get(k, prev[i]))
+                i += 1
+        self._publish()
 
-        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self.sock.bind((self.host, self.port))
-
-        # 最近一次状态（兼容缺失字段）
-        self.latest = {
-            "Vx": 0.0,
-            "Vy": 0.0,
-            "Vz": 0.0,
-            "Ax": 0.0,
-            "Ay": 0.0,
-            "Az": 0.0,
-            "Pitch": 0.0,
-            "Roll": 0.0,
-            "Yaw": 0.0,
-            "PitchRate": 0.0,
-            "RollRate": 0.0,
-            "YawRate": 0.0,
-            "PosX": 0.0,
-            "PosY": 0.0,
-            "PosZ": 0.0,
-            "t": time.time(),
+    def stats(self) -> dict:
+        """接收统计（自启动累计）；published 为已发布帧数，superseded 为同批中被更新帧取代、未解析的帧数"""
+        return {
+            "frames": self.frames,
+            "published": self.buffer.generation,
+            "superseded": self.superseded,
+            "lost": self.lost,
+            "duplicates": self.duplicates,
+            "reordered": self.reordered,
+            "malformed": self.malformed,
+            "resets": self.resets,
+            "last_seq": self._last_seq,
+            "last_error": self.last_error,
         }
 
-        self._expected_keys = set(self.latest.keys())
+    def _publish(self):
+        self.buffer.publish()
+
+    def read_into(self, snapshot: TelemetrySnapshot) -> bool:
+        """将最新帧复制到调用方预分配的快照，返回是否为新帧"""
+        return self.buffer.read_into(snapshot)
+
+    @property
+    def latest(self) -> dict:
+        """最新状态的字典副本（调试用；控制循环请使用 read_into）"""
+        snapshot = TelemetrySnapshot()
+        self.buffer.read_into(snapshot)
+        return snapshot.as_dict()
+
+
+class DcsTelemetry(TelemetryDecoder, threading.Thread):
+    """
+    接收线程：select 等待 Export.lua 发来的 UDP 遥测，唤醒后一次取空排队的数据报交给 handle_batch。
+    RecvTime 使用 time.perf_counter，在唤醒时立即打点（不含解析耗时）。
+    """
+
+    def __init__(self, host, port, rcvbuf=0):
+        threading.Thread.__init__(self, daemon=True)
+        TelemetryDecoder.__init__(self)
+        self.host = host
+        self.port = port
+
+        self.sock = open_socket(host, port, rcvbuf)
+        self.rcvbuf = self.sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
 
     def run(self):
+        # 预分配接收缓冲池，避免每包分配 bytes
+        pool = DatagramPool()
+        sock = self.sock
         while True:
             try:
-                data, _ = self.sock.recvfrom(self.UDP_BUF)
-                text = data.decode("utf-8", errors="ignore")
-                for line in text.splitlines():
-                    if not line:
-                        continue
-                    obj = json.loads(line)
-                    self._fill_defaults(obj)
-                    obj["t"] = time.time()
-                    self.latest = obj
-            except Exception:
-                # 忽略异常，继续接收
-                pass
-
-    def _fill_defaults(self, obj: dict):
-        for k in self._expected_keys:
-            if k not in obj:
-                obj[k] = self.latest.get(k, 0.0)
+                select.select((sock,), (), ())
+                t0 = time.perf_counter_ns()
+                packets = pool.drain(sock)
+                if packets:
+                    self.handle_batch(packets, t0)
+            except OSError as e:
+                # Windows 上对端端口不可达（ICMP）会使 recv 报错，继续接收
+                self.last_error = f"{type(e).__name__}: {e}"
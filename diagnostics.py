@@ -0,0 +1,240 @@
+"""
+诊断输出通道：控制线程按抽取率把原始数值样本拷入预分配环形缓冲（不格式化字符串、不碰 stdout，
+满则丢弃并计数），后台线程取出样本交给各输出端：
+  ConsoleSink  按间隔打印一行状态（原每秒调试行）及延迟统计报告
+  UdpSink      每个样本一条 JSON（便于 PlotJuggler 等实时绘图工具订阅）
+  CsvSink      每个样本一行 CSV
+"""
+import json
+import math
+import socket
+import threading
+import time
+
+# 样本列（顺序即 push 写入顺序）；目标值为 None 时记为 NaN，调度统计为该样本窗口内的值，
+# Tel* 为遥测接收计数（自启动累计，见 dcs_telemetry.TelemetryDecoder），
+# Hover* 为悬停期间最近 HOVER_WINDOW 秒的位置统计（见 position_history.py，非悬停时为 NaN）
+DIAG_FIELDS = (
+    "Time",
+    "Vf", "Vr", "Af", "Ar",
+    "Pitch", "Roll", "Yaw",
+    "PitchRate", "RollRate", "YawRate",
+    "X", "Y", "Z",
+    "TargetYaw", "TargetPitch",
+    "CyclicX", "CyclicY", "Rudder",
+    "CyclicMode", "RudderEnabled",
+    "SchedSteps", "SchedJitterSum", "SchedJitterMax", "SchedMissed", "SchedDup", "SchedOverrun",
+    "Stale", "TelLost", "TelDup", "TelReorder", "TelMalformed",
+    "HoverDrift", "HoverRms", "HoverMax", "HoverInBox",
+)
+_NAN = float("nan")
+_NO_HOVER = (_NAN,) * 4
+
+# 悬停统计窗口（秒）
+HOVER_WINDOW = 10.0
+
+
+class DiagnosticsChannel(threading.Thread):
+    """
+    控制线程每拍调用 push(core, scheduler, now)，每 decimation 拍写入一个样本；
+    后台线程每 interval 秒取出全部样本依次交给 sinks。
+    """
+
+    def __init__(self, sinks, decimation=5, capacity=256, interval=0.1):
+        super().__init__(daemon=True)
+        self.sinks = list(sinks)
+        self.decimation = max(1, int(decimation))
+        self.capacity = capacity
+        self.interval = interval
+        self.ncols = len(DIAG_FIELDS)
+
+        # 单生产者/单消费者环形缓冲：head 由控制线程推进，tail 由输出线程推进
+        self._ring = [0.0] * (capacity * self.ncols)
+        self._head = 0
+        self._tail = 0
+        self._tick = 0
+        self.dropped = 0
+        self.sink_errors = 0
+
+        self._stop_event = threading.Event()
+
+    # -------------------------------
+    # 控制线程
+    # -------------------------------
+    def push(self, core, scheduler, now):
+        self._tick += 1
+        if self._tick < self.decimation:
+            return
+        self._tick = 0
+
+        head = self._head
+        if head - self._tail >= self.capacity:
+            self.dropped += 1
+            return
+
+        ms = core.motion_state
+        tel = scheduler.telemetry
+        if core.cyclic_enabled and core.cyclic_hovering:
+            box = core.cyclic_helper.history.box_stats(HOVER_WINDOW)
+            hover = (core.cyclic_helper.history.drift(HOVER_WINDOW)[1], box["rms"], box["max"], box["in_box"])
+        else:
+            hover = _NO_HOVER
+        target_yaw = core.rudder_helper.target_yaw
+        target_pitch = core.cyclic_helper.target_pitch
+        i = (head % self.capacity) * self.ncols
+        self._ring[i:i + self.ncols] = (
+            now,
+            ms.forward_v, ms.right_v, ms.forward_acc, ms.right_acc,
+            ms.pitch, ms.roll, ms.yaw,
+            ms.pitch_rate, ms.roll_rate, ms.yaw_rate,
+            ms.x, ms.y, ms.z,
+            _NAN if target_yaw is None else target_yaw,
+            _NAN if target_pitch is None else target_pitch,
+            core.cyclic_x, core.cyclic_y, core.rudder,
+            core.cyclic_mode, core.rudder_enabled,
+        ) + scheduler.take_stats() + (core.stale, tel.lost, tel.duplicates, tel.reordered, tel.malformed) + hover
+        self._head = head + 1
+
+    # -------------------------------
+    # 输出线程
+    # -------------------------------
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.drain()
+        self.drain()
+
+    def drain(self):
+        """取出环形缓冲中的全部样本交给 sinks（输出线程，或 asyncio 运行时的执行器线程）"""
+        head, tail = self._head, self._tail
+        ncols, capacity = self.ncols, self.capacity
+        ring = self._ring
+        rows = []
+        while tail < head:
+            i = (tail % capacity) * ncols
+            rows.append(tuple(ring[i:i + ncols]))
+            tail += 1
+        self._tail = tail
+
+        for sink in self.sinks:
+            try:
+                sink.write(rows)
+            except Exception:
+                # 输出端故障不影响其他输出端与控制循环
+                self.sink_errors += 1
+
+    def close(self):
+        self._stop_event.set()
+        if self.is_alive():
+            self.join()
+        else:
+            self.drain()
+        for sink in self.sinks:
+            sink.close()
+
+
+class ConsoleSink:
+    """
+    每 interval 秒打印一行：最新样本的运动状态与目标值、该区间内的调度统计与遥测接收计数；
+    挂载 instruments 时每 report_interval 秒追加延迟统计报告，丢弃计数非零时一并报告。
+    """
+
+    def __init__(self, interval=1.0, scheduler_mode="", instruments=None, report_interval=10.0, channel=None):
+        self.interval = interval
+        self.scheduler_mode = scheduler_mode
+        self.instruments = instruments
+        self.report_interval = report_interval
+        self.channel = channel
+        self._last_line = None
+        self._last_report = time.perf_counter()
+        self._sched = [0, 0.0, 0.0, 0, 0, 0]
+
+    def write(self, rows):
+        sched = self._sched
+        for row in rows:
+            sched[0] += row[21]
+            sched[1] += row[22]
+            sched[2] = max(sched[2], row[23])
+            sched[3] += row[24]
+            sched[4] += row[25]
+            sched[5] += row[26]
+            t = row[0]
+            if self._last_line is None:
+                self._last_line = t
+            elif t - self._last_line >= self.interval:
+                self._last_line = t
+                print(self.format(row))
+                self._sched = sched = [0, 0.0, 0.0, 0, 0, 0]
+
+        now = time.perf_counter()
+        if self.instruments is not None and now - self._last_report >= self.report_interval:
+            self._last_report = now
+            print(self.instruments.report())
+            if self.channel is not None and (self.channel.dropped or self.channel.sink_errors):
+                print(f"Diagnostics dropped={self.channel.dropped} sink_errors={self.channel.sink_errors}")
+
+    def format(self, row) -> str:
+        (
+            _t, vf, vr, af, ar, pitch, roll, yaw, pitch_rate, roll_rate, yaw_rate, x, y, z,
+            target_yaw, target_pitch, *_rest,
+        ) = row
+        stale, lost, dup_frames, reordered, malformed = row[27:32]
+        drift, rms, max_offset, in_box = row[32:36]
+        steps, jitter_sum, jitter_max, missed, dup, overrun = self._sched
+        targets = []
+        if not math.isnan(target_yaw):
+            targets.append(f"TargetYaw={target_yaw:+.2f}")
+        if not math.isnan(target_pitch):
+            targets.append(f"TargetPitch={target_pitch:+.2f}")
+        mean_jitter = jitter_sum / steps if steps else 0.0
+        return (
+            f" Vf={vf:+.2f} Vr={vr:+.2f} | Af={af:+.2f} Ar={ar:+.2f} |"
+            f" Pitch={pitch:+.2f} Roll={roll:+.2f} Yaw={yaw:+.2f} |"
+            f" PitchRate={pitch_rate:+.2f} RollRate={roll_rate:+.2f} YawRate={yaw_rate:+.2f} |"
+            f" X={x:+.1f} Y={y:+.1f} Z={z:+.1f} | {' '.join(targets)} |"
+            f" Sched[{self.scheduler_mode}] steps={steps:.0f} jitter={mean_jitter * 1e3:.2f}ms"
+            f" max={jitter_max * 1e3:.2f}ms missed={missed:.0f} dup={dup:.0f} overrun={overrun:.0f} |"
+            f" Tel lost={lost:.0f} dup={dup_frames:.0f} reorder={reordered:.0f} bad={malformed:.0f}"
+            + ("" if math.isnan(rms) else
+               f" | Hover drift={drift:.2f}m/s rms={rms:.2f}m max={max_offset:.2f}m box={in_box * 100:.0f}%")
+            + (" STALE" if stale else "")
+        )
+
+    def close(self):
+        pass
+
+
+class UdpSink:
+    """每个样本发送一个 JSON 对象（键同 DIAG_FIELDS，NaN 记为 null）"""
+
+    def __init__(self, host, port):
+        self.addr = (host, port)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def write(self, rows):
+        for row in rows:
+            obj = {k: (None if v != v else v) for k, v in zip(DIAG_FIELDS, row)}
+            self.sock.sendto(json.dumps(obj, separators=(",", ":")).encode("utf-8"), self.addr)
+
+    def close(self):
+        self.sock.close()
+
+
+class CsvSink:
+    def __init__(self, path):
+        self.file = open(path, "w", encoding="utf-8")
+        self.file.write(",".join(DIAG_FIELDS) + "\n")
+
+    def write(self, rows):
+        if not rows:
+            return
+        self.file.writelines(",".join(f"{v:.6g}" for v in row) + "\n" for row in rows)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_address(text: str):
+    """"host:port" -> (host, port)"""
+    host, _, port = text.rpartition(":")
+    return host or "127.0.0.1", int(port)
@@ -0,0 +1,240 @@
+"""
+飞行记录器：每个控制步记录遥测帧、手动/处理后输入、各 PID 的误差/积分/输出与最终轴值。
+
+文件格式（小端）：
+  头部：magic "DHAREC1\\0"，version(u32)，列数(u32)，数据起始偏移(u64)，块行数(u32)，
+        随后为 UTF-8 JSON 列名数组，补齐到 8 字节边界
+  数据：定宽记录（每行 列数 x float64），行优先、连续存放，可直接内存映射
+  尾部（close 时写入）：块索引（每块首行的 Time，float64 x 块数），
+        以及 trailer：magic "DHAIDX\\0\\0"，行数(u64)，块数(u64)，索引偏移(u64)
+未正常关闭的文件（无 trailer）按文件长度推算行数，仍可读取。
+
+写入：控制线程只把数值拷入预分配环形缓冲（满则丢弃并计数，从不阻塞），
+后台线程批量落盘。读取：FlightRecording 以 NumPy 结构化视图暴露各列（零拷贝）。
+"""
+import json
+import mmap
+import struct
+import threading
+from array import array
+from bisect import bisect_right
+
+from pid_bank import PIDHandle
+from telemetry_snapshot import SNAPSHOT_FIELDS
+
+MAGIC = b"DHAREC1\0"
+INDEX_MAGIC = b"DHAIDX\0\0"
+VERSION = 1
+HEADER = struct.Struct("<8sIIQI4x")
+TRAILER = struct.Struct("<8sQQQ")
+
+
+def pid_names(helper):
+    """按 PIDBank 索引顺序返回 helper 中各 PID 的属性名"""
+    names = [None] * helper.pids.size
+    for name, value in vars(helper).items():
+        if isinstance(value, PIDHandle) and value.bank is helper.pids:
+            names[value.index] = name
+    return names
+
+
+def recorder_columns(core):
+    """AssistCore 的记录列名（顺序即记录顺序）"""
+    columns = ["Time", "Dt"]
+    columns += SNAPSHOT_FIELDS
+    columns += ["ManualX", "ManualY", "ManualRudder", "InputX", "InputY", "InputRudder"]
+    for prefix, helper in (("cyclic", core.cyclic_helper), ("rudder", core.rudder_helper)):
+        names = pid_names(helper)
+        for field in ("error", "integral", "output"):
+            columns += [f"{prefix}.{name}.{field}" for name in names]
+    columns += ["CyclicX", "CyclicY", "Rudder", "CyclicMode", "RudderEnabled", "HelperBlocked"]
+    return columns
+
+
+class FlightRecorder(threading.Thread):
+    """
+    后台飞行记录器。控制线程每步调用 record(core, now, dt)；
+    环形缓冲满时丢弃该步并累加 dropped，不阻塞控制循环。
+    """
+
+    def __init__(self, path, core, capacity=4096, chunk_rows=1024, flush_interval=0.25):
+        super().__init__(daemon=True)
+        self.path = path
+        self.columns = recorder_columns(core)
+        self.ncols = len(self.columns)
+        self.capacity = capacity
+        self.chunk_rows = chunk_rows
+        self.flush_interval = flush_interval
+
+        # 单生产者/单消费者环形缓冲：head 由控制线程推进，tail 由写盘线程推进
+        self._ring = [0.0] * (capacity * self.ncols)
+        self._head = 0
+        self._tail = 0
+        self.dropped = 0
+        self.rows_written = 0
+
+        self._chunk_times = []
+        self._stop_event = threading.Event()
+        self._file = open(path, "wb")
+        self._write_header()
+
+    def _write_header(self):
+        names = json.dumps(self.columns).encode("utf-8")
+        data_offset = HEADER.size + len(names)
+        data_offset += -data_offset % 8
+        self._file.write(HEADER.pack(MAGIC, VERSION, self.ncols, data_offset, self.chunk_rows))
+        self._file.write(names.ljust(data_offset - HEADER.size, b" "))
+
+    # -------------------------------
+    # 控制线程
+    # -------------------------------
+    def record(self, core, now, dt):
+        head = self._head
+        if head - self._tail >= self.capacity:
+            self.dropped += 1
+            return
+
+        ring = self._ring
+        i = (head % self.capacity) * self.ncols
+        ring[i] = now
+        ring[i + 1] = dt
+        i += 2
+        n = len(SNAPSHOT_FIELDS)
+        ring[i:i + n] = core.snapshot.values
+        i += n
+
+        inputs = core.inputs
+        ring[i:i + 6] = (
+            inputs.manual_cyclic_x, inputs.manual_cyclic_y, inputs.manual_rudder,
+            inputs.input_cyclic_x, inputs.input_cyclic_y, inputs.input_rudder,
+        )
+        i += 6
+
+        for bank in (core.cyclic_helper.pids, core.rudder_helper.pids):
+            n = bank.size
+            ring[i:i + n] = bank.prev_error
+            ring[i + n:i + 2 * n] = bank.error_integral
+            ring[i + 2 * n:i + 3 * n] = bank.auto
+            i += 3 * n
+
+        ring[i:i + 6] = (
+            core.cyclic_x, core.cyclic_y, core.rudder,
+            core.cyclic_mode, core.rudder_enabled, core.helper_blocked,
+        )
+        self._head = head + 1
+
+    # -------------------------------
+    # 写盘线程
+    # -------------------------------
+    def run(self):
+        while not self._stop_event.wait(self.flush_interval):
+            self._drain()
+        self._drain()
+
+    def _drain(self):
+        head, tail = self._head, self._tail
+        if head == tail:
+            return
+        ncols, capacity = self.ncols, self.capacity
+        while tail < head:
+            start = tail % capacity
+            count = min(head - tail, capacity - start)
+            rows = array("d", self._ring[start * ncols:(start + count) * ncols])
+            self._index_rows(rows, count)
+            self._file.write(rows.tobytes())
+            tail += count
+            self._tail = tail
+        self.rows_written = tail
+        self._file.flush()
+
+    def _index_rows(self, rows, count):
+        # 记录每个块首行的 Time，用于按时间定位
+        ncols, chunk_rows = self.ncols, self.chunk_rows
+        first = self._tail
+        for r in range(count):
+            if (first + r) % chunk_rows == 0:
+                self._chunk_times.append(rows[r * ncols])
+
+    def close(self):
+        self._stop_event.set()
+        if self.is_alive():
+            self.join()
+        else:
+            self._drain()
+        index_offset = self._file.tell()
+        self._file.write(array("d", self._chunk_times).tobytes())
+        self._file.write(TRAILER.pack(INDEX_MAGIC, self.rows_written, len(self._chunk_times), index_offset))
+        self._file.close()
+
+
+class FlightRecording:
+    """
+    只读打开记录文件（内存映射）。columns()/column(name) 返回 NumPy 视图，不复制数据；
+    iter_rows() 在未安装 NumPy 时逐行读取。
+    """
+
+    def __init__(self, path):
+        self._f = open(path, "rb")
+        self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, ncols, data_offset, chunk_rows = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"not a flight recording: {path}")
+        self.ncols = ncols
+        self.data_offset = data_offset
+        self.chunk_rows = chunk_rows
+        self.names = json.loads(bytes(self._mm[HEADER.size:data_offset]).decode("utf-8"))
+        self.row_size = 8 * ncols
+
+        size = len(self._mm)
+        trailer_magic = self._mm[size - TRAILER.size:size - TRAILER.size + 8] if size >= TRAILER.size else b""
+        if trailer_magic == INDEX_MAGIC:
+            _, self.nrows, nchunks, index_offset = TRAILER.unpack_from(self._mm, size - TRAILER.size)
+            self.chunk_times = array("d", self._mm[index_offset:index_offset + 8 * nchunks])
+        else:
+            # 未正常关闭：按长度推算，按需重建块索引
+            self.nrows = (size - data_offset) // self.row_size
+            time_col = self.names.index("Time")
+            self.chunk_times = array("d", (
+                struct.unpack_from("<d", self._mm, data_offset + r * self.row_size + 8 * time_col)[0]
+                for r in range(0, self.nrows, chunk_rows)
+            ))
+
+    def __len__(self):
+        return self.nrows
+
+    def columns(self):
+        """NumPy 结构化数组视图（按列名访问即为零拷贝的跨步视图）"""
+        import numpy as np
+
+        dtype = np.dtype([(name, "<f8") for name in self.names])
+        return np.frombuffer(self._mm, dtype=dtype, count=self.nrows, offset=self.data_offset)
+
+    def column(self, name):
+        return self.columns()[name]
+
+    def row_range(self, t0, t1):
+        """返回 Time 落在 [t0, t1) 的行区间 (start, stop)，先用块索引再在块内查找"""
+        return self._find_row(t0), self._find_row(t1)
+
+    def _find_row(self, t):
+        chunk = max(bisect_right(self.chunk_times, t) - 1, 0)
+        lo = chunk * self.chunk_rows
+        hi = min(lo + self.chunk_rows, self.nrows)
+        time_col = 8 * self.names.index("Time")
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if struct.unpack_from("<d", self._mm, self.data_offset + mid * self.row_size + time_col)[0] < t:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def iter_rows(self, start=0, stop=None):
+        stop = self.nrows if stop is None else min(stop, self.nrows)
+        row = struct.Struct(f"<{self.ncols}d")
+        for r in range(start, stop):
+            yield row.unpack_from(self._mm, self.data_offset + r * self.row_size)
+
+    def close(self):
+        self._mm.close()
+        self._f.close()
@@ -0,0 +1,70 @@
+"""
+控制器增益文件：{"cyclic": {PID 名: {参数: 值}}, "rudder": {...}}。
+PID 名与 CyclicHelper/RudderHelper 的属性名一致，参数同 PIDBank.add；
+文件中只需列出要覆盖的项，其余取各 helper 的 DEFAULT_GAINS。
+"""
+import json
+
+# PIDBank.add 接受的参数
+GAIN_PARAMS = (
+    "Kp_base", "Ki", "Kd", "adaptive_factor", "max_auth",
+    "integral_max", "integral_leak", "skip", "stable_threshold",
+)
+
+
+def merge_gains(defaults: dict, overrides: dict = None) -> dict:
+    """在 defaults（{PID 名: {参数: 值}}）上叠加 overrides，返回新字典；未知名称/参数抛 ValueError"""
+    merged = {name: dict(params) for name, params in defaults.items()}
+    for name, params in (overrides or {}).items():
+        if name not in merged:
+            raise ValueError(f"unknown controller: {name}")
+        for key, value in params.items():
+            if key not in GAIN_PARAMS:
+                raise ValueError(f"unknown gain parameter: {name}.{key}")
+            merged[name][key] = int(value) if key == "skip" else float(value)
+    return merged
+
+
+def changed_gains(old: dict, new: dict) -> dict:
+    """new 中与 old 取值不同的项（{PID 名: {参数: 值}}），old 为 None 时返回全部"""
+    if old is None:
+        return new
+    changed = {}
+    for name, params in new.items():
+        before = old.get(name, {})
+        diff = {key: value for key, value in params.items() if before.get(key) != value}
+        if diff:
+            changed[name] = diff
+    return changed
+
+
+def load_gains(path) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError("gain file root must be an object")
+    return data
+
+
+def save_gains(path, gains: dict):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(gains, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+def flatten_gains(gains: dict) -> dict:
+    """{"cyclic": {"roll_pid": {"Kp_base": 0.7}}} -> {"cyclic.roll_pid.Kp_base": 0.7}"""
+    return {
+        f"{helper}.{name}.{key}": value
+        for helper, pids in gains.items()
+        for name, params in pids.items()
+        for key, value in params.items()
+    }
+
+
+def unflatten_gains(flat: dict) -> dict:
+    gains = {}
+    for path, value in flat.items():
+        helper, name, key = path.split(".")
+        gains.setdefault(helper, {}).setdefault(name, {})[key] = value
+    return gains
@@ -0,0 +1,402 @@
+"""
+简易直升机飞行动力学模拟器（6 自由度刚体），用于在没有 DCS 的环境下闭环测试辅助控制。
+
+坐标与符号约定（与 Export.lua 导出一致）：
+  世界坐标 x=北, y=上, z=东；姿态 pitch 抬头为正，roll 右滚为正，yaw 为自北顺时针航向
+  机体角速度 p(右滚), q(抬头), r(右偏)；导出 RollRate=p，PitchRate=q，YawRate=-r
+  操纵：cyclic_x 正=右压杆，cyclic_y 正=前推杆（低头），rudder 正=右舵（右偏）
+  Vx/Vy/Vz 为世界系速度；Ax/Ay/Az 为世界系比力（静止悬停时 Ay≈+g），单位 m/s²
+
+模型：主旋翼拉力沿机体竖轴（默认由高度保持律给出，等效自动总距），机体系线性阻力，
+操纵力矩 + 角速度阻尼 + 速度稳定性导数，含陀螺耦合项；风为常值 + 一阶 Gauss-Markov 阵风。
+
+用法：
+  python heli_sim.py soak [--hours 1] [--cyclic-mode 2] [--rudder] [--wind N E] [--gust SIGMA] [--seed 1]
+  python heli_sim.py serve [--format binary] [--rate 50] [--command-port 28778]
+"""
+import argparse
+import math
+import random
+import socket
+import struct
+import sys
+import time
+from array import array
+
+from kinematics import BodyFrame
+from telemetry_protocol import encode_binary, encode_json
+from telemetry_snapshot import IDX_FIELDS, IDX_MODEL_TIME, IDX_RECV_TIME, IDX_SEQ, TelemetrySnapshot
+
+G = 9.80665
+
+# serve 模式下接收操纵指令的 UDP 包：cyclic_x, cyclic_y, rudder（float32，小端）
+COMMAND = struct.Struct("<3f")
+
+
+class HeliParams:
+    """
+    机体参数（默认值近似中型通用直升机，量级参考 UH-1H）。
+    力矩导数单位：N·m / 操纵量 或 N·m / (rad/s) 或 N·m / (m/s)；阻力单位 N / (m/s)。
+    """
+
+    def __init__(
+        self,
+        mass=4000.0,
+        Ixx=6000.0,
+        Iyy=24000.0,
+        Izz=20000.0,
+        L_lat=14000.0,
+        M_lon=30000.0,
+        N_ped=30000.0,
+        L_p=-30000.0,
+        M_q=-60000.0,
+        N_r=-24000.0,
+        L_v=-600.0,
+        M_u=900.0,
+        N_v=400.0,
+        drag_forward=250.0,
+        drag_right=500.0,
+        drag_up=1500.0,
+        trim=(0.0, 0.0, 0.0),
+        altitude_kp=0.5,
+        altitude_kd=1.0,
+    ):
+        self.mass = mass
+        self.Ixx = Ixx
+        self.Iyy = Iyy
+        self.Izz = Izz
+        # 操纵力矩
+        self.L_lat = L_lat
+        self.M_lon = M_lon
+        self.N_ped = N_ped
+        # 角速度阻尼
+        self.L_p = L_p
+        self.M_q = M_q
+        self.N_r = N_r
+        # 速度稳定性：侧滑 -> 滚转 / 前飞 -> 抬头 / 侧滑 -> 风标偏航
+        self.L_v = L_v
+        self.M_u = M_u
+        self.N_v = N_v
+        # 机体系线性阻力
+        self.drag_forward = drag_forward
+        self.drag_right = drag_right
+        self.drag_up = drag_up
+        # 配平所需的操纵量（输出减去 trim 才产生力矩，用于检验积分器）
+        self.trim = trim
+        # 自动总距（高度保持）增益，单位 1/s² 与 1/s
+        self.altitude_kp = altitude_kp
+        self.altitude_kd = altitude_kd
+
+
+class HeliSim:
+    """
+    锁步模拟器：step(cyclic_x, cyclic_y, rudder, dt) 推进 dt 秒（内部按 max_substep 细分），
+    随后 values() / fill_snapshot() 给出与 DcsTelemetry 完全相同字段的遥测。
+    collective 为 None 时由高度保持律给出拉力，否则为拉力/悬停拉力之比。
+    """
+
+    def __init__(
+        self,
+        params: HeliParams = None,
+        wind=(0.0, 0.0, 0.0),
+        gust_sigma=0.0,
+        gust_tau=2.0,
+        seed=None,
+        max_substep=0.005,
+        position=(0.0, 100.0, 0.0),
+        yaw=0.0,
+    ):
+        self.params = params or HeliParams()
+        self.wind = tuple(wind)
+        self.gust_sigma = gust_sigma
+        self.gust_tau = gust_tau
+        self.rng = random.Random(seed)
+        self.max_substep = max_substep
+        self.collective = None
+        self.frame = BodyFrame()
+        self.reset(position, yaw)
+
+    def reset(self, position=(0.0, 100.0, 0.0), yaw=0.0):
+        self.time = 0.0
+        self.seq = 0
+        # 世界系位置/速度/比力
+        self.x, self.y, self.z = position
+        self.vx = self.vy = self.vz = 0.0
+        self.ax, self.ay, self.az = 0.0, G, 0.0
+        # 姿态与机体角速度
+        self.pitch = self.roll = 0.0
+        self.yaw = yaw % (2 * math.pi)
+        self.p = self.q = self.r = 0.0
+        # 阵风状态（世界系）
+        self.gust_x = self.gust_y = self.gust_z = 0.0
+        self.altitude_ref = self.y
+        self.frame.set_attitude(self.pitch, self.roll, self.yaw)
+
+    def set_wind(self, north, up, east):
+        self.wind = (north, up, east)
+
+    def step(self, cyclic_x, cyclic_y, rudder, dt):
+        n = max(1, math.ceil(dt / self.max_substep - 1e-9))
+        h = dt / n
+        for _ in range(n):
+            self._substep(cyclic_x, cyclic_y, rudder, h)
+
+    def _substep(self, cyclic_x, cyclic_y, rudder, h):
+        P = self.params
+        frame = self.frame
+
+        # 阵风（一阶 Gauss-Markov，竖直分量减半）
+        if self.gust_sigma > 0.0:
+            decay = h / self.gust_tau
+            spread = self.gust_sigma * math.sqrt(2.0 * decay)
+            gauss = self.rng.gauss
+            self.gust_x += -self.gust_x * decay + spread * gauss(0.0, 1.0)
+            self.gust_y += -self.gust_y * decay + 0.5 * spread * gauss(0.0, 1.0)
+            self.gust_z += -self.gust_z * decay + spread * gauss(0.0, 1.0)
+
+        # 相对空气速度（机体系 前/右/上）
+        wind_x, wind_y, wind_z = self.wind
+        u, v, w = frame.world_to_body(
+            self.vx - wind_x - self.gust_x,
+            self.vy - wind_y - self.gust_y,
+            self.vz - wind_z - self.gust_z,
+        )
+
+        # 角运动：操纵 + 阻尼 + 速度稳定性 + 陀螺耦合
+        trim_x, trim_y, trim_rudder = P.trim
+        p, q, r = self.p, self.q, self.r
+        L = P.L_lat * (cyclic_x - trim_x) + P.L_p * p + P.L_v * v
+        M = -P.M_lon * (cyclic_y - trim_y) + P.M_q * q + P.M_u * u
+        N = P.N_ped * (rudder - trim_rudder) + P.N_r * r + P.N_v * v
+        p += h * (L - (P.Izz - P.Iyy) * q * r) / P.Ixx
+        q += h * (M - (P.Ixx - P.Izz) * r * p) / P.Iyy
+        r += h * (N - (P.Iyy - P.Ixx) * p * q) / P.Izz
+        self.p, self.q, self.r = p, q, r
+
+        # 欧拉角运动学
+        sin_roll, cos_roll = math.sin(self.roll), math.cos(self.roll)
+        cos_pitch = max(math.cos(self.pitch), 1e-3)
+        qr = q * sin_roll + r * cos_roll
+        self.roll += h * (p + qr * math.tan(self.pitch))
+        self.pitch += h * (q * cos_roll - r * sin_roll)
+        self.yaw = (self.yaw + h * qr / cos_pitch) % (2 * math.pi)
+        self.roll = (self.roll + math.pi) % (2 * math.pi) - math.pi
+        frame.set_attitude(self.pitch, self.roll, self.yaw)
+
+        # 拉力：自动总距按高度误差给出所需竖直力，再按机体竖轴倾斜修正
+        m = P.mass
+        if self.collective is None:
+            up_accel = G + P.altitude_kp * (self.altitude_ref - self.y) - P.altitude_kd * self.vy
+            thrust = m * up_accel / max(frame.m21, 0.5)
+        else:
+            thrust = m * G * self.collective
+
+        # 合力（比力 = 气动力 / 质量，世界系）
+        fx, fy, fz = frame.body_to_world(-P.drag_forward * u, -P.drag_right * v, thrust - P.drag_up * w)
+        self.ax, self.ay, self.az = fx / m, fy / m, fz / m
+        self.vx += h * self.ax
+        self.vy += h * (self.ay - G)
+        self.vz += h * self.az
+        self.x += h * self.vx
+        self.y += h * self.vy
+        self.z += h * self.vz
+        self.time += h
+
+    # -------------------------------
+    # 遥测输出
+    # -------------------------------
+    def values(self):
+        """按 telemetry_protocol.FIELDS 顺序返回当前遥测"""
+        return (
+            self.vx, self.vy, self.vz,
+            self.ax, self.ay, self.az,
+            self.pitch, self.roll, self.yaw,
+            self.q, self.p, -self.r,
+            self.x, self.y, self.z,
+        )
+
+    def fill_snapshot(self, snapshot: TelemetrySnapshot, recv_time=None):
+        """原地写入快照（同 DcsTelemetry 发布一帧），generation 加一"""
+        self.seq += 1
+        values = snapshot.values
+        values[IDX_SEQ] = self.seq
+        values[IDX_MODEL_TIME] = self.time
+        values[IDX_RECV_TIME] = self.time if recv_time is None else recv_time
+        values[IDX_FIELDS:] = array("d", self.values())
+        snapshot.generation += 1
+
+    def encode(self, fmt="binary") -> bytes:
+        """按 Export.lua 格式打包当前状态（会递增 seq）"""
+        self.seq += 1
+        if fmt == "binary":
+            return encode_binary(self.seq, self.time, self.values())
+        return encode_json(self.values(), self.seq, self.time)
+
+
+def soak(
+    duration=3600.0,
+    dt=0.02,
+    cyclic_mode=2,
+    rudder_enabled=True,
+    sim: HeliSim = None,
+    core=None,
+    recorder=None,
+):
+    """
+    闭环浸泡测试：HeliSim <-> AssistCore 锁步运行 duration 秒模拟时间。
+    返回统计：最大水平漂移、最大姿态/角速度、航向最大偏差、是否出现非有限值、墙钟耗时。
+    """
+    from assist_core import AssistCore
+
+    sim = sim or HeliSim()
+    core = core or AssistCore()
+    core.set_cyclic_mode(cyclic_mode)
+    core.set_rudder_enabled(rudder_enabled)
+    snapshot = core.snapshot
+
+    x0, z0, yaw0 = sim.x, sim.z, sim.yaw
+    stats = {
+        "steps": 0,
+        "max_drift": 0.0,
+        "max_attitude": 0.0,
+        "max_rate": 0.0,
+        "max_heading_error": 0.0,
+        "non_finite": False,
+    }
+    cyclic_x = cyclic_y = rudder = 0.0
+    steps = int(round(duration / dt))
+
+    start = time.perf_counter()
+    for _ in range(steps):
+        sim.step(cyclic_x, cyclic_y, rudder, dt)
+        sim.fill_snapshot(snapshot)
+        cyclic_x, cyclic_y, rudder = core.step(snapshot, True, dt)
+        if recorder is not None:
+            recorder.record(core, sim.time, dt)
+
+        if not (math.isfinite(cyclic_x) and math.isfinite(cyclic_y) and math.isfinite(rudder)):
+            stats["non_finite"] = True
+            break
+        drift = math.hypot(sim.x - x0, sim.z - z0)
+        if drift > stats["max_drift"]:
+            stats["max_drift"] = drift
+        attitude = max(abs(sim.pitch), abs(sim.roll))
+        if attitude > stats["max_attitude"]:
+            stats["max_attitude"] = attitude
+        rate = max(abs(sim.p), abs(sim.q), abs(sim.r))
+        if rate > stats["max_rate"]:
+            stats["max_rate"] = rate
+        heading_error = abs((sim.yaw - yaw0 + math.pi) % (2 * math.pi) - math.pi)
+        if heading_error > stats["max_heading_error"]:
+            stats["max_heading_error"] = heading_error
+        stats["steps"] += 1
+
+    stats["sim_time"] = sim.time
+    stats["wall_time"] = time.perf_counter() - start
+    stats["final_drift"] = math.hypot(sim.x - x0, sim.z - z0)
+    return stats
+
+
+def serve(sim: HeliSim, host, port, fmt="binary", rate=50.0, command_port=None):
+    """
+    实时模式：按 rate 向 host:port 发送遥测（替代 Export.lua）。
+    command_port 非空时在该端口接收 COMMAND 包作为操纵输入，否则保持中立操纵。
+    """
+    out = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    cmd_sock = None
+    if command_port is not None:
+        cmd_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        cmd_sock.bind((host, command_port))
+        cmd_sock.setblocking(False)
+
+    period = 1.0 / rate
+    command = (0.0, 0.0, 0.0)
+    deadline = time.perf_counter()
+    try:
+        while True:
+            if cmd_sock is not None:
+                try:
+                    while True:
+                        data = cmd_sock.recv(64)
+                        if len(data) == COMMAND.size:
+                            command = COMMAND.unpack(data)
+                except BlockingIOError:
+                    pass
+            sim.step(*command, period)
+            out.sendto(sim.encode(fmt), (host, port))
+
+            deadline += period
+            delay = deadline - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                deadline = time.perf_counter()
+    except KeyboardInterrupt:
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simple helicopter simulator standing in for DCS")
+    parser.add_argument("--wind", type=float, nargs=2, default=(0.0, 0.0), metavar=("NORTH", "EAST"), help="steady wind, m/s")
+    parser.add_argument("--gust", type=float, default=0.0, help="gust intensity (std dev), m/s")
+    parser.add_argument("--seed", type=int, default=None)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    soak_p = sub.add_parser("soak", help="closed-loop run against the assist core, lock-step")
+    soak_p.add_argument("--hours", type=float, default=1.0)
+    soak_p.add_argument("--cyclic-mode", type=int, default=2, help="0=OFF 1=ON 2=HOVERING")
+    soak_p.add_argument("--rudder", action="store_true", help="enable rudder assist")
+    soak_p.add_argument("--record", help="write a flight recording (see flight_recorder.py)")
+    soak_p.add_argument("--profile", help="tuning profile / gain file to load (see profiles.py)")
+
+    serve_p = sub.add_parser("serve", help="send telemetry over UDP in real time, like Export.lua")
+    serve_p.add_argument("--format", choices=("json", "binary"), default="binary")
+    serve_p.add_argument("--rate", type=float, default=50.0, help="frames per second")
+    serve_p.add_argument("--command-port", type=int, help="UDP port for <3f cyclic_x, cyclic_y, rudder commands")
+
+    args = parser.parse_args(argv)
+    sim = HeliSim(wind=(args.wind[0], 0.0, args.wind[1]), gust_sigma=args.gust, seed=args.seed)
+
+    if args.command == "serve":
+        import config
+
+        print(f"[INFO] sending {args.format} telemetry to {config.UDP_HOST}:{config.UDP_PORT} at {args.rate:.0f} Hz")
+        serve(sim, config.UDP_HOST, config.UDP_PORT, args.format, args.rate, args.command_port)
+        return
+
+    from assist_core import AssistCore
+
+    profile = None
+    if args.profile:
+        from profiles import load_profile
+
+        profile = load_profile(args.profile)
+    core = AssistCore(profile)
+
+    recorder = None
+    if args.record:
+        from flight_recorder import FlightRecorder
+
+        # 锁步远快于实时：缓冲容纳全部步，避免丢弃
+        recorder = FlightRecorder(args.record, core, capacity=int(args.hours * 3600.0 / 0.02) + 1)
+        recorder.start()
+
+    stats = soak(args.hours * 3600.0, cyclic_mode=args.cyclic_mode, rudder_enabled=args.rudder, sim=sim, core=core, recorder=recorder)
+    if recorder is not None:
+        recorder.close()
+
+    speed = stats["sim_time"] / stats["wall_time"] if stats["wall_time"] > 0 else float("inf")
+    print(f"[INFO] {stats['sim_time']:.0f}s sim time in {stats['wall_time']:.1f}s wall ({speed:.0f}x real time)")
+    print(
+        f"[INFO] drift max={stats['max_drift']:.2f}m final={stats['final_drift']:.2f}m"
+        f" attitude max={math.degrees(stats['max_attitude']):.1f}deg"
+        f" rate max={math.degrees(stats['max_rate']):.1f}deg/s"
+        f" heading err max={math.degrees(stats['max_heading_error']):.1f}deg"
+    )
+    if stats["non_finite"]:
+        print("[WARN] non-finite assist output")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,238 +1,189 @@
+import asyncio
+import ctypes
 import random
+import sys
+import threading
 import time
-import keyboard
-import winsound
-
-# from numpy import sign   # 不再需要 random/sign 处理扰动
-import pyvjoy
-
-from config import *
-from motion_state import MotionState
-from utils import EMA, apply_curve, norm_to_vjoy
-from dcs_telemetry import DcsTelemetry
-from cyclic_helper import CyclicHelper
-from rudder_helper import RudderHelper
+from pathlib import Path
+
+try:
+    import keyboard
+except ImportError:
+    keyboard = None
+
+try:
+    import winsound
+except ImportError:
+    winsound = None
+
+import config
+from utils import EMA, apply_curve
+from assist_core import AssistCore, LOOP_DT
+from async_runtime import AssistRuntime
+from control_scheduler import resolve_mode
+from diagnostics import ConsoleSink, CsvSink, DiagnosticsChannel, UdpSink, parse_address
+from flight_recorder import FlightRecorder
+from profiles import ProfileWatcher, profile_path
+from input_backends import create_backend
+from input_mapping import parse_bindings
 from joystick_monitor import JoystickMonitor
-from input_processor import InputProcessor
+from output_backends import create_output
 
 
-LOOP_DT = 0.02  # 主循环周期（秒）
+# 延迟统计报告周期（秒）
+REPORT_INTERVAL = 10.0
 
 
-class HelicopterAssist:
-    def __init__(self):
-        # vJoy 设备
-        self.vjoy = pyvjoy.VJoyDevice(VJOY_DEVICE_ID)
-
-        # 模式/开关
-        self.cyclic_mode = 0
-        self.cyclic_enabled = False
-        self.cyclic_hovering = False
-        self.rudder_enabled = False
-
-        # 阻塞状态（例如键盘按下时暂停输出）
-        self.input_blocked = False
-        self.helper_blocked = False
-
-        # 控制辅助
-        self.cyclic_helper = CyclicHelper()
-        self.rudder_helper = RudderHelper()
-        self.motion_state = MotionState()
-
-        # 手动原始输入（JoystickMonitor 仍写这里）
-        self.manual_cyclic_x = 0.0
-        self.manual_cyclic_y = 0.0
-        self.manual_rudder = 0.0
-
-        # 新增：统一输入处理器（限速 + 曲线整形）
-        self.inputs = InputProcessor(
-            expo_cyclic=0.5,
-            expo_rudder=0.5,
-            rate_up=1.0,
-            rate_down=2.0,
-        )
+def make_diagnostics(scheduler_mode, instruments, period=LOOP_DT) -> DiagnosticsChannel:
+    """按配置组装诊断输出端（控制任务只写环形缓冲，格式化与 I/O 在执行器线程）；period 为控制周期"""
+    decimation = round(1.0 / (period * config.DIAG_RATE)) if config.DIAG_RATE > 0 else 1
+    channel = DiagnosticsChannel([], decimation=decimation)
+    if config.DIAG_CONSOLE_INTERVAL > 0:
+        channel.sinks.append(ConsoleSink(
+            config.DIAG_CONSOLE_INTERVAL, scheduler_mode, instruments, REPORT_INTERVAL, channel,
+        ))
+    if config.DIAG_UDP:
+        channel.sinks.append(UdpSink(*parse_address(config.DIAG_UDP)))
+    if config.DIAG_CSV:
+        channel.sinks.append(CsvSink(time.strftime(config.DIAG_CSV)))
+    return channel
 
-        self.neutral_all()
 
-    def compute_outputs(self, state: dict):
-        # 读取最新状态（保持键名与导出一致，局部变量采用蛇形命名）
-        vx = state.get("Vx", 0.0)
-        vy = state.get("Vy", 0.0)
-        vz = state.get("Vz", 0.0)
-        ax = state.get("Ax", 0.0)
-        ay = state.get("Ay", 0.0)
-        az = state.get("Az", 0.0)
-
-        pitch = state.get("Pitch", 0.0)
-        roll = state.get("Roll", 0.0)
-        yaw = state.get("Yaw", 0.0)
-
-        roll_rate = state.get("RollRate", 0.0)
-        pitch_rate = state.get("PitchRate", 0.0)
-        yaw_rate = state.get("YawRate", 0.0)
-
-        pos_x = state.get("PosX", 0.0)
-        pos_y = state.get("PosY", 0.0)
-        pos_z = state.get("PosZ", 0.0)
-
-        # 更新运动状态
-        self.motion_state.update(
-            vx, vy, vz,
-            pitch, roll, yaw,
-            ax, ay, az,
-            pitch_rate, roll_rate, yaw_rate,
-            pos_x, pos_y, pos_z,
-        )
-
-        if self.input_blocked:
-            self.inputs.set_manual(0.0, 0.0, 0.0)
-
-        # RUDDER 控制（使用处理后的手动输入）
-        if self.rudder_enabled and not self.helper_blocked:
-            rudder = self.rudder_helper.update(self.motion_state, self.inputs.input_rudder)
-        else:
-            rudder = self.inputs.input_rudder
-
-        # CYCLIC 控制（使用处理后的手动输入）
-        if self.cyclic_enabled and not self.helper_blocked:
-            if self.cyclic_hovering and (abs(self.inputs.manual_cyclic_x) >= 0.02 or abs(self.inputs.manual_cyclic_y) >= 0.02):
-                self.cyclic_hovering = False
-                self.cyclic_mode = 1
-            cyclic_x, cyclic_y = self.cyclic_helper.update(
-                self.motion_state,
-                self.inputs.input_cyclic_x,
-                self.inputs.input_cyclic_y,
-                self.cyclic_hovering,
+class HelicopterAssist(AssistCore):
+    def __init__(self):
+        # 整定档案（可选，见 PROFILE）：启动时同步加载一次，之后由运行时定期轮询热加载
+        watcher = None
+        if config.PROFILE:
+            watcher = ProfileWatcher(profile_path(config.PROFILE))
+            watcher.poll()
+        super().__init__(watcher.take() if watcher is not None else None)
+        self.profiles = watcher
+        self.set_stale_policy(config.TELEMETRY_STALE_POLICY, config.TELEMETRY_STALE_TIMEOUT)
+        self.predict_max = config.PREDICT_MAX
+
+        # 虚拟摇杆输出（vJoy / uinput，见 OUTPUT_BACKEND）；只写变化的轴，静止轴按 OUTPUT_KEEPALIVE 保活
+        self.output = create_output(config.OUTPUT_BACKEND, config.VJOY_DEVICE_ID, config.OUTPUT_KEEPALIVE)
+        if self.output is None:
+            raise RuntimeError(
+                f"output backend '{config.OUTPUT_BACKEND}' unavailable: install pyvjoy (Windows) or evdev (Linux)"
             )
-        else:
-            cyclic_x = self.inputs.input_cyclic_x
-            cyclic_y = self.inputs.input_cyclic_y
-
-        return cyclic_x, cyclic_y, rudder
-
-    def loop(self, tel: DcsTelemetry):
-        last_debug = time.time()
-        last_time = time.time()
-
-        while True:
-            now = time.time()
-            dt = now - last_time
-            last_time = now
-
-            # 将外部写入的原始手动输入交给处理器，并更新
-            self.inputs.set_manual(self.manual_cyclic_x, self.manual_cyclic_y, self.manual_rudder)
-            self.inputs.update(dt)
-
-            state = tel.latest
-            cyclic_x, cyclic_y, rudder = self.compute_outputs(state)
-
-            self.cyclic_x = cyclic_x
-            self.cyclic_y = cyclic_y
-            self.rudder = rudder
-
-            if not self.helper_blocked:
-                self.write_vjoy(cyclic_x, cyclic_y, rudder)
-
-            if now - last_debug > 1.0:
-                last_debug = now
-                print(f"{self.motion_state.debug_print()} | {self.debug_print()}")
-
-            time.sleep(LOOP_DT)
-
-    def debug_print(self) -> str:
-        parts = []
-        if self.rudder_helper.target_yaw is not None:
-            parts.append(f"TargetYaw={self.rudder_helper.target_yaw:+.2f}")
-        if self.cyclic_helper.target_pitch is not None:
-            parts.append(f"TargetPitch={self.cyclic_helper.target_pitch:+.2f}")
-        # if self.cyclic_x is not None and self.cyclic_y is not None:
-        #     parts.append(f"CyclicX={self.cyclic_x:+.2f} CyclicY={self.cyclic_y:+.2f}")
-        # if self.rudder is not None:
-        #     parts.append(f"Rudder={self.rudder:+.2f}")
-        
-        return " ".join(parts)
-
-    def neutral_all(self):
-        # 清零输出并复位扰动记忆
-        self.inputs.reset_dither()
-        self.write_vjoy(0.0, 0.0, 0.0)
-
-    def write_vjoy(self, cyclic_x, cyclic_y, rudder):
-        if cyclic_x is not None:
-            cyclic_x = self.inputs.apply_output_dither("cyclic_x", cyclic_x)
-            self.vjoy.set_axis(pyvjoy.HID_USAGE_X, norm_to_vjoy(cyclic_x))
 
-        if cyclic_y is not None:
-            cyclic_y = self.inputs.apply_output_dither("cyclic_y", cyclic_y)
-            self.vjoy.set_axis(pyvjoy.HID_USAGE_Y, norm_to_vjoy(-cyclic_y))
+        self.neutral_all()
 
-        if rudder is not None:
-            rudder = self.inputs.apply_output_dither("rudder", rudder)
-            self.vjoy.set_axis(pyvjoy.HID_USAGE_RZ, norm_to_vjoy(rudder))
+    def dump_stats(self):
+        """导出延迟直方图（热键触发，非控制线程）"""
+        if self.instruments is None:
+            return
+        path = time.strftime("latency_%Y%m%d_%H%M%S.json")
+        self.instruments.dump(path)
+        print(f"[INFO] Latency histograms -> {path}")
 
+    def neutral_all(self):
+        # 清零输出（全部轴重写一次）
+        self.output.reset()
+        self.output.write(0.0, 0.0, 0.0, time.perf_counter())
 
 def main():
-    tel = DcsTelemetry(UDP_HOST, UDP_PORT)
-    tel.start()
-    time.sleep(LOOP_DT)
-
     assist = HelicopterAssist()
 
-    jm = JoystickMonitor(assist)
-    jm.start()
-
+    jm = JoystickMonitor(create_backend(config.JOYSTICK_BACKEND), parse_bindings(config.INPUT_BINDINGS))
+    assist.manual_source = jm.mailbox
+
+    recorder = None
+    if config.RECORDER_PATH:
+        path = Path(time.strftime(config.RECORDER_PATH))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        recorder = FlightRecorder(path, assist)
+        print(f"[INFO] Flight recorder: {path}")
+
+    # 控制频率高于导出频率时不按帧到达调度（见 control_scheduler.resolve_mode）
+    mode, assist.predict_max, note = resolve_mode(
+        config.CONTROL_SCHEDULING, config.CONTROL_RATE, config.EXPORT_RATE, config.PREDICT_MAX,
+    )
+    if note is not None:
+        print(f"[INFO] {note}")
+
+    runtime = AssistRuntime(
+        assist, assist.output, config.UDP_HOST, config.UDP_PORT,
+        period=1.0 / config.CONTROL_RATE, mode=mode,
+        joystick=jm, recorder=recorder, profiles=assist.profiles, rcvbuf=config.UDP_RCVBUF,
+    )
+    runtime.diagnostics = make_diagnostics(runtime.scheduler.mode, runtime.instruments, runtime.scheduler.period)
+    if assist.profiles is not None:
+        print(f"[INFO] Profile: {assist.profiles.path} (reloaded on change)")
+
+    # 键盘回调在 keyboard 库的线程中：状态修改投递到事件循环执行
     def on_keyboard_event(event):
-        if event.name == 'ctrl' and event.scan_code == 29:
-            if event.event_type == "down":
-                assist.input_blocked = True
-                assist.helper_blocked = True
-            elif event.event_type == "up":
-                assist.input_blocked = False
-                assist.helper_blocked = False
-                assist.rudder_helper.reset()
-                assist.cyclic_helper.reset()
-        else:
-            if event.event_type == "down":
-                assist.input_blocked = True
-            elif event.event_type == "up":
-                assist.input_blocked = False
-
-    keyboard.hook_key(TOGGLE_PAUSE_HOTKEY, on_keyboard_event, suppress=False)
-    keyboard.hook_key('shift', on_keyboard_event, suppress=False)
-    keyboard.add_hotkey(TOGGLE_CYCLIC_HOTKEY, lambda: toggle_cyclic(assist))
-    keyboard.add_hotkey(TOGGLE_RUDDER_HOTKEY, lambda: toggle_rudder(assist))
-
-    assist.loop(tel)
+        runtime.post(apply_key_event, assist, event.name, event.scan_code, event.event_type)
+
+    if keyboard is not None:
+        keyboard.hook_key(config.TOGGLE_PAUSE_HOTKEY, on_keyboard_event, suppress=False)
+        keyboard.hook_key('shift', on_keyboard_event, suppress=False)
+        keyboard.add_hotkey(config.TOGGLE_CYCLIC_HOTKEY, lambda: runtime.post(toggle_cyclic, assist))
+        keyboard.add_hotkey(config.TOGGLE_RUDDER_HOTKEY, lambda: runtime.post(toggle_rudder, assist))
+        keyboard.add_hotkey(config.DUMP_STATS_HOTKEY, assist.dump_stats)
+    else:
+        print("[WARN] keyboard not installed: hotkeys disabled")
+
+    if sys.platform == "win32":
+        # 事件循环的定时唤醒依赖系统计时器精度（默认约 15.6 ms）
+        ctypes.windll.winmm.timeBeginPeriod(1)
+        # 遥测 socket 注册到事件循环需要 add_reader（Proactor 不支持）
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+
+    try:
+        asyncio.run(runtime.run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if sys.platform == "win32":
+            ctypes.windll.winmm.timeEndPeriod(1)
+
+
+def apply_key_event(assist: HelicopterAssist, name: str, scan_code: int, event_type: str):
+    if name == 'ctrl' and scan_code == 29:
+        if event_type == "down":
+            assist.input_blocked = True
+            assist.helper_blocked = True
+        elif event_type == "up":
+            assist.input_blocked = False
+            assist.helper_blocked = False
+            assist.rudder_helper.reset()
+            assist.cyclic_helper.reset()
+    else:
+        if event_type == "down":
+            assist.input_blocked = True
+        elif event_type == "up":
+            assist.input_blocked = False
 
 
 def toggle_cyclic(assist: HelicopterAssist):
-    assist.cyclic_mode = (assist.cyclic_mode + 1) % 3
+    assist.set_cyclic_mode(assist.cyclic_mode + 1)
     if assist.cyclic_mode == 0:
-        assist.cyclic_enabled = False
-        assist.cyclic_hovering = False
-        assist.cyclic_helper.reset()
         play_beep("off")
         print("[INFO] Cyclic assist: OFF")
     elif assist.cyclic_mode == 1:
-        assist.cyclic_enabled = True
-        assist.cyclic_hovering = False
         play_beep("on")
         print("[INFO] Cyclic assist: ON (manual/auto)")
     elif assist.cyclic_mode == 2:
-        assist.cyclic_enabled = True
-        assist.cyclic_hovering = True
         play_beep("hover")
         print("[INFO] Cyclic assist: HOVERING")
 
 
 def toggle_rudder(assist: HelicopterAssist):
-    assist.rudder_enabled = not assist.rudder_enabled
-    assist.rudder_helper.reset()
+    assist.set_rudder_enabled(not assist.rudder_enabled)
     play_beep("on" if assist.rudder_enabled else "off")
     print(f"[INFO] Rudder assist: {'ON' if assist.rudder_enabled else 'OFF'}")
 
 
 def play_beep(mode: str):
+    """在后台线程播放提示音（热键命令在事件循环中执行，不能阻塞）"""
+    if winsound is None:
+        return
+    threading.Thread(target=_beep, args=(mode,), daemon=True).start()
+
+
+def _beep(mode: str):
     if mode == "on":
         winsound.Beep(1200, 120)  # 高频短音
     elif mode == "hover":
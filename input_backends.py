@@ -0,0 +1,207 @@
+"""
+物理摇杆输入后端：枚举设备（忽略 vJoy 等虚拟设备），每个设备返回阻塞式 read()。
+  InputsBackend  inputs 库（Windows/Linux）
+  EvdevBackend   Linux evdev（select 等待事件，按 absinfo 归一化）
+  FakeBackend    程序注入事件，无硬件测试用
+
+设备 read(timeout) 阻塞至有事件或超时，返回 [(code, value)]（code 如 "ABS_X"，value 已归一化到约 -1..1）；
+设备断开时抛 OSError（inputs 的 UnpluggedError 也归为 OSError）。
+提供 fileno() / read_nowait() 的设备（evdev）可直接注册到 asyncio 事件循环，不占读取线程。
+
+AxisMailbox：各读取线程写入每个轴的最新值与时间戳，控制线程每拍 sample() 取一次。
+设备轴到 AXES 的绑定与校准见 input_mapping.py。
+"""
+import queue
+import select
+import sys
+
+try:
+    import inputs
+except ImportError:
+    inputs = None
+
+try:
+    import evdev
+except ImportError:
+    evdev = None
+
+# 手动输入轴（AssistCore.manual_cyclic_x / manual_cyclic_y / manual_rudder / manual_collective）
+AXES = ("cyclic_x", "cyclic_y", "rudder", "collective")
+
+
+def is_physical(name: str) -> bool:
+    name = (name or "").lower()
+    return "vjoy" not in name and "virtual" not in name
+
+
+class AxisMailbox:
+    """
+    每轴一个槽位 (value, t_ns)，以一次元素赋值发布，读取无需加锁；
+    t_ns 为读取线程收到事件时的 perf_counter_ns。
+    """
+
+    def __init__(self):
+        self.slots = [(0.0, 0)] * len(AXES)
+
+    def put(self, axis: int, value: float, t_ns: int):
+        self.slots[axis] = (value, t_ns)
+
+    def sample(self):
+        """控制线程每拍调用一次：(cyclic_x, cyclic_y, rudder, collective)"""
+        x, y, r, c = self.slots
+        return x[0], y[0], r[0], c[0]
+
+    def stamps(self):
+        return tuple(t for _v, t in self.slots)
+
+
+class InputsDevice:
+    def __init__(self, pad):
+        self.pad = pad
+        self.name = getattr(pad, "name", "")
+        self.key = getattr(pad, "_device_path", None) or self.name
+
+    def read(self, timeout=None):
+        # inputs 的 read() 本身阻塞等待事件，不支持超时
+        try:
+            events = self.pad.read()
+        except (OSError, inputs.UnpluggedError) as e:
+            raise OSError(str(e)) from e
+        return [(e.code, e.state / 32767.0) for e in events if e.ev_type == "Absolute"]
+
+    def close(self):
+        pass
+
+
+class InputsBackend:
+    name = "inputs"
+
+    def scan(self):
+        # 重新建立 DeviceManager 才能发现热插拔的新设备
+        manager = inputs.DeviceManager()
+        return [InputsDevice(d) for d in manager.gamepads if is_physical(getattr(d, "name", ""))]
+
+
+class EvdevDevice:
+    def __init__(self, dev):
+        self.dev = dev
+        self.name = dev.name
+        self.key = dev.path
+        # 轴号 -> (名称, 中心, 半幅)
+        self._abs = {}
+        for code, info in dev.capabilities().get(evdev.ecodes.EV_ABS, []):
+            name = evdev.ecodes.ABS.get(code)
+            if isinstance(name, list):
+                name = name[0]
+            half = (info.max - info.min) / 2.0 or 1.0
+            self._abs[code] = (name, (info.max + info.min) / 2.0, half)
+
+    def read(self, timeout=None):
+        ready, _, _ = select.select([self.dev.fd], [], [], timeout)
+        if not ready:
+            return []
+        return self.read_nowait()
+
+    def fileno(self) -> int:
+        return self.dev.fd
+
+    def read_nowait(self):
+        """读出已就绪的事件，无事件返回 []（fd 可读时由事件循环调用）"""
+        try:
+            raw = self.dev.read()
+        except BlockingIOError:
+            return []
+        events = []
+        for e in raw:
+            if e.type == evdev.ecodes.EV_ABS and e.code in self._abs:
+                name, center, half = self._abs[e.code]
+                events.append((name, (e.value - center) / half))
+        return events
+
+    def close(self):
+        try:
+            self.dev.close()
+        except OSError:
+            pass
+
+
+class EvdevBackend:
+    name = "evdev"
+
+    def scan(self):
+        devices = []
+        for path in evdev.list_devices():
+            try:
+                dev = evdev.InputDevice(path)
+            except OSError:
+                continue
+            # 任何带绝对轴的设备（摇杆、脚舵、油门），是否使用由绑定决定
+            if is_physical(dev.name) and dev.capabilities().get(evdev.ecodes.EV_ABS):
+                devices.append(EvdevDevice(dev))
+            else:
+                dev.close()
+        return devices
+
+
+class FakeDevice:
+    """push() 注入事件，unplug() 模拟断开（后续 read 抛 OSError）"""
+
+    def __init__(self, name):
+        self.name = name
+        self.key = name
+        self._events = queue.Queue()
+        self.plugged = True
+
+    def push(self, code: str, value: float):
+        self._events.put((code, value))
+
+    def unplug(self):
+        self.plugged = False
+        self._events.put(None)
+
+    def read(self, timeout=None):
+        try:
+            first = self._events.get(timeout=timeout)
+        except queue.Empty:
+            return []
+        events = [first]
+        while not self._events.empty():
+            events.append(self._events.get_nowait())
+        if None in events or not self.plugged:
+            raise OSError(f"{self.name} unplugged")
+        return events
+
+    def close(self):
+        pass
+
+
+class FakeBackend:
+    name = "fake"
+
+    def __init__(self):
+        self.devices = []
+        self.scans = 0
+
+    def add_device(self, name="Fake Stick") -> FakeDevice:
+        dev = FakeDevice(name)
+        self.devices.append(dev)
+        return dev
+
+    def remove_device(self, dev: FakeDevice):
+        self.devices.remove(dev)
+        dev.unplug()
+
+    def scan(self):
+        self.scans += 1
+        return [d for d in self.devices if d.plugged and is_physical(d.name)]
+
+
+def create_backend(name: str = "auto"):
+    """"auto" | "inputs" | "evdev" -> 后端实例；所需库不可用时返回 None"""
+    if name == "auto":
+        name = "evdev" if sys.platform.startswith("linux") and evdev is not None else "inputs"
+    if name == "evdev":
+        return EvdevBackend() if evdev is not None else None
+    if name == "inputs":
+        return InputsBackend() if inputs is not None else None
+    raise ValueError(f"unknown joystick backend: {name}")
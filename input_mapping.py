@@ -0,0 +1,114 @@
+"""
+输入映射：把任意设备的任意轴绑定到 AXES（cyclic_x / cyclic_y / rudder / collective），
+每个绑定带一张预计算的校准表（中心、死区、端点、反向），每个事件查表一次（O(1)）。
+
+绑定格式（config.json 的 INPUT_BINDINGS，列表）：
+  {"axis": "rudder", "code": "ABS_RZ", "device": "pedals",
+   "center": 0.0, "deadzone": 0.02, "min": -1.0, "max": 1.0, "invert": false}
+  device 为设备名子串（不区分大小写），空串匹配任意设备；center/min/max 为设备归一化值（-1..1）。
+"""
+from input_backends import AXES
+
+# 查表段数：4096 段时 x*|x|^0.5 一类曲线的插值误差低于 vJoy 的 1 LSB
+TABLE_SIZE = 4096
+
+DEFAULT_BINDINGS = [
+    {"axis": "cyclic_x", "code": "ABS_X"},
+    {"axis": "cyclic_y", "code": "ABS_Y"},
+    {"axis": "rudder", "code": "ABS_RX"},
+]
+
+_BINDING_KEYS = ("axis", "code", "device", "center", "deadzone", "min", "max", "invert")
+
+
+class CurveTable:
+    """
+    在 [lo, hi] 上等距采样 f 共 n 段，查表线性插值；区间外直接计算 f。
+    f 在采样点上的值与直接计算完全一致，段内误差取决于曲率。
+    """
+
+    __slots__ = ("f", "lo", "hi", "scale", "values", "diffs", "n")
+
+    def __init__(self, f, n=TABLE_SIZE, lo=-1.0, hi=1.0):
+        self.f = f
+        self.lo = lo
+        self.hi = hi
+        self.n = n
+        self.scale = n / (hi - lo)
+        step = (hi - lo) / n
+        values = [f(lo + i * step) for i in range(n)] + [f(hi)]
+        self.values = values
+        self.diffs = [values[i + 1] - values[i] for i in range(n)] + [0.0]
+
+    def __call__(self, x: float) -> float:
+        if not self.lo <= x <= self.hi:
+            return self.f(x)
+        pos = (x - self.lo) * self.scale
+        i = int(pos)
+        return self.values[i] + self.diffs[i] * (pos - i)
+
+
+def calibration(center=0.0, deadzone=0.0, low=-1.0, high=1.0, invert=False):
+    """设备归一化值 -> 校准后 -1..1：中心两侧分别按端点拉伸，中心附近 deadzone 内为 0，其余重新铺满"""
+    def f(x):
+        if x >= center:
+            v = (x - center) / (high - center)
+        else:
+            v = (x - center) / (center - low)
+        if deadzone > 0.0:
+            if abs(v) <= deadzone:
+                v = 0.0
+            else:
+                v = (v - deadzone if v > 0.0 else v + deadzone) / (1.0 - deadzone)
+        v = max(-1.0, min(1.0, v))
+        return -v if invert else v
+    return f
+
+
+class AxisBinding:
+    def __init__(self, axis, code, device="", center=0.0, deadzone=0.0, min=-1.0, max=1.0, invert=False):
+        if axis not in AXES:
+            raise ValueError(f"unknown input axis: {axis}")
+        center, deadzone, low, high = float(center), float(deadzone), float(min), float(max)
+        if not low < center < high:
+            raise ValueError(f"{axis}: need min < center < max (got {low}, {center}, {high})")
+        if not 0.0 <= deadzone < 1.0:
+            raise ValueError(f"{axis}: deadzone {deadzone} out of range")
+        self.axis = axis
+        self.index = AXES.index(axis)
+        self.code = str(code)
+        self.device = str(device).lower()
+        self.table = CurveTable(calibration(center, deadzone, low, high, bool(invert)))
+
+    def matches(self, device_name: str) -> bool:
+        return self.device in (device_name or "").lower()
+
+
+class InputMapping:
+    def __init__(self, bindings):
+        self.bindings = list(bindings)
+
+    def for_device(self, device_name: str) -> dict:
+        """该设备的事件表 {code: ((轴下标, 校准表), ...)}；没有任何绑定时为空"""
+        codes = {}
+        for b in self.bindings:
+            if b.matches(device_name):
+                codes.setdefault(b.code, []).append((b.index, b.table))
+        return {code: tuple(targets) for code, targets in codes.items()}
+
+
+def parse_bindings(data=None) -> InputMapping:
+    """绑定列表（见模块说明）-> InputMapping；非法内容抛 ValueError"""
+    if data is None:
+        data = DEFAULT_BINDINGS
+    if not isinstance(data, list):
+        raise ValueError("INPUT_BINDINGS must be a list")
+    bindings = []
+    for item in data:
+        if not isinstance(item, dict) or "axis" not in item or "code" not in item:
+            raise ValueError(f"binding needs axis and code: {item}")
+        for key in item:
+            if key not in _BINDING_KEYS:
+                raise ValueError(f"unknown binding key: {key}")
+        bindings.append(AxisBinding(**item))
+    return InputMapping(bindings)
@@ -0,0 +1,153 @@
+"""
+控制循环延迟统计：每拍各阶段耗时与遥测帧龄写入固定桶的对数-线性直方图（HDR 风格），
+记录一次只做一次 bit_length 和一次列表自增，不分配内存。
+
+直方图只累加、不清零：周期报告用当前计数减去上次报告时的副本得到窗口分布，
+因此其他线程（接收线程的解析耗时、热键触发的导出）读取时无需加锁。
+数值单位为纳秒（time.perf_counter_ns），相对精度约 1/32。
+"""
+import json
+import time
+
+# 每个 2 的幂区间细分为 HALF 个桶
+SUB_BITS = 6
+SUB = 1 << SUB_BITS
+HALF = SUB >> 1
+# 覆盖全部 63 位非负整数，记录时无需越界检查
+MAX_BITS = 63
+BUCKETS = (MAX_BITS - SUB_BITS) * HALF + SUB
+
+# 控制循环阶段（read/inputs/motion/rudder/cyclic/output/record 为耗时，
+# tick 为从唤醒到本拍结束，age 为输出时所用遥测帧的帧龄，parse 为遥测解析耗时，
+# lag 为事件循环延迟：定时唤醒的实际迟到量，由 async_runtime 统一测量）
+STAGES = ("read", "inputs", "motion", "rudder", "cyclic", "output", "record", "tick", "age", "parse", "lag")
+
+# 控制循环每 STAGE_SAMPLE 拍计时一拍（read..age 全部阶段），其余拍不取时间戳、不记录；
+# parse/lag 由各自的测量点每次记录
+STAGE_SAMPLE = 4
+
+
+def bucket_index(value: int) -> int:
+    shift = value.bit_length() - SUB_BITS
+    if shift > 0 and value > 0:
+        return shift * HALF + (value >> shift)
+    return value if value > 0 else 0
+
+
+def bucket_upper(i: int) -> int:
+    """桶内最大值（报告取上界，偏保守）"""
+    if i < SUB:
+        return i
+    shift = i // HALF - 1
+    return ((i - shift * HALF + 1) << shift) - 1
+
+
+class Histogram:
+    """单写者直方图：record(ns) 只自增一个桶计数（value 为非负整数，负值计入 0 桶）"""
+
+    __slots__ = ("counts",)
+
+    def __init__(self):
+        self.counts = [0] * BUCKETS
+
+    def record(self, value: int):
+        shift = value.bit_length() - SUB_BITS
+        if shift > 0 and value > 0:
+            self.counts[shift * HALF + (value >> shift)] += 1
+        else:
+            self.counts[value if value > 0 else 0] += 1
+
+    def copy(self) -> list:
+        return self.counts[:]
+
+
+def summarize(counts) -> dict:
+    """计数数组 -> {count, p50, p99, max}（纳秒）"""
+    total = sum(counts)
+    result = {"count": total, "p50": 0, "p99": 0, "max": 0}
+    if total == 0:
+        return result
+    targets = (("p50", (total + 1) // 2), ("p99", total - total // 100))
+    seen = 0
+    k = 0
+    for i, c in enumerate(counts):
+        if not c:
+            continue
+        seen += c
+        while k < len(targets) and seen >= targets[k][1]:
+            result[targets[k][0]] = bucket_upper(i)
+            k += 1
+        result["max"] = bucket_upper(i)
+    return result
+
+
+class LoopInstruments:
+    """
+    控制循环的一组阶段直方图（属性名同 STAGES，直接 instruments.motion.record(ns)）。
+    parse 直方图由遥测接收方（dcs_telemetry.TelemetryDecoder）持有，此处只引用。
+    writer 为输出后端（output_backends.OutputBackend，可选），报告其每秒提交数与写轴数。
+    """
+
+    def __init__(self, parse: Histogram = None, writer=None, sample=STAGE_SAMPLE):
+        # sampled：本拍是否计时（控制任务每拍开始时调用 next_tick 推进）
+        self.sample = max(1, int(sample))
+        self.sampled = False
+        self._count = 0
+        for name in STAGES:
+            setattr(self, name, Histogram())
+        if parse is not None:
+            self.parse = parse
+        self.writer = writer
+        self.started = time.time()
+        self._window = {name: [0] * BUCKETS for name in STAGES}
+        self._writes_window = (time.perf_counter(), 0, 0)
+
+    def next_tick(self) -> bool:
+        """每拍开始时调用一次：返回本拍是否计时"""
+        self._count += 1
+        self.sampled = self._count >= self.sample
+        if self.sampled:
+            self._count = 0
+        return self.sampled
+
+    def histograms(self) -> dict:
+        return {name: getattr(self, name) for name in STAGES}
+
+    def report(self) -> str:
+        """自上次 report 以来的窗口统计：每阶段 p50/p99/max（微秒）"""
+        parts = []
+        for name, hist in self.histograms().items():
+            counts = hist.copy()
+            prev = self._window[name]
+            window = [c - p for c, p in zip(counts, prev)]
+            self._window[name] = counts
+            s = summarize(window)
+            if s["count"]:
+                parts.append(f"{name}={s['p50'] / 1e3:.1f}/{s['p99'] / 1e3:.1f}/{s['max'] / 1e3:.1f}")
+        report = "Latency us p50/p99/max: " + " ".join(parts)
+        if self.writer is not None:
+            writes, axes = self.write_rates()
+            report += f" | Output writes/s={writes:.1f} axes/s={axes:.1f}"
+        return report
+
+    def write_rates(self):
+        """自上次调用以来输出后端的 (提交/秒, 写轴/秒)"""
+        now = time.perf_counter()
+        writes, axes = self.writer.writes, self.writer.axis_writes
+        t0, writes0, axes0 = self._writes_window
+        self._writes_window = (now, writes, axes)
+        elapsed = max(now - t0, 1e-9)
+        return (writes - writes0) / elapsed, (axes - axes0) / elapsed
+
+    def dump(self, path):
+        """导出自启动以来的累计直方图（非零桶：[上界 ns, 计数]）与摘要"""
+        data = {"started": self.started, "unit": "ns", "stages": {}}
+        if self.writer is not None:
+            data["output"] = {"writes": self.writer.writes, "axis_writes": self.writer.axis_writes}
+        for name, hist in self.histograms().items():
+            counts = hist.copy()
+            stage = summarize(counts)
+            stage["buckets"] = [[bucket_upper(i), c] for i, c in enumerate(counts) if c]
+            data["stages"][name] = stage
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1)
@@ -1,52 +1,141 @@
-import time
 import threading
-import random
-from utils import clamp, norm_to_vjoy
+import time
+from time import perf_counter_ns
+
+from input_backends import AxisMailbox
+from input_mapping import InputMapping, parse_bindings
 
-try:
-    import inputs
-except ImportError:
-    inputs = None
 
 class JoystickMonitor(threading.Thread):
     """
     只監控物理搖桿輸入，忽略 vJoy 虛擬設備。
+    每個設備一個讀取線程（阻塞等待事件，不輪詢），按 mapping 綁定查校準表後連同時間戳寫入 mailbox，
+    控制線程每拍 sample() 一次；本線程定期重新枚舉設備處理熱插拔，
+    無新設備時重掃間隔逐次加倍（rescan_min → rescan_max）；
+    設備讀取出錯後按連續失敗次數退避，退避期內不重新接入。
+    asyncio 運行時不啟動本線程，由 async_runtime.AsyncJoystickSource 復用掃描、分發與退避邏輯。
     """
-    def __init__(self, assist):
+
+    def __init__(
+        self, backend, mapping: InputMapping = None, mailbox: AxisMailbox = None,
+        rescan_min=1.0, rescan_max=8.0, read_timeout=0.5,
+    ):
         super().__init__(daemon=True)
-        self.assist = assist
-
-        # 過濾出物理搖桿設備
-        self.physical_gamepads = []
-        self.lx = 0.0
-        self.ly = 0.0
-        self.rx = 0.0
-        if inputs:
-            for d in inputs.devices.gamepads:
-                name = getattr(d, 'name', '').lower()
-                if "vjoy" not in name and "virtual" not in name:
-                    self.physical_gamepads.append(d)
+        self.backend = backend
+        self.mapping = mapping if mapping is not None else parse_bindings()
+        self.mailbox = mailbox if mailbox is not None else AxisMailbox()
+        self.rescan_min = rescan_min
+        self.rescan_max = rescan_max
+        self.read_timeout = read_timeout
+
+        # 設備 key -> 讀取器（線程或 fd 讀取器）；設備 key -> (連續失敗次數, 可重新接入的時刻)
+        self.readers = {}
+        self._backoff = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._warned = False
+
+        # 統計
+        self.connects = 0
+        self.disconnects = 0
 
     def run(self):
-        if not inputs or not self.physical_gamepads:
-            print("[WARN] 未找到物理搖桿，搖桿監控不可用")
+        if self.backend is None:
+            print("[WARN] 搖桿輸入後端不可用，搖桿監控不可用")
             return
 
-        while True:
-            for pad in self.physical_gamepads:
-                try:
-                    events = pad.read()
-                except Exception:
+        interval = self.rescan_min
+        while not self._stop_event.is_set():
+            interval = self.rescan(self.scan_devices(), interval)
+            self._stop_event.wait(interval)
+
+    def scan_devices(self) -> list:
+        try:
+            return self.backend.scan()
+        except Exception as e:
+            print(f"[WARN] 搖桿枚舉失敗: {e}")
+            return []
+
+    def rescan(self, devices, interval, start=None) -> float:
+        """接入 devices 中的新設備，返回下次重掃間隔（有新設備時回到 rescan_min，否則加倍）"""
+        if self.attach(devices, start):
+            interval = self.rescan_min
+            self._warned = False
+        else:
+            interval = min(interval * 2.0, self.rescan_max)
+        if not self.readers and not self._warned:
+            print("[WARN] 未找到已綁定的物理搖桿，等待設備接入")
+            self._warned = True
+        return interval
+
+    def attach(self, devices, start=None) -> int:
+        """
+        為尚未監控的設備啟動讀取，返回新啟動數。
+        start(dev, codes) 啟動一個讀取器並返回其句柄，默認每設備一個讀取線程。
+        """
+        if start is None:
+            start = self._start_thread
+        started = 0
+        now = time.monotonic()
+        with self._lock:
+            for dev in devices:
+                codes = self.mapping.for_device(dev.name)
+                if not codes or dev.key in self.readers or self._backoff.get(dev.key, (0, 0.0))[1] > now:
+                    dev.close()
                     continue
-                for e in events:
-                    if e.code == "ABS_X":
-                        self.lx = e.state / 32767.0
-                    if e.code == "ABS_Y":
-                        self.ly = e.state / 32767.0
-                    if e.code == "ABS_RX":
-                        self.rx = e.state / 32767.0
-
-            if not self.assist.input_blocked and not self.assist.helper_blocked:
-                self.assist.manual_cyclic_x = self.lx
-                self.assist.manual_cyclic_y = self.ly
-                self.assist.manual_rudder = self.rx
\ No newline at end of file
+                self.readers[dev.key] = start(dev, codes)
+                self.connects += 1
+                started += 1
+                print(f"[INFO] 搖桿接入: {dev.name}")
+        return started
+
+    def _start_thread(self, dev, codes):
+        reader = threading.Thread(target=self._read_device, args=(dev, codes), daemon=True)
+        reader.start()
+        return reader
+
+    def _read_device(self, dev, codes):
+        owned = set()
+        started = time.monotonic()
+        failed = False
+        try:
+            while not self._stop_event.is_set():
+                events = dev.read(self.read_timeout)
+                if events:
+                    self.dispatch(codes, events, owned)
+        except OSError as e:
+            failed = True
+            print(f"[WARN] 搖桿斷開: {dev.name} ({e})")
+        finally:
+            self.release(dev, owned, failed, started)
+
+    def dispatch(self, codes, events, owned):
+        """一批事件按綁定查表寫入 mailbox；owned 收集本設備寫過的軸"""
+        put = self.mailbox.put
+        t_ns = perf_counter_ns()
+        for code, value in events:
+            targets = codes.get(code)
+            if targets is None:
+                continue
+            for axis, table in targets:
+                put(axis, table(value), t_ns)
+                owned.add(axis)
+
+    def release(self, dev, owned, failed, started):
+        """讀取結束：本設備負責的軸回中（避免殘留舵量），關閉設備，出錯時記錄退避"""
+        put = self.mailbox.put
+        t_ns = perf_counter_ns()
+        for axis in owned:
+            put(axis, 0.0, t_ns)
+        dev.close()
+        with self._lock:
+            self.readers.pop(dev.key, None)
+            if failed:
+                # 接入後很快出錯視為連續失敗，退避時間加倍
+                now = time.monotonic()
+                count = self._backoff.get(dev.key, (0, 0.0))[0] + 1 if now - started < self.rescan_max else 1
+                self._backoff[dev.key] = (count, now + min(self.rescan_min * 2 ** (count - 1), self.rescan_max))
+        self.disconnects += 1
+
+    def stop(self):
+        self._stop_event.set()
@@ -0,0 +1,212 @@
+"""
+稳态卡尔曼滤波（纯 Python，不依赖 NumPy），供 MotionState 使用（MOTION_FILTER = "kalman"）。
+每轴一个定长状态 [位置, 速度, 加速度]，常加速度模型，过程噪声为白噪声加加速度（jerk）：
+  平移（北/上/东）：位置、速度、加速度三者均有测量
+  姿态（俯仰/滚转/航向）：角度与角速度有测量，角加速度由滤波器估计
+增益矩阵为 Riccati 方程在该帧间隔下的稳态解，按 1 ms 分档（1..100 ms，覆盖 MotionState 的帧间隔范围）
+在构造时一次算好（同噪声参数的轴共用，每组约 0.1 s），控制线程上取增益只是查表，
+每帧为固定次数的标量运算，不构造矩阵或列表。
+"""
+import math
+
+G = 9.80665
+
+# 增益表的帧间隔分档（秒）与档数：覆盖 DT_STEP .. DT_STEP * DT_BUCKETS，超出按两端取
+DT_STEP = 0.001
+DT_BUCKETS = 100
+
+# 默认噪声（标准差）：q 为加加速度过程噪声谱密度的平方根，r 为 (位置, 速度, 加速度) 测量噪声，None 表示无测量
+TRANSLATION_NOISE = dict(q=2.0, r=(0.05, 0.02, 1.5))
+ROTATION_NOISE = dict(q=6.0, r=(0.002, 0.01, None))
+
+# (q, r) -> 各档 9 个增益
+_GAINS = {}
+
+# 平移位置新息超过该值（米）视为跳变（任务重开、传送），直接以测量重置
+RESET_GATE = 50.0
+
+
+def _mat_mul(a, b):
+    return [[sum(a[i][k] * b[k][j] for k in range(len(b))) for j in range(len(b[0]))] for i in range(len(a))]
+
+
+def _add(a, b):
+    return [[x + y for x, y in zip(ra, rb)] for ra, rb in zip(a, b)]
+
+
+def _transpose(a):
+    return [list(row) for row in zip(*a)]
+
+
+def _inverse(a):
+    # 小矩阵 Gauss-Jordan 消元（仅用于离线求增益）
+    n = len(a)
+    m = [list(row) + [1.0 if i == j else 0.0 for j in range(n)] for i, row in enumerate(a)]
+    for c in range(n):
+        pivot = max(range(c, n), key=lambda r: abs(m[r][c]))
+        m[c], m[pivot] = m[pivot], m[c]
+        d = m[c][c]
+        m[c] = [v / d for v in m[c]]
+        for r in range(n):
+            if r != c:
+                f = m[r][c]
+                m[r] = [v - f * w for v, w in zip(m[r], m[c])]
+    return [row[n:] for row in m]
+
+
+def steady_state_gain(dt, q, r, iterations=64, tol=1e-12):
+    """
+    常加速度模型在帧间隔 dt 下的稳态卡尔曼增益，返回 3x3 列表 K[状态][测量]；
+    r 中为 None 的测量不参与，对应列为 0。
+    先验协方差由结构化倍增算法（SDA）求 Riccati 方程稳态解，二次收敛，几十次迭代内结束。
+    """
+    measured = [i for i, v in enumerate(r) if v is not None]
+    I = [[1.0 if i == j else 0.0 for j in range(3)] for i in range(3)]
+    F = [[1.0, dt, 0.5 * dt * dt], [0.0, 1.0, dt], [0.0, 0.0, 1.0]]
+    s = q * q
+    Q = [
+        [s * dt ** 5 / 20, s * dt ** 4 / 8, s * dt ** 3 / 6],
+        [s * dt ** 4 / 8, s * dt ** 3 / 3, s * dt ** 2 / 2],
+        [s * dt ** 3 / 6, s * dt ** 2 / 2, s * dt],
+    ]
+    H = [[1.0 if j == i else 0.0 for j in range(3)] for i in measured]
+    Ht = _transpose(H)
+    R = [[r[i] ** 2 if i == j else 0.0 for j in measured] for i in measured]
+
+    # 滤波 Riccati 方程与控制形式对偶：A = F'，G = H' R^-1 H，X 收敛到先验协方差
+    A = _transpose(F)
+    Gm = _mat_mul(_mat_mul(Ht, _inverse(R)), H)
+    X = Q
+    for _ in range(iterations):
+        W = _inverse(_add(I, _mat_mul(Gm, X)))
+        At = _transpose(A)
+        WA = _mat_mul(W, A)
+        X_new = _add(X, _mat_mul(_mat_mul(At, X), WA))
+        Gm = _add(Gm, _mat_mul(_mat_mul(A, W), _mat_mul(Gm, At)))
+        A = _mat_mul(A, WA)
+        done = max(abs(a - b) for ra, rb in zip(X, X_new) for a, b in zip(ra, rb)) <= tol * max(abs(v) for row in X_new for v in row)
+        X = X_new
+        if done:
+            break
+
+    S = _add(_mat_mul(_mat_mul(H, X), Ht), R)
+    K = _mat_mul(_mat_mul(X, Ht), _inverse(S))
+    gain = [[0.0, 0.0, 0.0] for _ in range(3)]
+    for col, i in enumerate(measured):
+        for row in range(3):
+            gain[row][i] = K[row][col]
+    return gain
+
+
+def gain_table(q, r):
+    """噪声参数 (q, r) 下全部分档的增益表：第 n 项为帧间隔 (n + 1) * DT_STEP 的 9 个增益（首次调用时求解并缓存）"""
+    key = (q, r)
+    table = _GAINS.get(key)
+    if table is None:
+        table = []
+        for n in range(1, DT_BUCKETS + 1):
+            K = steady_state_gain(n * DT_STEP, q, r)
+            table.append(tuple(K[0] + K[1] + K[2]))
+        table = _GAINS[key] = tuple(table)
+    return table
+
+
+class AxisFilter:
+    """
+    单轴稳态卡尔曼滤波：p/v/a 为当前估计。
+    wrap=True 时 p 为角度：新息按 ±π 回绕，估计值保持在 0..2π。
+    """
+
+    __slots__ = ("p", "v", "a", "q", "r", "wrap", "gate", "inited", "_dt", "_k", "_table")
+
+    def __init__(self, q, r, wrap=False, gate=None):
+        self.q = q
+        self.r = r
+        self.wrap = wrap
+        self.gate = gate
+        self._table = gain_table(q, r)
+        self._dt = None
+        self._k = None
+        self.reset()
+
+    def reset(self):
+        self.p = self.v = self.a = 0.0
+        self.inited = False
+
+    def gain(self, dt):
+        """帧间隔 dt 对应的 9 个增益（查表，按 DT_STEP 分档）"""
+        n = round(dt / DT_STEP)
+        if n < 1:
+            n = 1
+        elif n > DT_BUCKETS:
+            n = DT_BUCKETS
+        return self._table[n - 1]
+
+    def update(self, zp, zv, za, dt):
+        """一帧测量（无测量的分量传 0.0，对应增益为 0）"""
+        if not self.inited:
+            self.p, self.v, self.a = zp, zv, za
+            self.inited = True
+            return
+        if dt != self._dt:
+            self._k = self.gain(dt)
+            self._dt = dt
+        k00, k01, k02, k10, k11, k12, k20, k21, k22 = self._k
+
+        # 预测
+        a = self.a
+        v = self.v + a * dt
+        p = self.p + (self.v + 0.5 * a * dt) * dt
+
+        # 新息
+        e0 = zp - p
+        if self.wrap:
+            e0 = (e0 + math.pi) % (2.0 * math.pi) - math.pi
+        elif self.gate is not None and abs(e0) > self.gate:
+            self.p, self.v, self.a = zp, zv, za
+            return
+        e1 = zv - v
+        e2 = za - a
+
+        p += k00 * e0 + k01 * e1 + k02 * e2
+        self.v = v + k10 * e0 + k11 * e1 + k12 * e2
+        self.a = a + k20 * e0 + k21 * e1 + k22 * e2
+        self.p = p % (2.0 * math.pi) if self.wrap else p
+
+
+class MotionEstimator:
+    """
+    六轴状态估计：输入一帧遥测（FIELDS 顺序）与帧间隔，返回滤波后的同格式元组。
+    加速度为比力（竖直含重力），滤波时扣除、输出时加回；YawRate 与航向增加方向相反（见 heli_sim）。
+    """
+
+    def __init__(self, translation=TRANSLATION_NOISE, rotation=ROTATION_NOISE):
+        # 各轴构造时取得（首次则求解）全部分档的增益表，控制线程上不再求解
+        self.north = AxisFilter(gate=RESET_GATE, **translation)
+        self.up = AxisFilter(gate=RESET_GATE, **translation)
+        self.east = AxisFilter(gate=RESET_GATE, **translation)
+        self.pitch = AxisFilter(**rotation)
+        self.roll = AxisFilter(**rotation)
+        self.yaw = AxisFilter(wrap=True, **rotation)
+        self.axes = (self.north, self.up, self.east, self.pitch, self.roll, self.yaw)
+
+    def reset(self):
+        for axis in self.axes:
+            axis.reset()
+
+    def update(self, Vx, Vy, Vz, Ax, Ay, Az, Pitch, Roll, Yaw, PitchRate, RollRate, YawRate, x, y, z, dt):
+        north, up, east = self.north, self.up, self.east
+        pitch, roll, yaw = self.pitch, self.roll, self.yaw
+        north.update(x, Vx, Ax, dt)
+        up.update(y, Vy, Ay - G, dt)
+        east.update(z, Vz, Az, dt)
+        pitch.update(Pitch, PitchRate, 0.0, dt)
+        roll.update(Roll, RollRate, 0.0, dt)
+        yaw.update(Yaw, -YawRate, 0.0, dt)
+        return (
+            north.v, up.v, east.v,
+            north.a, up.a + G, east.a,
+            pitch.p, roll.p, yaw.p,
+            pitch.v, roll.v, -yaw.v,
+            north.p, up.p, east.p,
+        )
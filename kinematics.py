@@ -0,0 +1,87 @@
+import math
+
+
+# 坐标约定：
+#   世界坐标 (x=北, y=上, z=东)，与 Export.lua 导出的 Vx/Vy/Vz、PosX/PosY/PosZ 一致
+#   姿态：yaw 为航向（自北顺时针），pitch 抬头为正，roll 右滚（右翼下沉）为正
+#   输出 (前, 右, 上)
+FRAME_MODES = ("heading", "body")
+
+
+class HeadingFrame:
+    """
+    航向坐标系变换：每帧按偏航角计算一次 sin/cos 并缓存，
+    之后的速度、加速度、位置差变换均为纯浮点运算（不依赖 NumPy）。
+    仅绕竖轴旋转，"上" 始终为世界竖直方向。
+    """
+
+    __slots__ = ("yaw", "cos_yaw", "sin_yaw")
+
+    def __init__(self):
+        self.yaw = 0.0
+        self.cos_yaw = 1.0
+        self.sin_yaw = 0.0
+
+    def set_attitude(self, pitch, roll, yaw):
+        # 仅用偏航；pitch/roll 保留参数以便与 BodyFrame 互换
+        self.yaw = yaw
+        self.cos_yaw = math.cos(yaw)
+        self.sin_yaw = math.sin(yaw)
+
+    def world_to_body(self, x, y, z):
+        c = self.cos_yaw
+        s = self.sin_yaw
+        return c * x + s * z, c * z - s * x, y
+
+    def body_to_world(self, forward, right, up):
+        c = self.cos_yaw
+        s = self.sin_yaw
+        return c * forward - s * right, up, s * forward + c * right
+
+
+class BodyFrame:
+    """
+    完整姿态变换：每帧由 yaw-pitch-roll 构造一次方向余弦矩阵（行依次为机体 前/右/上 轴
+    在世界坐标中的分量），之后每个向量变换为 9 次乘法。
+    """
+
+    __slots__ = ("m00", "m01", "m02", "m10", "m11", "m12", "m20", "m21", "m22")
+
+    def __init__(self):
+        self.set_attitude(0.0, 0.0, 0.0)
+
+    def set_attitude(self, pitch, roll, yaw):
+        cp, sp = math.cos(pitch), math.sin(pitch)
+        cr, sr = math.cos(roll), math.sin(roll)
+        cy, sy = math.cos(yaw), math.sin(yaw)
+
+        # 前轴：航向前方抬头 pitch
+        self.m00, self.m01, self.m02 = cp * cy, sp, cp * sy
+        # 右轴：航向右方绕前轴滚转 roll（右翼下沉为正）
+        self.m10, self.m11, self.m12 = sr * sp * cy - cr * sy, -sr * cp, cr * cy + sr * sp * sy
+        # 上轴
+        self.m20, self.m21, self.m22 = -cr * sp * cy - sr * sy, cr * cp, sr * cy - cr * sp * sy
+
+    def world_to_body(self, x, y, z):
+        return (
+            self.m00 * x + self.m01 * y + self.m02 * z,
+            self.m10 * x + self.m11 * y + self.m12 * z,
+            self.m20 * x + self.m21 * y + self.m22 * z,
+        )
+
+    def body_to_world(self, forward, right, up):
+        # 正交矩阵：逆变换即转置
+        return (
+            self.m00 * forward + self.m10 * right + self.m20 * up,
+            self.m01 * forward + self.m11 * right + self.m21 * up,
+            self.m02 * forward + self.m12 * right + self.m22 * up,
+        )
+
+
+def make_frame(mode="heading"):
+    """按模式创建坐标变换："heading"（仅航向，默认）或 "body"（完整姿态）"""
+    if mode == "heading":
+        return HeadingFrame()
+    if mode == "body":
+        return BodyFrame()
+    raise ValueError(f"unknown frame mode: {mode}")
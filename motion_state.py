@@ -1,11 +1,37 @@
 import math
-from utils import EMA, world_to_body_velocity
+from kalman import MotionEstimator
+from kinematics import make_frame
+from utils import EMA, clamp
 import config
 
+# 帧间隔保护（秒）：防止暂停/卡顿造成的 dt 尖峰或零 dt 破坏微分与积分
+DT_MIN = 0.001
+DT_MAX = 0.1
+
+# 外推时长上限（秒）：超过后状态停在上限处，不再外推
+PREDICT_MAX = 0.1
+
+G = 9.80665
+
+# 状态滤波："ema" 只对加速度做 EMA 平滑（原方式）；"kalman" 对位置/速度/加速度与姿态/角速度做稳态卡尔曼滤波
+FILTER_MODES = ("ema", "kalman")
+
 class MotionState:
 
-    def __init__(self, dt=0.02):
+    def __init__(self, dt=0.02, frame_mode=None, filter_mode=None):
+        # 最近一帧的实际间隔（优先使用模型时间），供各 PID 级联使用
         self.dt = dt
+        self.model_time = 0.0
+
+        # 本帧的坐标变换（每帧构造一次，速度/加速度/位置差共用）
+        # "heading"：仅按航向旋转；"body"：完整姿态方向余弦矩阵
+        self.frame = make_frame(frame_mode or config.BODY_FRAME_MODE)
+
+        # 状态滤波（见 FILTER_MODES）；kalman 时加速度直接取滤波估计，不再经 EMA
+        filter_mode = filter_mode or config.MOTION_FILTER
+        if filter_mode not in FILTER_MODES:
+            raise ValueError(f"unknown motion filter: {filter_mode}")
+        self.estimator = MotionEstimator() if filter_mode == "kalman" else None
 
         # 加速度滤波器
         self.ema_forward_acc = EMA(config.EMA_ALPHA)
@@ -33,6 +59,12 @@ class MotionState:
         self.y = 0.0
         self.z = 0.0
 
+        # 最近一帧原始样本（世界系，FIELDS 顺序）与 predict 的外推时长；
+        # update 后到下一次 predict 前上一帧数据已保存，predict 不再重复保存
+        self.sample = (0.0,) * 15
+        self.horizon = 0.0
+        self._fresh = False
+
         # 上一帧数据
         self.prev_forward_v = 0.0
         self.prev_right_v = 0.0
@@ -54,22 +86,32 @@ class MotionState:
         self.prev_y = 0.0
         self.prev_z = 0.0
 
-    def update(self, Vx, Vy, Vz, Pitch, Roll, Yaw, Ax, Ay, Az, PitchRate, RollRate, YawRate, x, y, z):
+    def update(self, Vx, Vy, Vz, Pitch, Roll, Yaw, Ax, Ay, Az, PitchRate, RollRate, YawRate, x, y, z, dt=None, model_time=0.0):
 
-        # 保存上一帧数据
-        self.prev_forward_v, self.prev_right_v, self.prev_up_v = self.forward_v, self.right_v, self.up_v
-        self.prev_forward_acc, self.prev_right_acc, self.prev_up_acc = self.forward_acc, self.right_acc, self.up_acc
-        self.prev_pitch, self.prev_roll, self.prev_yaw = self.pitch, self.roll, self.yaw
-        self.prev_pitch_rate, self.prev_roll_rate, self.prev_yaw_rate = self.pitch_rate, self.roll_rate, self.yaw_rate
-        self.prev_x, self.prev_y, self.prev_z = self.x, self.y, self.z
+        # 帧间隔：模型时间有效且前进时以其为准，否则使用调用方测得的墙钟间隔
+        self.dt = self._measure_dt(dt, model_time)
+
+        if self.estimator is not None:
+            (
+                Vx, Vy, Vz, Ax, Ay, Az, Pitch, Roll, Yaw, PitchRate, RollRate, YawRate, x, y, z,
+            ) = self.estimator.update(Vx, Vy, Vz, Ax, Ay, Az, Pitch, Roll, Yaw, PitchRate, RollRate, YawRate, x, y, z, self.dt)
+
+        self._save_prev()
+        self.sample = (Vx, Vy, Vz, Ax, Ay, Az, Pitch, Roll, Yaw, PitchRate, RollRate, YawRate, x, y, z)
+        self.horizon = 0.0
+        self._fresh = True
 
-        
         # 计算当前速度和加速度
-        self.forward_v, self.right_v, self.up_v = world_to_body_velocity(Vx, Vy, Vz, Pitch, Roll, Yaw)
-        forward_acc, right_acc, up_acc = world_to_body_velocity(Ax, Ay, Az, Pitch, Roll, Yaw)
-        self.forward_acc = self.ema_forward_acc.update(forward_acc)
-        self.right_acc = self.ema_right_acc.update(right_acc)   
-        self.up_acc = self.ema_up_acc.update(up_acc)
+        self.frame.set_attitude(Pitch, Roll, Yaw)
+        self.forward_v, self.right_v, self.up_v = self.frame.world_to_body(Vx, Vy, Vz)
+        forward_acc, right_acc, up_acc = self.frame.world_to_body(Ax, Ay, Az)
+        if self.estimator is None:
+            forward_acc = self.ema_forward_acc.update(forward_acc)
+            right_acc = self.ema_right_acc.update(right_acc)
+            up_acc = self.ema_up_acc.update(up_acc)
+        self.forward_acc = forward_acc
+        self.right_acc = right_acc
+        self.up_acc = up_acc
         self.pitch = Pitch
         self.roll = Roll
         self.yaw = Yaw
@@ -80,9 +122,53 @@ class MotionState:
         self.y = y
         self.z = z
 
+    def predict(self, horizon, dt=None):
+        """
+        把状态外推到最近一帧之后 horizon 秒（限制在 0..PREDICT_MAX），供两帧之间的控制步使用：
+        姿态按角速度、速度按比力（扣除重力）、位置按速度与加速度推算；加速度与角速度沿用该帧。
+        dt：本拍间隔，替代 update 给出的帧间隔（控制步以此推进 PID）。
+        """
+        if self._fresh:
+            self._fresh = False
+        else:
+            self._save_prev()
+        if dt is not None and dt > 0.0:
+            self.dt = clamp(dt, DT_MIN, DT_MAX)
+        h = clamp(horizon, 0.0, PREDICT_MAX)
+        self.horizon = h
+
+        Vx, Vy, Vz, Ax, Ay, Az, Pitch, Roll, Yaw, PitchRate, RollRate, YawRate, x, y, z = self.sample
+        # 角速度与欧拉角速率的关系取小角近似；YawRate 与航向增加方向相反（见 heli_sim）
+        self.pitch = Pitch + PitchRate * h
+        self.roll = Roll + RollRate * h
+        self.yaw = Yaw - YawRate * h
+        ay = Ay - G
+        half = 0.5 * h * h
+        self.x = x + Vx * h + Ax * half
+        self.y = y + Vy * h + ay * half
+        self.z = z + Vz * h + Az * half
+
+        self.frame.set_attitude(self.pitch, self.roll, self.yaw)
+        self.forward_v, self.right_v, self.up_v = self.frame.world_to_body(Vx + Ax * h, Vy + ay * h, Vz + Az * h)
+
+    def _save_prev(self):
+        self.prev_forward_v, self.prev_right_v, self.prev_up_v = self.forward_v, self.right_v, self.up_v
+        self.prev_forward_acc, self.prev_right_acc, self.prev_up_acc = self.forward_acc, self.right_acc, self.up_acc
+        self.prev_pitch, self.prev_roll, self.prev_yaw = self.pitch, self.roll, self.yaw
+        self.prev_pitch_rate, self.prev_roll_rate, self.prev_yaw_rate = self.pitch_rate, self.roll_rate, self.yaw_rate
+        self.prev_x, self.prev_y, self.prev_z = self.x, self.y, self.z
+
+    def _measure_dt(self, dt, model_time):
+        if model_time > self.model_time > 0.0:
+            dt = model_time - self.model_time
+        self.model_time = model_time
+        if dt is None or dt <= 0.0:
+            return self.dt
+        return clamp(dt, DT_MIN, DT_MAX)
+
     def get_position_delta(self, x, y, z):
         dx, dy, dz = x - self.x, y - self.y, z - self.z
-        return world_to_body_velocity(dx, dy, dz, self.pitch, self.roll, self.yaw)
+        return self.frame.world_to_body(dx, dy, dz)
 
     def debug_print(self):
         return f" Vf={self.forward_v:+.2f} Vr={self.right_v:+.2f} |" \
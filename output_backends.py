@@ -0,0 +1,154 @@
+"""
+轴输出后端：把控制输出（cyclic_x, cyclic_y, rudder，-1..1）写到虚拟摇杆。
+公共流程（OutputBackend.write）：量化为 0..32767 → 只把与上次写入值不同的轴交给 _flush，由各后端一次性提交。
+防卡死保活：某轴连续 keepalive 秒未变化时写入 ±1 LSB 翻转值（下一个间隔再翻回），
+取代原先每拍的随机扰动，悬停稳定时写入次数随之大幅下降。
+  VJoyBackend     Windows vJoy：改写 VJoyDevice.data 后一次 update()（一次驱动调用）
+  UinputBackend   Linux uinput 虚拟摇杆（python-evdev）：逐轴 write 后一次 syn()
+  RecordingBackend  内存记录，测试/回放用
+cyclic_y 按 vJoy 约定取反后写入（DCS 中勿再反向）。
+"""
+import sys
+
+from utils import norm_to_vjoy
+
+try:
+    import pyvjoy
+except ImportError:
+    pyvjoy = None
+
+try:
+    import evdev
+except ImportError:
+    evdev = None
+
+OUTPUT_AXES = ("cyclic_x", "cyclic_y", "rudder")
+
+# 量化后的轴范围
+AXIS_MAX = 32767
+
+# uinput 设备名（含 "virtual"，JoystickMonitor 不会把它当作物理摇杆读回）
+UINPUT_NAME = "DCS Helicopter Assist Virtual Joystick"
+
+
+class OutputBackend:
+    """
+    keepalive：保活间隔（秒），<= 0 关闭。
+    统计：writes 为提交次数，axis_writes 为写入的轴数。
+    """
+
+    def __init__(self, keepalive: float = 0.5):
+        self.keepalive = keepalive
+        self.target = [None, None, None]   # 各轴最新量化值
+        self.written = [None, None, None]  # 各轴实际写入值（保活时与 target 差 1）
+        self.stamp = [0.0, 0.0, 0.0]       # 各轴上次写入时刻
+        self.writes = 0
+        self.axis_writes = 0
+
+    def write(self, cyclic_x: float, cyclic_y: float, rudder: float, now: float):
+        """now：单调时钟秒数（控制循环的 perf_counter 时刻）"""
+        values = (norm_to_vjoy(cyclic_x), norm_to_vjoy(-cyclic_y), norm_to_vjoy(rudder))
+        target = self.target
+        written = self.written
+        stamp = self.stamp
+        keepalive = self.keepalive
+
+        changed = []
+        for i in range(3):
+            v = values[i]
+            if v != target[i]:
+                target[i] = v
+            elif keepalive <= 0.0 or now - stamp[i] < keepalive:
+                continue
+            elif written[i] == v:
+                v = v - 1 if v >= AXIS_MAX else v + 1
+            changed.append((i, v))
+            written[i] = v
+            stamp[i] = now
+        if not changed:
+            return
+        self._flush(changed)
+        self.writes += 1
+        self.axis_writes += len(changed)
+
+    def reset(self):
+        """忘记上次写入值，下一次 write 写全部轴"""
+        self.target = [None, None, None]
+        self.written = [None, None, None]
+
+    def _flush(self, changed):
+        """changed：[(轴下标, 0..32767)]，一次提交"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class VJoyBackend(OutputBackend):
+    name = "vjoy"
+
+    def __init__(self, device_id: int, keepalive: float = 0.5):
+        super().__init__(keepalive)
+        self.device = pyvjoy.VJoyDevice(device_id)
+        # 轴下标 -> 位置结构体字段（X / Y / RZ）；update() 提交整个结构体
+        self._fields = ("wAxisX", "wAxisY", "wAxisZRot")
+
+    def _flush(self, changed):
+        data = self.device.data
+        fields = self._fields
+        for axis, value in changed:
+            setattr(data, fields[axis], value)
+        self.device.update()
+
+
+class UinputBackend(OutputBackend):
+    name = "uinput"
+
+    def __init__(self, keepalive: float = 0.5):
+        super().__init__(keepalive)
+        ecodes = evdev.ecodes
+        self._codes = (ecodes.ABS_X, ecodes.ABS_Y, ecodes.ABS_RZ)
+        info = evdev.AbsInfo(value=AXIS_MAX // 2, min=0, max=AXIS_MAX, fuzz=0, flat=0, resolution=0)
+        capabilities = {
+            ecodes.EV_ABS: [(code, info) for code in self._codes],
+            # 部分程序只把带按键的设备识别为游戏杆
+            ecodes.EV_KEY: [ecodes.BTN_TRIGGER],
+        }
+        self.device = evdev.UInput(capabilities, name=UINPUT_NAME)
+
+    def _flush(self, changed):
+        device = self.device
+        codes = self._codes
+        for axis, value in changed:
+            device.write(evdev.ecodes.EV_ABS, codes[axis], value)
+        device.syn()
+
+    def close(self):
+        self.device.close()
+
+
+class RecordingBackend(OutputBackend):
+    """每次提交记为 [(轴下标, 值), ...]；state 为各轴当前值"""
+
+    name = "recording"
+
+    def __init__(self, keepalive: float = 0.5):
+        super().__init__(keepalive)
+        self.flushes = []
+        self.state = [AXIS_MAX // 2] * 3
+
+    def _flush(self, changed):
+        self.flushes.append(changed)
+        for axis, value in changed:
+            self.state[axis] = value
+
+
+def create_output(name: str = "auto", device_id: int = 1, keepalive: float = 0.5) -> OutputBackend:
+    """"auto" | "vjoy" | "uinput" -> 后端实例；所需库不可用时返回 None"""
+    if name == "auto":
+        name = "uinput" if sys.platform.startswith("linux") else "vjoy"
+    if name == "vjoy":
+        return VJoyBackend(device_id, keepalive) if pyvjoy is not None else None
+    if name == "uinput":
+        return UinputBackend(keepalive) if evdev is not None else None
+    raise ValueError(f"unknown output backend: {name}")
@@ -0,0 +1,267 @@
+from itertools import repeat
+
+import config
+
+
+# update_many 的默认逐项参数
+_NO_RATES = repeat(None)
+_ALL_DUE = repeat(True)
+
+
+def _field(name):
+    def fget(self):
+        return getattr(self.bank, name)[self.index]
+
+    def fset(self, value):
+        getattr(self.bank, name)[self.index] = value
+
+    return property(fget, fset)
+
+
+class PIDBank:
+    """
+    PID 控制器组：N 个控制器的增益、积分、上次误差、微分 EMA、跳帧计数
+    集中存放在按控制器索引的定长列表中（结构数组），一次调用批量更新本拍到期的控制器。
+    数值行为与 PIDCalculatorNew 的 update / manual_override / update_ki 逐位一致
+    （见 tests/test_pid_bank.py）。
+    """
+
+    _PARAMS = (
+        "Kp_base", "Ki", "Kd", "adaptive_factor", "max_auth",
+        "integral_max", "integral_leak", "stable_threshold",
+    )
+    _STATE = ("auto", "error_integral", "prev_error", "rate", "ema_y", "elapsed")
+
+    def __init__(self):
+        self.ema_alpha = config.EMA_ALPHA
+        for name in self._PARAMS + self._STATE:
+            setattr(self, name, [])
+        self.skip = []
+        self.skip_count = []
+        self.ema_inited = []
+        self.size = 0
+
+    def add(
+        self,
+        Kp_base=0.5,
+        Ki=0.1,
+        Kd=0.08,
+        adaptive_factor=0.003,
+        max_auth=0.35,
+        integral_max=5.0,
+        integral_leak=0.0,
+        skip=1,
+        stable_threshold=0.02,
+    ) -> "PIDHandle":
+        """追加一个控制器（参数同 PIDCalculatorNew），返回其句柄"""
+        self.Kp_base.append(Kp_base)
+        self.Ki.append(Ki)
+        self.Kd.append(Kd)
+        self.adaptive_factor.append(adaptive_factor)
+        self.max_auth.append(max_auth)
+        self.integral_max.append(integral_max)
+        self.integral_leak.append(integral_leak)
+        self.stable_threshold.append(stable_threshold)
+        for name in self._STATE:
+            getattr(self, name).append(0.0)
+        self.skip.append(skip)
+        self.skip_count.append(0)
+        self.ema_inited.append(False)
+        self.size += 1
+        return PIDHandle(self, self.size - 1)
+
+    # -------------------------------
+    # 批量接口
+    # -------------------------------
+    def update_many(self, indices, errors, delta_times, rates=None, mask=None):
+        """
+        批量更新 indices 中的控制器；rates 为 None 或逐项（None 表示由误差差分求微分），
+        mask 为 None 或逐项布尔，False 的控制器本拍跳过。
+        """
+        Kp_base, Ki_arr, Kd_arr = self.Kp_base, self.Ki, self.Kd
+        adaptive, max_auth, integral_max, leak = self.adaptive_factor, self.max_auth, self.integral_max, self.integral_leak
+        auto, integral, prev_error, rate_arr = self.auto, self.error_integral, self.prev_error, self.rate
+        ema_y, ema_inited, skip_count = self.ema_y, self.ema_inited, self.skip_count
+        alpha = self.ema_alpha
+        beta = 1 - alpha
+        if rates is None:
+            rates = _NO_RATES
+        if mask is None:
+            mask = _ALL_DUE
+
+        for i, error, delta_time, rate, due in zip(indices, errors, delta_times, rates, mask):
+            if not due:
+                continue
+
+            # 自适应比例增益
+            Kp = Kp_base[i] + adaptive[i] * abs(error)
+
+            # 误差微分（EMA 平滑）
+            if rate is None:
+                rate = (error - prev_error[i]) / delta_time
+            if ema_inited[i]:
+                rate = alpha * rate + beta * ema_y[i]
+            else:
+                ema_inited[i] = True
+            ema_y[i] = rate
+            rate_arr[i] = rate
+            prev_error[i] = error
+
+            # 积分泄漏 + 积分项
+            ei = integral[i]
+            ei -= leak[i] * ei
+            ei += error * delta_time
+            Ki = Ki_arr[i]
+            limit = integral_max[i] / Ki if Ki != 0 else 0
+            if ei > limit:
+                ei = limit
+            elif ei < -limit:
+                ei = -limit
+            integral[i] = ei
+
+            # PID 控制
+            out = Kp * error + Ki * ei + Kd_arr[i] * rate
+            limit = max_auth[i]
+            if out > limit:
+                out = limit
+            elif out < -limit:
+                out = -limit
+            auto[i] = out
+            skip_count[i] = 0
+
+    def update_skip_many(self, indices, delta_times):
+        skip_count, elapsed = self.skip_count, self.elapsed
+        for n, i in enumerate(indices):
+            skip_count[i] += 1
+            elapsed[i] += delta_times[n]
+
+    def all_available(self, indices) -> bool:
+        skip, skip_count = self.skip, self.skip_count
+        for i in indices:
+            if skip_count[i] < skip[i]:
+                return False
+        return True
+
+    # -------------------------------
+    # 单个控制器接口（与 PIDCalculatorNew 同名方法一致）
+    # -------------------------------
+    def update(self, i, error, rate, delta_time):
+        self.update_many((i,), (error,), (delta_time,), None if rate is None else (rate,))
+
+    def manual_override(self, i, error, rate, delta_time, manual_input, prev_error, skip):
+        # 自适应比例增益
+        Kp = self.Kp_base[i] + self.adaptive_factor[i] * abs(error)
+        self.skip_count[i] = skip
+
+        # 误差微分
+        if rate is None:
+            rate = (error - prev_error) / delta_time
+        if self.ema_inited[i]:
+            rate = self.ema_alpha * rate + (1 - self.ema_alpha) * self.ema_y[i]
+        else:
+            self.ema_inited[i] = True
+        self.ema_y[i] = rate
+        self.rate[i] = rate
+        self.prev_error[i] = error
+
+        # 积分反馈
+        self.error_integral[i] = ((manual_input - Kp * error - self.Kd[i] * rate) / self.Ki[i])
+
+    def update_ki(self, i, new_ki):
+        if new_ki == 0 or self.error_integral[i] == 0:
+            self.error_integral[i] = 0.0
+            self.Ki[i] = new_ki
+            return
+        self.error_integral[i] = self.Ki[i] / new_ki * self.error_integral[i]
+        self.Ki[i] = new_ki
+
+    def configure(self, i, **params):
+        """
+        原地修改控制器 i 的参数（名称同 add），不清积分/微分状态；
+        Ki 变化按 update_ki 换算积分，使积分项输出连续。
+        """
+        for name, value in params.items():
+            if name == "Ki":
+                if value != self.Ki[i]:
+                    self.update_ki(i, value)
+            elif name == "skip":
+                self.skip[i] = int(value)
+            elif name in self._PARAMS:
+                getattr(self, name)[i] = value
+            else:
+                raise ValueError(f"unknown PID parameter: {name}")
+
+    def update_skip(self, i, delta_time=0.0):
+        self.skip_count[i] += 1
+        self.elapsed[i] += delta_time
+
+    def take_elapsed(self, i, nominal):
+        elapsed = self.elapsed[i] if self.elapsed[i] > 0.0 else nominal
+        self.elapsed[i] = 0.0
+        return elapsed
+
+    def is_available(self, i):
+        return self.skip_count[i] >= self.skip[i]
+
+    def reset(self, i):
+        self.auto[i] = 0.0
+        self.error_integral[i] = 0.0
+        self.prev_error[i] = 0.0
+        self.rate[i] = 0.0
+        self.elapsed[i] = 0.0
+        self.ema_y[i] = 0.0
+        self.ema_inited[i] = False
+
+
+class PIDHandle:
+    """
+    PIDBank 中单个控制器的句柄，接口与 PIDCalculatorNew 相同，
+    便于级联代码逐步迁移到批量更新。
+    """
+
+    __slots__ = ("bank", "index")
+
+    def __init__(self, bank: PIDBank, index: int):
+        self.bank = bank
+        self.index = index
+
+    Kp_base = _field("Kp_base")
+    Ki = _field("Ki")
+    Kd = _field("Kd")
+    adaptive_factor = _field("adaptive_factor")
+    max_auth = _field("max_auth")
+    integral_max = _field("integral_max")
+    integral_leak = _field("integral_leak")
+    stable_threshold = _field("stable_threshold")
+    skip = _field("skip")
+    auto = _field("auto")
+    error_integral = _field("error_integral")
+    prev_error = _field("prev_error")
+    rate = _field("rate")
+
+    def update(self, error, rate, delta_time):
+        self.bank.update(self.index, error, rate, delta_time)
+
+    def manual_override(self, error, rate, delta_time, manual_input, prev_error, skip):
+        self.bank.manual_override(self.index, error, rate, delta_time, manual_input, prev_error, skip)
+
+    def update_ki(self, new_ki):
+        self.bank.update_ki(self.index, new_ki)
+
+    def update_max_integral(self, new_max_integral):
+        self.bank.integral_max[self.index] = new_max_integral
+
+    def update_skip(self, delta_time=0.0):
+        self.bank.update_skip(self.index, delta_time)
+
+    def take_elapsed(self, nominal):
+        return self.bank.take_elapsed(self.index, nominal)
+
+    def is_available(self):
+        return self.bank.is_available(self.index)
+
+    def is_stable(self):
+        return self.bank.prev_error[self.index] <= self.bank.stable_threshold[self.index]
+
+    def reset(self):
+        self.bank.reset(self.index)
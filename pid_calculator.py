@@ -36,7 +36,8 @@ class PIDCalculator:
 
         self.ema_rate = EMA(config.EMA_ALPHA)
 
-    def update(self, error, rate, preError=0.0, manual=0.0, forgetting_factor=0.1):
+    def update(self, error, rate, preError=0.0, manual=0.0, forgetting_factor=0.1, delta_time=None):
+        dt = self.dt if delta_time is None else delta_time
         if abs(manual) < 0.02:
         # 自适应比例增益
             Kp = self.Kp_base + self.adaptive_factor * abs(error)
@@ -48,7 +49,7 @@ class PIDCalculator:
 
             # 误差微分
             if rate == None:
-                self.rate = self.ema_rate.update((error - self.prev_error) / self.dt)
+                self.rate = self.ema_rate.update((error - self.prev_error) / dt)
                 self.prev_error = error
             else:
                 self.rate = self.ema_rate.update(rate)
@@ -59,7 +60,7 @@ class PIDCalculator:
             self.error_integral -= 0.01 * max(abs(self.rate), 0.1) * self.error_integral
 
             # 积分项
-            self.error_integral += error * self.dt
+            self.error_integral += error * dt
             self.error_integral = max(min(self.error_integral, self.integral_max), self.integral_min)
             
             # PID 控制
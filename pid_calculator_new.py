@@ -32,6 +32,7 @@ class PIDCalculatorNew:
         self.prev_error = 0.0
         self.rate = 0.0
         self._skip = 0
+        self._elapsed = 0.0
 
         self.ema_rate = EMA(config.EMA_ALPHA)
 
@@ -90,8 +91,16 @@ class PIDCalculatorNew:
     def update_max_integral(self, new_max_integral):
         self.integral_max = new_max_integral
 
-    def update_skip(self):
+    def update_skip(self, delta_time=0.0):
+        # 累计跳过期间的实际时间，供外环以真实间隔更新
         self._skip += 1
+        self._elapsed += delta_time
+
+    def take_elapsed(self, nominal):
+        """取出自上次取出以来累计的时间（无累计时返回 nominal）"""
+        elapsed = self._elapsed if self._elapsed > 0.0 else nominal
+        self._elapsed = 0.0
+        return elapsed
 
     def is_available(self):
         return self._skip >= self.skip
@@ -105,4 +114,5 @@ class PIDCalculatorNew:
         self.error_integral = 0.0
         self.prev_error = 0.0
         self.rate = 0.0
+        self._elapsed = 0.0
         self.ema_rate = EMA(config.EMA_ALPHA)
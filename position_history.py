@@ -0,0 +1,254 @@
+"""
+悬停位置历史：定长环形数组记录悬停期间的位置与相对锚点的偏移，供漂移分析、诊断输出与锚点悬停使用。
+每个样本一次写入若干 array 槽位（不分配内存），查询复杂度：
+  按时间定位窗口起点   O(log n)（时间单调，二分查找）
+  窗口均值/RMS/框内占比 O(1)（按样本序号累计的前缀和，两次相减）
+  窗口最大偏离半径     O(log n)（环形槽位上的最大值线段树；写入只写叶子，
+                        内部节点在查询时按上次查询以来写入的连续槽位逐层批量更新）
+偏移为飞机相对锚点（进入悬停时的位置）：世界系 北/上/东，机体系 前/右（按该样本的姿态变换）。
+"""
+import math
+from array import array
+
+# 默认记录时长（秒）与最小记录间隔（秒）：控制频率高于 1/PERIOD 时按间隔抽取
+SECONDS = 600.0
+PERIOD = 0.02
+
+# 悬停框半径（米）：框内占比统计所用的水平偏离上限
+BOX = 2.0
+
+# 前缀和列
+_SUMS = ("s_north", "s_east", "s_sq", "s_up", "s_up_sq", "s_in")
+
+
+class PositionHistory:
+    """
+    record(dt, motion_state) 每个控制步调用（累计 dt 作为时间轴），reset(x, y, z) 在进入悬停时设置锚点并清空。
+    窗口查询的 seconds 以最新样本为终点；窗口内样本不足两个时各统计为 0。
+    """
+
+    def __init__(self, seconds=SECONDS, period=PERIOD, box=BOX):
+        self.period = period
+        self.box = box
+        self.capacity = max(2, int(math.ceil(seconds / period)) + 1)
+
+        cap = self.capacity
+        self.t = array("d", bytes(8 * cap))
+        self.north = array("d", bytes(8 * cap))
+        self.up = array("d", bytes(8 * cap))
+        self.east = array("d", bytes(8 * cap))
+        self.forward = array("d", bytes(8 * cap))
+        self.right = array("d", bytes(8 * cap))
+        # 前缀和：槽位 k % cap 存放序号 0..k 的累计值（自 reset 起）
+        for name in _SUMS:
+            setattr(self, name, array("d", bytes(8 * cap)))
+
+        # 最大偏离半径线段树（叶子为槽位，空槽为 0）
+        size = 1
+        while size < cap:
+            size <<= 1
+        self._leaves = size
+        self._tree = array("d", bytes(8 * 2 * size))
+
+        self.anchor_x = self.anchor_y = self.anchor_z = 0.0
+        self.reset(0.0, 0.0, 0.0)
+
+    def reset(self, x, y, z):
+        """设置锚点（世界坐标）并清空历史"""
+        self.anchor_x, self.anchor_y, self.anchor_z = x, y, z
+        self.head = 0          # 下一个样本的序号
+        self.tail = 0          # 最旧有效样本的序号
+        self.time = 0.0
+        self._next = 0.0
+        # 前缀和与线段树不必清零：查询只覆盖有效序号，其槽位在写入时、祖先节点在查询前已更新
+        self._totals = [0.0] * len(_SUMS)
+        # 线段树内部节点已更新到的序号（之后写入的叶子待 _flush）
+        self._clean = 0
+
+    # -------------------------------
+    # 写入
+    # -------------------------------
+    def record(self, dt, motion_state):
+        """推进时间 dt 并在到达记录间隔时记录 motion_state 的当前位置；返回是否写入"""
+        self.time += dt
+        if self.head > self.tail and self.time < self._next:
+            return False
+        # 留 1 us 余量：控制步间隔恰为 period 时累加误差不致隔一拍才记录
+        self._next = self.time + self.period - 1e-6
+
+        north = motion_state.x - self.anchor_x
+        up = motion_state.y - self.anchor_y
+        east = motion_state.z - self.anchor_z
+        forward, right, _ = motion_state.frame.world_to_body(north, up, east)
+        sq = north * north + east * east
+        radius = math.sqrt(sq)
+
+        cap = self.capacity
+        k = self.head
+        i = k % cap
+        self.t[i] = self.time
+        self.north[i] = north
+        self.up[i] = up
+        self.east[i] = east
+        self.forward[i] = forward
+        self.right[i] = right
+
+        totals = self._totals
+        totals[0] += north
+        totals[1] += east
+        totals[2] += sq
+        totals[3] += up
+        totals[4] += up * up
+        totals[5] += radius <= self.box
+        self.s_north[i], self.s_east[i], self.s_sq[i], self.s_up[i], self.s_up_sq[i], self.s_in[i] = totals
+
+        self._tree[i + self._leaves] = radius
+
+        # 保留 cap - 1 个样本：最旧样本前一个序号的前缀和（下一个待写槽位）仍然有效
+        self.head = k + 1
+        if self.head - self.tail >= cap:
+            self.tail = self.head - cap + 1
+        return True
+
+    # -------------------------------
+    # 查询
+    # -------------------------------
+    def __len__(self):
+        return self.head - self.tail
+
+    def start(self, seconds):
+        """最新样本前 seconds 秒内最旧样本的序号（O(log n)）"""
+        if self.head == self.tail:
+            return self.head
+        cap, t = self.capacity, self.t
+        since = t[(self.head - 1) % cap] - seconds
+        lo, hi = self.tail, self.head - 1
+        while lo < hi:
+            mid = (lo + hi) >> 1
+            if t[mid % cap] < since:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _sum(self, column, first, last):
+        """序号 first..last（含）的列累计值之差"""
+        cap = self.capacity
+        total = column[last % cap]
+        if first > 0:
+            total -= column[(first - 1) % cap]
+        return total
+
+    def _flush(self):
+        """把上次查询以来写入的叶子逐层更新到祖先节点（O(m + log n)，m 为新样本数）"""
+        pending = self.head - self._clean
+        self._clean = self.head
+        if pending <= 0:
+            return
+        cap = self.capacity
+        if pending >= cap:
+            self._propagate(0, cap - 1)
+            return
+        a, b = (self.head - pending) % cap, (self.head - 1) % cap
+        if a <= b:
+            self._propagate(a, b)
+        else:
+            self._propagate(a, cap - 1)
+            self._propagate(0, b)
+
+    def _propagate(self, lo, hi):
+        """更新槽位 lo..hi（含）的全部祖先节点"""
+        tree = self._tree
+        lo += self._leaves
+        hi += self._leaves
+        while lo > 1:
+            lo >>= 1
+            hi >>= 1
+            for j in range(lo, hi + 1):
+                left = tree[2 * j]
+                right_value = tree[2 * j + 1]
+                tree[j] = left if left > right_value else right_value
+
+    def _max(self, first, last):
+        """序号 first..last（含）的最大偏离半径（O(log n)，先补齐待更新的节点）"""
+        self._flush()
+        cap = self.capacity
+        a, b = first % cap, last % cap
+        if a <= b:
+            return self._tree_max(a, b + 1)
+        return max(self._tree_max(a, cap), self._tree_max(0, b + 1))
+
+    def _tree_max(self, lo, hi):
+        tree = self._tree
+        lo += self._leaves
+        hi += self._leaves
+        best = 0.0
+        while lo < hi:
+            if lo & 1:
+                if tree[lo] > best:
+                    best = tree[lo]
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                if tree[hi] > best:
+                    best = tree[hi]
+            lo >>= 1
+            hi >>= 1
+        return best
+
+    def offset(self):
+        """最新样本相对锚点的偏移 (北, 上, 东, 前, 右)"""
+        if self.head == self.tail:
+            return 0.0, 0.0, 0.0, 0.0, 0.0
+        i = (self.head - 1) % self.capacity
+        return self.north[i], self.up[i], self.east[i], self.forward[i], self.right[i]
+
+    def drift(self, seconds):
+        """窗口首尾样本间的水平位移（米）与平均漂移速度（米/秒）"""
+        first, last = self.start(seconds), self.head - 1
+        if last <= first:
+            return 0.0, 0.0
+        cap = self.capacity
+        a, b = first % cap, last % cap
+        distance = math.hypot(self.north[b] - self.north[a], self.east[b] - self.east[a])
+        return distance, distance / max(self.t[b] - self.t[a], 1e-9)
+
+    def rms(self, seconds):
+        """窗口内相对锚点的水平位置误差 RMS（米）"""
+        first, last = self.start(seconds), self.head - 1
+        if last <= first:
+            return 0.0
+        return math.sqrt(max(0.0, self._sum(self.s_sq, first, last)) / (last - first + 1))
+
+    def box_stats(self, seconds):
+        """
+        窗口内的悬停框统计：
+          center_north / center_east  平均位置相对锚点（米）
+          spread     水平位置绕平均位置的标准差（米）
+          rms        水平位置误差 RMS（米，相对锚点）
+          max        最大水平偏离半径（米）
+          in_box     水平偏离不超过 box 的样本占比
+          up_mean / up_rms  高度偏差均值与 RMS（米）
+          samples / span    样本数与时间跨度（秒）
+        """
+        first, last = self.start(seconds), self.head - 1
+        n = last - first + 1
+        if n < 2:
+            return dict(center_north=0.0, center_east=0.0, spread=0.0, rms=0.0, max=0.0, in_box=1.0,
+                        up_mean=0.0, up_rms=0.0, samples=max(n, 0), span=0.0)
+        cap = self.capacity
+        mean_n = self._sum(self.s_north, first, last) / n
+        mean_e = self._sum(self.s_east, first, last) / n
+        mean_sq = max(0.0, self._sum(self.s_sq, first, last) / n)
+        return dict(
+            center_north=mean_n,
+            center_east=mean_e,
+            spread=math.sqrt(max(0.0, mean_sq - mean_n * mean_n - mean_e * mean_e)),
+            rms=math.sqrt(mean_sq),
+            max=self._max(first, last),
+            in_box=self._sum(self.s_in, first, last) / n,
+            up_mean=self._sum(self.s_up, first, last) / n,
+            up_rms=math.sqrt(max(0.0, self._sum(self.s_up_sq, first, last) / n)),
+            samples=n,
+            span=self.t[last % cap] - self.t[first % cap],
+        )
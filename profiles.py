@@ -0,0 +1,158 @@
+"""
+机型整定档案：{"cyclic": {...}, "rudder": {...}, "cyclic_params": {...}, "input": {...}}
+  cyclic / rudder：PID 增益覆盖（格式同 gains.py，tuner.py 的输出即为合法档案）
+  cyclic_params：周期杆辅助的非 PID 参数（见 cyclic_helper.DEFAULT_PARAMS）
+  input：InputProcessor 参数（expo_cyclic, expo_rudder, rate_up, rate_down）
+未列出的项取内置默认值。
+
+热加载：ProfileWatcher 在后台线程轮询文件，变化后解析并校验，成功才发布；
+控制线程每拍开始时 take() 取新档案并原地应用（不重建控制器、不清积分）。
+"""
+import math
+import os
+import threading
+import time
+from pathlib import Path
+
+import config
+import cyclic_helper
+import rudder_helper
+from gains import load_gains, merge_gains
+
+PROFILE_DIR = "profiles"
+
+SECTIONS = ("cyclic", "rudder", "cyclic_params", "input")
+
+# InputProcessor 默认参数
+DEFAULT_INPUT = {
+    "expo_cyclic": 0.5,
+    "expo_rudder": 0.5,
+    "rate_up": 1.0,
+    "rate_down": 2.0,
+}
+
+# 已废弃的 input 参数（随机扰动已由输出后端的保活翻转取代），旧档案中出现时忽略
+_OBSOLETE_INPUT = ("dither_threshold", "dither_amplitude")
+
+# 参数取值范围 (下限, 上限)，None 表示不限
+_GAIN_RANGES = {
+    "Kp_base": (0.0, None),
+    "Ki": (0.0, None),
+    "Kd": (0.0, None),
+    "adaptive_factor": (0.0, None),
+    "max_auth": (1e-9, None),
+    "integral_max": (0.0, None),
+    "integral_leak": (0.0, 0.999),
+    "skip": (1, None),
+    "stable_threshold": (0.0, None),
+}
+_CYCLIC_PARAM_RANGES = {
+    "pitch_rate_ki": (1e-9, None),
+    "hover_pitch_rate_integral_max": (0.0, None),
+}
+_INPUT_RANGES = {
+    "expo_cyclic": (0.0, 1.0),
+    "expo_rudder": (0.0, 1.0),
+    "rate_up": (1e-3, None),
+    "rate_down": (1e-3, None),
+}
+
+
+def _check(name, value, bounds):
+    low, high = bounds
+    if not math.isfinite(value) or value < low or (high is not None and value > high):
+        raise ValueError(f"{name}={value} out of range")
+
+
+def parse_profile(data: dict = None) -> dict:
+    """校验档案并与默认值合并，返回完整档案；非法内容抛 ValueError"""
+    data = data or {}
+    if not isinstance(data, dict):
+        raise ValueError("profile root must be an object")
+    for section in data:
+        if section not in SECTIONS and section != "description":
+            raise ValueError(f"unknown profile section: {section}")
+
+    profile = {
+        "cyclic": merge_gains(cyclic_helper.DEFAULT_GAINS, data.get("cyclic")),
+        "rudder": merge_gains(rudder_helper.DEFAULT_GAINS, data.get("rudder")),
+        "cyclic_params": dict(cyclic_helper.DEFAULT_PARAMS),
+        "input": dict(DEFAULT_INPUT),
+    }
+    for section in ("cyclic", "rudder"):
+        for name, params in profile[section].items():
+            for key, value in params.items():
+                _check(f"{section}.{name}.{key}", value, _GAIN_RANGES[key])
+    for key, value in (data.get("cyclic_params") or {}).items():
+        if key not in cyclic_helper.DEFAULT_PARAMS:
+            raise ValueError(f"unknown cyclic parameter: {key}")
+        value = float(value)
+        _check(f"cyclic_params.{key}", value, _CYCLIC_PARAM_RANGES[key])
+        profile["cyclic_params"][key] = value
+    for key, value in (data.get("input") or {}).items():
+        if key in _OBSOLETE_INPUT:
+            continue
+        if key not in DEFAULT_INPUT:
+            raise ValueError(f"unknown input parameter: {key}")
+        value = float(value)
+        _check(f"input.{key}", value, _INPUT_RANGES[key])
+        profile["input"][key] = value
+    return profile
+
+
+def load_profile(path) -> dict:
+    return parse_profile(load_gains(path))
+
+
+def profile_path(name: str) -> Path:
+    """档案名 -> 文件路径：以 .json 结尾视为路径，否则为配置目录下 profiles/<name>.json"""
+    if name.endswith(".json"):
+        return Path(name)
+    return config.config_dir() / PROFILE_DIR / f"{name}.json"
+
+
+class ProfileWatcher(threading.Thread):
+    """
+    轮询档案文件（修改时间 + 大小），变化时在本线程内读取、解析、校验，
+    成功后以一次属性赋值发布 (generation, profile)；解析失败保留上一份并打印警告。
+    """
+
+    def __init__(self, path, interval=0.5):
+        super().__init__(daemon=True)
+        self.path = Path(path)
+        self.interval = interval
+        self._stamp = None
+        self._published = (0, None)
+        self._taken = 0
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            self.poll()
+
+    def poll(self) -> bool:
+        """检查一次文件，发布了新档案返回 True"""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return False
+        stamp = (st.st_mtime_ns, st.st_size)
+        if stamp == self._stamp:
+            return False
+        self._stamp = stamp
+
+        try:
+            profile = load_profile(self.path)
+        except (OSError, ValueError) as e:
+            print(f"[WARN] Profile {self.path} not applied: {e}")
+            return False
+        self._published = (self._published[0] + 1, profile)
+        return True
+
+    def take(self):
+        """控制线程调用：返回尚未取走的新档案，否则 None"""
+        generation, profile = self._published
+        if generation == self._taken:
+            return None
+        self._taken = generation
+        return profile
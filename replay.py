@@ -0,0 +1,215 @@
+"""
+离线回放：把录制的遥测帧按虚拟时钟送入 AssistCore（MotionState、InputProcessor、
+CyclicHelper、RudderHelper），记录每帧的轴输出。不睡眠、不依赖 pyvjoy/keyboard/winsound。
+
+录制格式（自动识别）：
+  - JSON 行：每行一帧，键同 Export.lua（Vx ... PosZ），可选 Seq/ModelTime/RecvTime(或 t)，
+    可选飞行员输入 ManualX/ManualY/ManualRudder 与模式 CyclicMode(0/1/2)/RudderEnabled
+  - 二进制：Export.lua 二进制帧首尾相接
+
+用法：
+  python replay.py run capture.jsonl [--cyclic-mode 2] [--rudder] [--out outputs.csv]
+  python replay.py capture capture.jsonl      # 从 UDP 录制 JSON 行（Ctrl+C 结束）
+"""
+import argparse
+import json
+import sys
+import time
+from array import array
+
+from assist_core import AssistCore, LOOP_DT
+from telemetry_protocol import FRAME_SIZE, MAGIC, decode_binary
+from telemetry_snapshot import IDX_MODEL_TIME, IDX_RECV_TIME, SNAPSHOT_FIELDS, TelemetrySnapshot
+
+MANUAL_KEYS = ("ManualX", "ManualY", "ManualRudder")
+
+
+class ReplayFrame:
+    """一帧录制数据：快照值（SNAPSHOT_FIELDS 顺序）+ 可选的飞行员输入与模式切换"""
+
+    __slots__ = ("values", "manual", "cyclic_mode", "rudder_enabled")
+
+    def __init__(self, values, manual=None, cyclic_mode=None, rudder_enabled=None):
+        self.values = values
+        self.manual = manual
+        self.cyclic_mode = cyclic_mode
+        self.rudder_enabled = rudder_enabled
+
+
+def _frame_from_json(obj: dict, prev: array) -> ReplayFrame:
+    if "RecvTime" not in obj and "t" in obj:
+        obj["RecvTime"] = obj["t"]
+    # 缺失字段沿用上一帧（与 DcsTelemetry 一致）
+    values = array("d", (float(obj.get(k, prev[i])) for i, k in enumerate(SNAPSHOT_FIELDS)))
+    manual = None
+    if any(k in obj for k in MANUAL_KEYS):
+        manual = tuple(float(obj.get(k, 0.0)) for k in MANUAL_KEYS)
+    cyclic_mode = int(obj["CyclicMode"]) if "CyclicMode" in obj else None
+    rudder_enabled = bool(obj["RudderEnabled"]) if "RudderEnabled" in obj else None
+    return ReplayFrame(values, manual, cyclic_mode, rudder_enabled)
+
+
+def load_frames(path):
+    """读取录制文件，返回 ReplayFrame 列表"""
+    with open(path, "rb") as f:
+        data = f.read()
+
+    frames = []
+    if data[:4] == MAGIC:
+        view = memoryview(data)
+        for offset in range(0, len(data) - FRAME_SIZE + 1, FRAME_SIZE):
+            seq, model_time, fields = decode_binary(view, offset)
+            frames.append(ReplayFrame(array("d", (seq, model_time, 0.0) + fields)))
+        return frames
+
+    prev = array("d", bytes(8 * len(SNAPSHOT_FIELDS)))
+    for line in data.decode("utf-8", errors="ignore").splitlines():
+        if not line.strip():
+            continue
+        frame = _frame_from_json(json.loads(line), prev)
+        prev = frame.values
+        frames.append(frame)
+    return frames
+
+
+class ReplayEngine:
+    """
+    以虚拟时钟驱动 AssistCore：帧间隔优先取 ModelTime，其次 RecvTime，否则 LOOP_DT。
+    outputs 记录每帧 (虚拟时间, cyclic_x, cyclic_y, rudder)。
+    history：是否记录悬停位置历史（只供诊断，不影响输出），默认关闭以加快回放。
+    """
+
+    def __init__(self, core: AssistCore = None, cyclic_mode=0, rudder_enabled=False, recorder=None, history=False):
+        self.core = core or AssistCore()
+        self.core.cyclic_helper.record_history = history
+        self.recorder = recorder
+        self.core.set_cyclic_mode(cyclic_mode)
+        self.core.set_rudder_enabled(rudder_enabled)
+        self.snapshot = TelemetrySnapshot()
+        self.clock = 0.0
+        self.outputs = []
+        self._prev_model_time = 0.0
+        self._prev_recv_time = 0.0
+
+    def _frame_dt(self, values) -> float:
+        model_time = values[IDX_MODEL_TIME]
+        recv_time = values[IDX_RECV_TIME]
+        dt = LOOP_DT
+        if model_time > self._prev_model_time > 0.0:
+            dt = model_time - self._prev_model_time
+        elif recv_time > self._prev_recv_time > 0.0:
+            dt = recv_time - self._prev_recv_time
+        self._prev_model_time = model_time
+        self._prev_recv_time = recv_time
+        return dt
+
+    def feed(self, frame: ReplayFrame):
+        core = self.core
+        if frame.cyclic_mode is not None and frame.cyclic_mode != core.cyclic_mode:
+            core.set_cyclic_mode(frame.cyclic_mode)
+        if frame.rudder_enabled is not None and frame.rudder_enabled != core.rudder_enabled:
+            core.set_rudder_enabled(frame.rudder_enabled)
+        if frame.manual is not None:
+            core.manual_cyclic_x, core.manual_cyclic_y, core.manual_rudder = frame.manual
+
+        dt = self._frame_dt(frame.values)
+        self.clock += dt
+        self.snapshot.values[:] = frame.values
+        self.snapshot.generation += 1
+
+        cyclic_x, cyclic_y, rudder = core.step(self.snapshot, True, dt)
+        if self.recorder is not None:
+            self.recorder.record(core, self.clock, dt)
+        self.outputs.append((self.clock, cyclic_x, cyclic_y, rudder))
+        return cyclic_x, cyclic_y, rudder
+
+    def run(self, frames):
+        for frame in frames:
+            self.feed(frame)
+        return self.outputs
+
+    def write_csv(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("t,cyclic_x,cyclic_y,rudder\n")
+            for row in self.outputs:
+                f.write("%.4f,%.6f,%.6f,%.6f\n" % row)
+
+
+def capture(path):
+    """
+    从 UDP 录制遥测为 JSON 行（含 Seq/ModelTime/RecvTime），Ctrl+C 结束。
+    经 frame_sink 录制每个通过序号检查的帧（接收方只解析每批最新帧，录制不受影响）。
+    """
+    import config
+    from dcs_telemetry import DcsTelemetry
+    from telemetry_protocol import FIELDS, is_binary_frame
+
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        def write_frame(packet, recv_time):
+            nonlocal count
+            if is_binary_frame(packet):
+                seq, model_time, values = decode_binary(packet)
+                obj = {"Seq": seq, "ModelTime": model_time}
+                obj.update(zip(FIELDS, values))
+            else:
+                line = bytes(packet).decode("utf-8", errors="ignore").rstrip().rpartition("\n")[2]
+                obj = json.loads(line)
+            obj["RecvTime"] = recv_time
+            f.write(json.dumps(obj, separators=(",", ":")) + "\n")
+            count += 1
+
+        tel = DcsTelemetry(config.UDP_HOST, config.UDP_PORT, config.UDP_RCVBUF)
+        tel.frame_sink = write_frame
+        tel.start()
+        try:
+            while True:
+                time.sleep(1.0)
+        except KeyboardInterrupt:
+            pass
+        tel.frame_sink = None
+    print(f"[INFO] captured {count} frames -> {path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline replay of recorded DCS telemetry")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_p = sub.add_parser("run", help="replay a capture through the assist")
+    run_p.add_argument("capture")
+    run_p.add_argument("--cyclic-mode", type=int, default=0, help="0=OFF 1=ON 2=HOVERING")
+    run_p.add_argument("--rudder", action="store_true", help="enable rudder assist")
+    run_p.add_argument("--out", help="write per-frame axis outputs as CSV")
+    run_p.add_argument("--record", help="write a flight recording (see flight_recorder.py)")
+
+    cap_p = sub.add_parser("capture", help="record live telemetry from UDP")
+    cap_p.add_argument("capture")
+
+    args = parser.parse_args(argv)
+    if args.command == "capture":
+        capture(args.capture)
+        return
+
+    frames = load_frames(args.capture)
+    engine = ReplayEngine(cyclic_mode=args.cyclic_mode, rudder_enabled=args.rudder)
+    if args.record:
+        from flight_recorder import FlightRecorder
+
+        # 离线回放不受实时约束：缓冲容纳全部帧，避免丢弃
+        engine.recorder = FlightRecorder(args.record, engine.core, capacity=len(frames) + 1)
+    start = time.perf_counter()
+    engine.run(frames)
+    elapsed = time.perf_counter() - start
+    if engine.recorder is not None:
+        engine.recorder.close()
+
+    sim_time = engine.clock
+    speed = sim_time / elapsed if elapsed > 0 else float("inf")
+    print(f"[INFO] {len(frames)} frames, {sim_time:.1f}s sim time in {elapsed:.3f}s wall ({speed:.0f}x real time)")
+    if args.out:
+        engine.write_csv(args.out)
+        print(f"[INFO] outputs -> {args.out}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,32 +1,54 @@
 import math
 import time
-from config import EMA_ALPHA
-from config import EMA_ALPHA
-from pid_calculator_new import PIDCalculatorNew
+import config
+from gains import changed_gains, merge_gains
+from pid_bank import PIDBank
 from utils import EMA, sign
 
+
+# 默认增益（PIDBank.add 参数）；可由增益文件按名称覆盖，见 gains.py
+DEFAULT_GAINS = {
+    "yaw_pid": dict(Kp_base=1, Ki=0.04, Kd=0, max_auth=0.5, integral_max=0.002, skip=5),
+    "yaw_rate_pid": dict(Kp_base=1.4, Ki=1.6, Kd=0.35, adaptive_factor=0.06, max_auth=0.99, integral_max=0.9),
+}
+
+
 class RudderHelper:
-    def __init__(self):
+    def __init__(self, gains=None):
+        gains = merge_gains(DEFAULT_GAINS, gains)
+        # 最近一次应用的增益表：重载时只应用变化的项
+        self._gains = gains
+
         # 参数
         self.adaptive_factor = 0.03
-        self.dt = 0.02
-        self.yaw_rate_ki = 1.6
+        self.yaw_rate_ki = gains["yaw_rate_pid"]["Ki"]
 
         # 状态
         self.target_yaw = None
         self.target_yaw_rate = 0.0
-        self.yaw_pid = PIDCalculatorNew(Kp_base=1, Ki=0.04, Kd=0, max_auth=0.5, integral_max=0.002, skip=5)
-        self.yaw_rate_pid = PIDCalculatorNew(Kp_base=1.4, Ki=self.yaw_rate_ki, Kd=0.35, adaptive_factor=0.06, max_auth=0.99, integral_max=0.9)
+        self.pids = PIDBank()
+        self.yaw_pid = self.pids.add(**gains["yaw_pid"])
+        self.yaw_rate_pid = self.pids.add(**gains["yaw_rate_pid"])
         
         self.prev_manual_active = False
         self.prev_manual_rudder = 0.0
-        self.ema_target_yaw_rate = EMA(EMA_ALPHA)
+        self.ema_target_yaw_rate = EMA(config.EMA_ALPHA)
+
+    def set_gains(self, gains: dict):
+        """原地更新各 PID 参数（gains 为完整增益表，见 profiles.parse_profile），只应用与上次不同的项，保留积分等状态"""
+        for name, params in changed_gains(self._gains, gains).items():
+            pid = getattr(self, name)
+            self.pids.configure(pid.index, **params)
+        self._gains = gains
+        self.yaw_rate_ki = gains["yaw_rate_pid"]["Ki"]
 
     # -------------------------------
     # 控制循环调用
     # -------------------------------
     def update(self, motion_state, rudder_manual=0.0):
         manual_active = abs(rudder_manual) >= 0.01
+        # 本帧实际间隔（航向外环沿用单帧间隔，保持既有整定）
+        dt = motion_state.dt
 
         # 手动 -> 自动 切换瞬间，避免回弹
         if not manual_active and self.prev_manual_active:
@@ -75,7 +97,7 @@ class RudderHelper:
             # 外环
             yaw_cmd = self.yaw_pid.auto
             if self.target_yaw is not None and self.yaw_pid.is_available():
-                self.yaw_pid.update(error=yaw_error, rate=None, delta_time=self.dt)
+                self.yaw_pid.update(error=yaw_error, rate=None, delta_time=dt)
                 yaw_cmd = self.yaw_pid.auto
             elif self.target_yaw is None:
                 yaw_cmd = 0.0
@@ -83,7 +105,8 @@ class RudderHelper:
         # 内环
         correction = motion_state.yaw_rate + 0.0 + self.target_yaw_rate + yaw_cmd
         sign_correction = sign(correction)
-        self.yaw_rate_pid.update(error=sign_correction * (abs(correction) ** 0.75), rate=None, delta_time=self.dt)
+        self.yaw_rate_pid.update(error=sign_correction * (abs(correction) ** 0.75), rate=None, delta_time=dt)
+        # 只计跳帧数：外环按单帧间隔更新，不读取累计间隔
         self.yaw_pid.update_skip()
 
         # 合成输出：手动优先
@@ -0,0 +1,81 @@
+import json
+import struct
+
+
+# 遥测字段顺序（JSON 键名与二进制布局共用）；
+# 帧元数据：二进制帧头带 seq/model_time，JSON 行为可选键 "Seq"（u32，逐帧加一）与 "ModelTime"（秒）
+FIELDS = (
+    "Vx", "Vy", "Vz",
+    "Ax", "Ay", "Az",
+    "Pitch", "Roll", "Yaw",
+    "PitchRate", "RollRate", "YawRate",
+    "PosX", "PosY", "PosZ",
+)
+
+# 二进制帧（小端，固定布局）：
+#   magic(4s) version(u8) flags(u8) field_count(u16) seq(u32) model_time(f64)
+#   12 x float32：速度/加速度/姿态/角速度
+#   3 x float64：世界坐标位置（float32 在数十公里外精度不足）
+MAGIC = b"DHAT"
+VERSION = 1
+FRAME = struct.Struct("<4sBBHId12f3d")
+FRAME_SIZE = FRAME.size
+# 帧头（至 seq 为止），供 peek_seq 只读序号
+HEADER = struct.Struct("<4sBBHI")
+
+# Export.lua 的 JSON 行以序号开头
+JSON_SEQ = b'{"Seq":'
+
+
+def is_binary_frame(view) -> bool:
+    """根据长度与 magic 判断是否为二进制帧（JSON 行以 '{' 开头，不会冲突）"""
+    return len(view) >= FRAME_SIZE and view[:4] == MAGIC
+
+
+def peek_seq(view):
+    """
+    不完整解码，只读帧序号：二进制帧校验帧头后返回 seq；以 {"Seq": 开头的 JSON 行返回其值
+    （一个数据报含多行时与完整解析一致，取最后一行）；其他 JSON（旧版 Export.lua）返回 None。
+    帧头或 Seq 值非法时抛 ValueError。
+    """
+    if len(view) >= FRAME_SIZE:
+        magic, version, _flags, count, seq = HEADER.unpack_from(view)
+        if magic == MAGIC:
+            if version != VERSION or count != len(FIELDS):
+                raise ValueError("unsupported telemetry frame")
+            return seq
+    line = bytes(view).rstrip().rpartition(b"\n")[2]
+    if line[:len(JSON_SEQ)] != JSON_SEQ:
+        return None
+    value = line[len(JSON_SEQ):].partition(b",")[0].partition(b"}")[0]
+    try:
+        return int(float(value)) & 0xFFFFFFFF
+    except (ValueError, OverflowError):
+        raise ValueError(f"malformed Seq: {value[:16]!r}") from None
+
+
+def decode_binary(view, offset=0):
+    """
+    解码一帧二进制遥测，返回 (seq, model_time, values)。
+    values 为按 FIELDS 顺序排列的 15 个浮点数。
+    """
+    frame = FRAME.unpack_from(view, offset)
+    if frame[0] != MAGIC or frame[1] != VERSION or frame[3] != len(FIELDS):
+        raise ValueError("unsupported telemetry frame")
+    return frame[4], frame[5], frame[6:]
+
+
+def encode_binary(seq, model_time, values) -> bytes:
+    """按 Export.lua 的二进制布局打包一帧（用于测试、回放与模拟器）"""
+    return FRAME.pack(MAGIC, VERSION, 0, len(FIELDS), seq & 0xFFFFFFFF, model_time, *values)
+
+
+def encode_json(values, seq=None, model_time=None) -> bytes:
+    """按 Export.lua 的 JSON 行格式打包一帧（末尾带换行）；seq/model_time 为 None 时省略（旧版 Export.lua）"""
+    obj = {}
+    if seq is not None:
+        obj["Seq"] = seq & 0xFFFFFFFF
+    if model_time is not None:
+        obj["ModelTime"] = model_time
+    obj.update(zip(FIELDS, values))
+    return (json.dumps(obj, separators=(",", ":")) + "\n").encode("utf-8")
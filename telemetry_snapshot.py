@@ -0,0 +1,87 @@
+from array import array
+
+from telemetry_protocol import FIELDS
+
+
+# 快照布局：帧元数据 + 遥测字段（顺序同 telemetry_protocol.FIELDS）
+SNAPSHOT_FIELDS = ("Seq", "ModelTime", "RecvTime") + FIELDS
+SNAPSHOT_SIZE = len(SNAPSHOT_FIELDS)
+
+IDX_SEQ = 0
+IDX_MODEL_TIME = 1
+IDX_RECV_TIME = 2
+IDX_FIELDS = 3
+
+
+def _zeros():
+    return array("d", bytes(8 * SNAPSHOT_SIZE))
+
+
+class TelemetrySnapshot:
+    """
+    控制线程持有的遥测快照（预分配，读取时原地覆盖）。
+    values 按 SNAPSHOT_FIELDS 排列；generation 为该帧发布时的代数，
+    与上次比较即可区分“新帧”与“同一帧”。
+    """
+
+    __slots__ = ("values", "generation")
+
+    def __init__(self):
+        self.values = _zeros()
+        self.generation = 0
+
+    @property
+    def seq(self) -> int:
+        return int(self.values[IDX_SEQ])
+
+    @property
+    def model_time(self) -> float:
+        return self.values[IDX_MODEL_TIME]
+
+    @property
+    def recv_time(self) -> float:
+        return self.values[IDX_RECV_TIME]
+
+    def as_dict(self) -> dict:
+        return dict(zip(SNAPSHOT_FIELDS, self.values))
+
+
+class TelemetryBuffer:
+    """
+    单写多读的双缓冲：接收线程写后台缓冲，再以一次属性赋值发布 (generation, 缓冲)。
+    读者复制已发布缓冲后复核 generation，若期间发生过发布则重读，避免跨字段撕裂。
+    """
+
+    def __init__(self):
+        self._bufs = (_zeros(), _zeros())
+        self._back = 1
+        self._published = (0, self._bufs[0])
+
+    @property
+    def generation(self) -> int:
+        return self._published[0]
+
+    @property
+    def front(self) -> array:
+        """最近发布的缓冲（仅供写线程参考上一帧，读者请用 read_into）"""
+        return self._published[1]
+
+    def back(self) -> array:
+        """写线程填充的后台缓冲"""
+        return self._bufs[self._back]
+
+    def publish(self):
+        generation = self._published[0] + 1
+        self._published = (generation, self._bufs[self._back])
+        self._back ^= 1
+
+    def read_into(self, snapshot: TelemetrySnapshot) -> bool:
+        """复制最新帧到 snapshot，返回是否为新帧"""
+        while True:
+            generation, buf = self._published
+            snapshot.values[:] = buf
+            if self._published[0] == generation:
+                break
+        is_new = generation != snapshot.generation
+        snapshot.generation = generation
+        return is_new
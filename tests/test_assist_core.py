@@ -0,0 +1,24 @@
+from assist_core import AssistCore
+from telemetry_snapshot import IDX_RECV_TIME, TelemetrySnapshot
+
+
+def test_no_stale_event_before_first_frame():
+    core = AssistCore()
+    snapshot = TelemetrySnapshot()
+    for now in (10.0, 20.0, 30.0):
+        core.step(snapshot, False, 0.02, now=now)
+    assert not core.stale
+    assert core.stale_events == 0
+    assert core.stale_steps == 0
+
+
+def test_stale_after_frames_stop():
+    core = AssistCore()
+    snapshot = TelemetrySnapshot()
+    snapshot.values[IDX_RECV_TIME] = 10.0
+    snapshot.generation = 1
+    core.step(snapshot, True, 0.02, now=10.1)
+    assert not core.stale
+    core.step(snapshot, False, 0.02, now=10.0 + core.stale_timeout + 0.01)
+    assert core.stale
+    assert core.stale_events == 1
@@ -0,0 +1,17 @@
+from control_scheduler import resolve_mode
+
+
+def test_telemetry_mode_kept_up_to_export_rate():
+    assert resolve_mode("telemetry", 50.0, 50.0, 0.0) == ("telemetry", 0.0, None)
+    assert resolve_mode("telemetry", 30.0, 100.0, 0.05) == ("telemetry", 0.05, None)
+    assert resolve_mode("timer", 200.0, 50.0, 0.0) == ("timer", 0.0, None)
+
+
+def test_control_rate_above_export_rate_switches_to_timer_with_prediction():
+    mode, predict_max, note = resolve_mode("telemetry", 200.0, 100.0, 0.0)
+    assert mode == "timer"
+    assert predict_max == 0.02
+    assert "EXPORT_RATE" in note
+
+    # 已设置的 PREDICT_MAX 保持不变
+    assert resolve_mode("telemetry", 200.0, 100.0, 0.05)[:2] == ("timer", 0.05)
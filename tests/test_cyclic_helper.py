@@ -0,0 +1,42 @@
+from assist_core import AssistCore
+from heli_sim import HeliSim
+
+DT = 0.02
+
+
+def _fly(core, sim, seconds):
+    outputs = (0.0, 0.0, 0.0)
+    for _ in range(int(seconds / DT)):
+        sim.step(*outputs, DT)
+        sim.fill_snapshot(core.snapshot)
+        outputs = core.step(core.snapshot, True, DT)
+
+
+def test_hover_entry_after_on_mode_starts_velocity_loop_fresh():
+    sim = HeliSim(wind=(2.0, 0.0, 1.0), gust_sigma=0.5, seed=1)
+    core = AssistCore()
+    helper = core.cyclic_helper
+    core.set_cyclic_mode(1)
+    _fly(core, sim, 30.0)
+
+    core.set_cyclic_mode(2)
+    for _ in range(12):
+        sim.step(core.cyclic_x, core.cyclic_y, core.rudder, DT)
+        sim.fill_snapshot(core.snapshot)
+        core.step(core.snapshot, True, DT)
+        if helper.right_v_pid.error_integral != 0.0:
+            break
+
+    # 首次悬停速度环更新只积分一个外环周期（skip 倍帧间隔），而非 ON 模式下的 30 s
+    for pid in (helper.right_v_pid, helper.forward_v_pid):
+        assert pid.error_integral != 0.0
+        period = DT * pid.skip * helper.roll_pid.skip
+        assert abs(pid.error_integral / pid.prev_error - period) < 1e-9
+
+def test_rudder_outer_loop_does_not_accumulate_elapsed():
+    sim = HeliSim(seed=2)
+    core = AssistCore()
+    core.set_rudder_enabled(True)
+    _fly(core, sim, 5.0)
+    yaw_pid = core.rudder_helper.yaw_pid
+    assert yaw_pid.bank.elapsed[yaw_pid.index] == 0.0
@@ -0,0 +1,86 @@
+import random
+
+from input_processor import InputProcessor
+from utils import apply_curve, sign
+
+
+class LegacyInputProcessor:
+    # 原 InputProcessor（逐轴调用 _rate_limit / apply_curve）
+    def __init__(self, expo_cyclic=0.5, expo_rudder=0.5, rate_up=4.0, rate_down=2.0):
+        self.manual_cyclic_x = 0.0
+        self.manual_cyclic_y = 0.0
+        self.manual_rudder = 0.0
+        self._smoothed_cyclic_x = 0.0
+        self._smoothed_cyclic_y = 0.0
+        self._smoothed_rudder = 0.0
+        self.input_cyclic_x = 0.0
+        self.input_cyclic_y = 0.0
+        self.input_rudder = 0.0
+        self.configure(expo_cyclic, expo_rudder, rate_up, rate_down)
+
+    def configure(self, expo_cyclic, expo_rudder, rate_up, rate_down):
+        self.expo_cyclic = expo_cyclic
+        self.expo_rudder = expo_rudder
+        self.max_rate_up = rate_up
+        self.max_rate_down = rate_down
+
+    def set_manual(self, cyclic_x, cyclic_y, rudder):
+        self.manual_cyclic_x = float(cyclic_x)
+        self.manual_cyclic_y = float(cyclic_y)
+        self.manual_rudder = float(rudder)
+
+    def update(self, dt):
+        self._smoothed_cyclic_x = self._rate_limit(self.manual_cyclic_x, self._smoothed_cyclic_x, dt)
+        self._smoothed_cyclic_y = self._rate_limit(self.manual_cyclic_y, self._smoothed_cyclic_y, dt)
+        self._smoothed_rudder = self._rate_limit(self.manual_rudder, self._smoothed_rudder, dt)
+        self.input_cyclic_x = apply_curve(self._smoothed_cyclic_x, expo=self.expo_cyclic)
+        self.input_cyclic_y = apply_curve(self._smoothed_cyclic_y, expo=self.expo_cyclic)
+        self.input_rudder = apply_curve(self._smoothed_rudder, expo=self.expo_rudder)
+
+    def _rate_limit(self, target, current, dt):
+        if sign(target) != sign(current) and abs(current) > 1e-3:
+            delta = -current
+            max_delta = self.max_rate_down * dt
+            if abs(delta) > abs(max_delta):
+                delta = sign(delta) * abs(max_delta)
+            return current + delta
+        moving_towards_zero = abs(target) < abs(current)
+        max_rate = self.max_rate_down if moving_towards_zero else self.max_rate_up
+        max_delta = max_rate * dt
+        delta = target - current
+        if abs(delta) > abs(max_delta):
+            delta = sign(delta) * abs(max_delta)
+        return current + delta
+
+
+def _tick(p, sticks, dt):
+    p.set_manual(*sticks)
+    p.update(dt)
+    return p.input_cyclic_x, p.input_cyclic_y, p.input_rudder
+
+
+def _random_sticks(rng, prev):
+    r = rng.random()
+    if r < 0.3:
+        return prev  # 静止
+    if r < 0.4:
+        return (0.0, 0.0, 0.0)
+    if r < 0.45:
+        return tuple(rng.choice((-1.0, 1.0, -1.00003)) for _ in range(3))
+    return tuple(max(-1.0, min(1.0, p + rng.gauss(0.0, 0.2))) for p in prev)
+
+
+def test_unrolled_update_matches_legacy_bit_for_bit():
+    # 跨零、静止、越界、dt 抖动（含 0）与参数热更新；不依赖 pytest，基准脚本可直接导入 LegacyInputProcessor
+    rng = random.Random(1)
+    legacy = LegacyInputProcessor()
+    unrolled = InputProcessor(rate_up=4.0)
+    sticks = (0.0, 0.0, 0.0)
+    for k in range(150000):
+        if k % 5000 == 0:
+            params = (rng.random(), rng.random(), rng.uniform(0.5, 8), rng.uniform(0.5, 8))
+            legacy.configure(*params)
+            unrolled.configure(*params)
+        sticks = _random_sticks(rng, sticks)
+        dt = rng.choice((0.02, 0.02, 0.0, rng.uniform(0.005, 0.06)))
+        assert _tick(legacy, sticks, dt) == _tick(unrolled, sticks, dt)
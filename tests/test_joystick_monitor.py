@@ -0,0 +1,79 @@
+import time
+
+from input_backends import FakeBackend
+from input_mapping import parse_bindings
+from joystick_monitor import JoystickMonitor
+
+BINDINGS = [
+    {"axis": "cyclic_x", "code": "ABS_X", "device": "stick"},
+    {"axis": "cyclic_y", "code": "ABS_Y", "device": "stick"},
+    {"axis": "rudder", "code": "ABS_RZ", "device": "pedals", "invert": True},
+]
+
+
+def _wait(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+def _monitor(backend):
+    return JoystickMonitor(backend, parse_bindings(BINDINGS), rescan_min=0.2, rescan_max=0.8, read_timeout=0.02)
+
+
+def test_dispatch_unplug_recenter_and_replug():
+    backend = FakeBackend()
+    stick = backend.add_device("Fake stick")
+    pedals = backend.add_device("Fake pedals")
+    backend.add_device("vJoy Device")
+    monitor = _monitor(backend)
+    try:
+        # 虚拟设备不接入（校准表在 ±0.25 的整数倍处与直接计算一致，以下取这些值精确比较）
+        assert monitor.attach(backend.scan()) == 2
+        assert set(monitor.readers) == {"Fake stick", "Fake pedals"}
+        assert monitor.attach(backend.scan()) == 0
+
+        stick.push("ABS_X", 0.5)
+        stick.push("ABS_Y", -0.25)
+        stick.push("ABS_RZ", 0.9)  # 未绑定到 stick：忽略
+        pedals.push("ABS_RZ", 0.5)
+        assert _wait(lambda: monitor.mailbox.sample()[:3] == (0.5, -0.25, -0.5))
+
+        # 拔出脚舵：只有它负责的轴回中
+        backend.remove_device(pedals)
+        assert _wait(lambda: monitor.disconnects == 1)
+        assert monitor.mailbox.sample()[:3] == (0.5, -0.25, 0.0)
+        assert "Fake pedals" not in monitor.readers
+
+        # 重新插入：退避期内不接入，期满后接入并恢复分发
+        pedals = backend.add_device("Fake pedals")
+        assert monitor.attach(backend.scan()) == 0
+        assert _wait(lambda: monitor.attach(backend.scan()) == 1)
+        pedals.push("ABS_RZ", -0.75)
+        assert _wait(lambda: monitor.mailbox.sample()[2] == 0.75)
+        assert monitor.connects == 3
+    finally:
+        monitor.stop()
+
+
+def test_backoff_doubles_after_repeated_quick_failures():
+    backend = FakeBackend()
+    monitor = _monitor(backend)
+    try:
+        delays = []
+        for _ in range(4):
+            dev = backend.add_device("Fake stick")
+            assert _wait(lambda: monitor.attach(backend.scan()) == 1)
+            failed_at = time.monotonic()
+            backend.remove_device(dev)
+            assert _wait(lambda: "Fake stick" not in monitor.readers)
+            delays.append(monitor._backoff["Fake stick"][1] - failed_at)
+            assert monitor._backoff["Fake stick"][0] == len(delays)
+        # rescan_min 起逐次加倍，封顶 rescan_max（允许线程调度带来的少量偏差）
+        for delay, expected in zip(delays, (0.2, 0.4, 0.8, 0.8)):
+            assert expected - 0.01 <= delay <= expected + 0.05
+    finally:
+        monitor.stop()
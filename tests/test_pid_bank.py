@@ -0,0 +1,100 @@
+import random
+
+import pytest
+
+from pid_bank import PIDBank
+from pid_calculator_new import PIDCalculatorNew
+from cyclic_helper import DEFAULT_GAINS as CYCLIC_GAINS
+from rudder_helper import DEFAULT_GAINS as RUDDER_GAINS
+
+# CyclicHelper 与 RudderHelper 的全部默认参数
+GAINS = list(CYCLIC_GAINS.values()) + list(RUDDER_GAINS.values())
+
+
+def _state(pid):
+    return (pid.auto, pid.error_integral, pid.prev_error, pid.rate, pid.Ki, pid.integral_max, pid.is_available())
+
+
+def _make():
+    ref = [PIDCalculatorNew(**g) for g in GAINS]
+    bank = PIDBank()
+    handles = [bank.add(**g) for g in GAINS]
+    return ref, bank, handles
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_sequences_match_pid_calculator_bit_for_bit(seed):
+    rng = random.Random(seed)
+    ref, bank, handles = _make()
+    indices = [h.index for h in handles]
+
+    for _ in range(5000):
+        op = rng.random()
+        if op < 0.4:
+            # 批量更新（随机掩码、随机 rate）
+            errors = [rng.uniform(-2, 2) for _ in GAINS]
+            dts = [rng.uniform(0.005, 0.1) for _ in GAINS]
+            rates = [None if rng.random() < 0.8 else rng.uniform(-1, 1) for _ in GAINS]
+            mask = [rng.random() < 0.7 for _ in GAINS]
+            for p, e, r, dt, m in zip(ref, errors, rates, dts, mask):
+                if m:
+                    p.update(error=e, rate=r, delta_time=dt)
+            bank.update_many(indices, errors, dts, rates, mask)
+        elif op < 0.5:
+            # 批量跳帧计数
+            dts = [rng.uniform(0.005, 0.1) for _ in GAINS]
+            for p, dt in zip(ref, dts):
+                p.update_skip(dt)
+            bank.update_skip_many(indices, dts)
+            assert bank.all_available(indices) == all(p.is_available() for p in ref)
+        else:
+            k = rng.randrange(len(GAINS))
+            p, h = ref[k], handles[k]
+            if op < 0.62:
+                e, dt = rng.uniform(-2, 2), rng.uniform(0.005, 0.1)
+                rate = None if rng.random() < 0.8 else rng.uniform(-1, 1)
+                p.update(error=e, rate=rate, delta_time=dt)
+                h.update(error=e, rate=rate, delta_time=dt)
+            elif op < 0.74:
+                dt = rng.uniform(0.005, 0.1)
+                p.update_skip(dt)
+                h.update_skip(dt)
+            elif op < 0.8:
+                ki = rng.choice([0.0, rng.uniform(0.01, 2.0)])
+                p.update_ki(ki)
+                h.update_ki(ki)
+            elif op < 0.84:
+                limit = rng.uniform(0.001, 1.0)
+                p.update_max_integral(limit)
+                h.update_max_integral(limit)
+            elif op < 0.9:
+                if p.Ki != 0:
+                    args = dict(
+                        error=rng.uniform(-1, 1), rate=None, delta_time=0.02,
+                        manual_input=rng.uniform(-1, 1), prev_error=rng.uniform(-1, 1), skip=rng.randrange(5),
+                    )
+                    p.manual_override(**args)
+                    h.manual_override(**args)
+            elif op < 0.96:
+                nominal = rng.uniform(0.01, 0.1)
+                assert p.take_elapsed(nominal) == h.take_elapsed(nominal)
+            else:
+                p.reset()
+                h.reset()
+        for p, h in zip(ref, handles):
+            assert _state(p) == _state(h)
+
+
+def test_configure_ki_matches_update_ki():
+    ref, bank, handles = _make()
+    rng = random.Random(7)
+    for _ in range(200):
+        for p, h in zip(ref, handles):
+            e, dt = rng.uniform(-2, 2), rng.uniform(0.005, 0.1)
+            p.update(error=e, rate=None, delta_time=dt)
+            h.update(error=e, rate=None, delta_time=dt)
+    for p, h in zip(ref, handles):
+        ki = rng.uniform(0.01, 2.0)
+        p.update_ki(ki)
+        bank.configure(h.index, Ki=ki)
+        assert _state(p) == _state(h)
@@ -0,0 +1,109 @@
+import math
+import random
+
+from kinematics import HeadingFrame
+from position_history import PositionHistory
+
+PERIOD = 0.02
+
+
+class _State:
+    def __init__(self):
+        self.frame = HeadingFrame()
+        self.x = self.y = self.z = 0.0
+
+
+def _close(a, b, tol=1e-9):
+    return abs(a - b) <= tol * max(1.0, abs(a), abs(b))
+
+
+def _expected(samples, seconds, box):
+    """samples：有效样本 (t, 北, 上, 东, 前, 右)，按时间顺序；逐项扫描求窗口统计"""
+    since = samples[-1][0] - seconds
+    window = [s for s in samples if s[0] >= since]
+    n = len(window)
+    north = [s[1] for s in window]
+    up = [s[2] for s in window]
+    east = [s[3] for s in window]
+    radii = [math.sqrt(a * a + b * b) for a, b in zip(north, east)]
+    mean_n, mean_e = sum(north) / n, sum(east) / n
+    first, last = window[0], window[-1]
+    distance = math.hypot(last[1] - first[1], last[3] - first[3])
+    return dict(
+        center_north=mean_n,
+        center_east=mean_e,
+        spread=math.sqrt(sum((a - mean_n) ** 2 + (b - mean_e) ** 2 for a, b in zip(north, east)) / n),
+        rms=math.sqrt(sum(r * r for r in radii) / n),
+        max=max(radii),
+        in_box=sum(r <= box for r in radii) / n,
+        up_mean=sum(up) / n,
+        up_rms=math.sqrt(sum(u * u for u in up) / n),
+        samples=n,
+        span=last[0] - first[0],
+        drift=(distance, distance / max(last[0] - first[0], 1e-9)),
+    )
+
+
+def _check(history, samples, seconds):
+    exp = _expected(samples, seconds, history.box)
+    stats = history.box_stats(seconds)
+    if exp["samples"] < 2:
+        assert stats["samples"] == exp["samples"]
+        assert history.drift(seconds) == (0.0, 0.0)
+        return
+    assert stats["samples"] == exp["samples"]
+    for key in ("center_north", "center_east", "rms", "in_box", "up_mean", "up_rms", "span"):
+        assert _close(stats[key], exp[key]), key
+    # 前缀和相减求方差有抵消误差
+    assert abs(stats["spread"] - exp["spread"]) <= 1e-6
+    assert stats["max"] == exp["max"]
+    assert _close(history.rms(seconds), exp["rms"])
+    distance, rate = history.drift(seconds)
+    assert _close(distance, exp["drift"][0]) and _close(rate, exp["drift"][1])
+
+
+def test_queries_match_brute_force_with_wraparound_and_reset():
+    rng = random.Random(5)
+    # 1 s 历史：容量 51，只保留最近 50 个样本，随机游走数千步多次回绕
+    history = PositionHistory(1.0, PERIOD, box=1.5)
+    state = _State()
+    samples = []
+    queries = 0
+    for step in range(6000):
+        if rng.random() < 0.002:
+            state.x, state.y, state.z = rng.uniform(-50, 50), rng.uniform(0, 100), rng.uniform(-50, 50)
+            history.reset(state.x, state.y, state.z)
+            samples = []
+        state.x += rng.gauss(0.0, 0.3)
+        state.y += rng.gauss(0.0, 0.1)
+        state.z += rng.gauss(0.0, 0.3)
+        yaw = rng.uniform(0.0, 2.0 * math.pi)
+        state.frame.set_attitude(0.0, 0.0, yaw)
+        # 间隔抖动：短于记录间隔的步按间隔抽取
+        dt = rng.choice((PERIOD, PERIOD, 0.5 * PERIOD, 1.7 * PERIOD))
+        if history.record(dt, state):
+            north = state.x - history.anchor_x
+            up = state.y - history.anchor_y
+            east = state.z - history.anchor_z
+            forward, right, _ = state.frame.world_to_body(north, up, east)
+            samples.append((history.time, north, up, east, forward, right))
+            samples = samples[-(history.capacity - 1):]
+            assert history.offset() == (north, up, east, forward, right)
+        assert len(history) == len(samples)
+        if samples and rng.random() < 0.1:
+            # 含超过已存历史的窗口
+            _check(history, samples, rng.choice((0.1, 0.35, 0.7, 5.0)))
+            queries += 1
+    assert queries > 300
+
+
+def test_empty_and_single_sample_windows():
+    history = PositionHistory(1.0, PERIOD)
+    assert history.box_stats(10.0)["samples"] == 0
+    assert history.rms(10.0) == 0.0
+    assert history.drift(10.0) == (0.0, 0.0)
+    state = _State()
+    state.x = 3.0
+    history.record(PERIOD, state)
+    assert history.box_stats(10.0)["samples"] == 1
+    assert history.offset()[0] == 3.0
@@ -0,0 +1,55 @@
+import pytest
+
+from assist_core import AssistCore
+from motion_state import MotionState
+from profiles import parse_profile
+
+
+def _handover(core):
+    """压杆 1 s 后松杆：触发手动 -> 自动交接（俯仰角速度环切换到交接 Ki）"""
+    core.set_cyclic_mode(1)
+    for stick in (0.5, 0.0):
+        core.manual_cyclic_y = stick
+        for _ in range(50):
+            core.step(core.snapshot, True, 0.02)
+
+
+def test_reload_keeps_handover_ki_when_unrelated_key_changes():
+    core = AssistCore()
+    _handover(core)
+    pid = core.cyclic_helper.pitch_rate_pid
+    assert pid.Ki == 0.35
+
+    core.apply_profile(parse_profile({"input": {"expo_cyclic": 0.3}}))
+    assert pid.Ki == 0.35
+    assert core.inputs.expo_cyclic == 0.3
+
+    # 档案中实际改动的增益仍然生效
+    core.apply_profile(parse_profile({"cyclic": {"pitch_rate_pid": {"Ki": 0.05}}}))
+    assert pid.Ki == 0.05
+
+
+def test_cyclic_params_from_profile():
+    core = AssistCore({"cyclic_params": {"pitch_rate_ki": 0.2, "hover_pitch_rate_integral_max": 0.03}})
+    helper = core.cyclic_helper
+    _handover(core)
+    assert helper.pitch_rate_pid.Ki == 0.2
+
+    core.set_cyclic_mode(2)
+    core.step(core.snapshot, True, 0.02)
+    assert helper.pitch_rate_pid.integral_max == 0.03
+
+    # 悬停中重载：积分限幅立即更新，已生效的交接 Ki 随之换算
+    core.apply_profile(parse_profile({"cyclic_params": {"pitch_rate_ki": 0.4, "hover_pitch_rate_integral_max": 0.06}}))
+    assert helper.pitch_rate_pid.integral_max == 0.06
+    assert helper.pitch_rate_pid.Ki == 0.4
+
+    # 离开悬停恢复为增益表中的积分限幅
+    core.set_cyclic_mode(0)
+    helper.update(MotionState(), hovering=False)
+    assert helper.pitch_rate_pid.integral_max == 0.5
+
+
+def test_unknown_cyclic_param_rejected():
+    with pytest.raises(ValueError):
+        parse_profile({"cyclic_params": {"pitch_rate_kd": 1.0}})
@@ -0,0 +1,171 @@
+import pytest
+
+from dcs_telemetry import TelemetryDecoder
+from telemetry_protocol import encode_binary, encode_json, peek_seq
+
+VALUES = tuple(float(i) for i in range(15))
+
+
+def test_peek_seq_reads_binary_and_json_heads():
+    assert peek_seq(encode_binary(7, 1.0, VALUES)) == 7
+    assert peek_seq(encode_json(VALUES, seq=8, model_time=1.0)) == 8
+    assert peek_seq(b'{"Seq":9}') == 9
+    assert peek_seq(encode_json(VALUES)) is None
+
+
+def test_peek_seq_uses_last_line_like_decode():
+    packet = encode_json(VALUES, seq=3) + encode_json(VALUES, seq=4)
+    assert peek_seq(packet) == 4
+
+    decoder = TelemetryDecoder()
+    decoder.handle_packet(packet, 0)
+    assert decoder.buffer.front[0] == 4.0
+    # 上一行的序号已被取代：单独到达时按乱序/重复处理，而不是把 4 当作重复
+    decoder.handle_packet(encode_json(VALUES, seq=5), 0)
+    assert decoder.duplicates == 0 and decoder.lost == 0
+
+
+@pytest.mark.parametrize("head", [b'{"Seq":', b'{"Seq":abc,"Vx":1}', b'{"Seq":inf,', b'{"Seq":nan,', b'{"Seq":}'])
+def test_malformed_seq_counts_as_malformed(head):
+    with pytest.raises(ValueError):
+        peek_seq(head)
+
+    decoder = TelemetryDecoder()
+    decoder.handle_packet(encode_json(VALUES, seq=1), 0)
+    decoder.handle_packet(head, 0)
+    assert decoder.malformed == 1
+    assert decoder.duplicates == 0
+    assert decoder.frames == 1
+
+
+@pytest.mark.parametrize(
+    "packet",
+    [b'{"Vx":1,"Seq":1e999}\n', b"[" * 3000, b'{"Vx":[1]}', b"[1,2]"],
+    ids=["seq-overflow", "deep-nesting", "list-field", "not-object"],
+)
+def test_undecodable_packet_counts_as_malformed_and_keeps_previous_frame(packet):
+    decoder = TelemetryDecoder()
+    decoder.handle_packet(encode_json(VALUES, seq=1), 0)
+    decoder.handle_batch((packet,), 0)
+    assert decoder.malformed == 1
+    assert decoder.buffer.generation == 1
+    # 之后的帧照常解析
+    decoder.handle_packet(encode_json(VALUES, seq=2), 0)
+    assert decoder.buffer.generation == 2
+
+
+# -------------------------------
+# 序号检查（TelemetryDecoder._accept）
+# -------------------------------
+def _frame(seq):
+    return encode_binary(seq, seq * 0.02, VALUES)
+
+
+def _feed(decoder, *seqs):
+    """一批到达的帧；返回本批是否发布了新帧"""
+    generation = decoder.buffer.generation
+    decoder.handle_batch([_frame(seq) for seq in seqs], 0)
+    return decoder.buffer.generation != generation
+
+
+def _counters(decoder):
+    stats = decoder.stats()
+    return {k: stats[k] for k in ("lost", "duplicates", "reordered", "resets")}
+
+
+def _published_seq(decoder):
+    return int(decoder.buffer.front[0])
+
+
+def test_consecutive_batch_decodes_only_newest():
+    decoder = TelemetryDecoder()
+    assert _feed(decoder, 1, 2, 3)
+    assert _published_seq(decoder) == 3
+    assert decoder.buffer.generation == 1
+    assert decoder.superseded == 2
+    assert _counters(decoder) == dict(lost=0, duplicates=0, reordered=0, resets=0)
+
+
+def test_gap_counts_lost_and_late_packet_inside_window_is_reordered():
+    decoder = TelemetryDecoder()
+    _feed(decoder, 1)
+    assert _feed(decoder, 5)
+    assert _counters(decoder) == dict(lost=3, duplicates=0, reordered=0, resets=0)
+
+    # 迟到帧只计数，不发布、不覆盖更新的帧
+    assert not _feed(decoder, 3)
+    assert _published_seq(decoder) == 5
+    assert _counters(decoder) == dict(lost=2, duplicates=0, reordered=1, resets=0)
+
+    # 同一迟到帧再来一次是重复
+    assert not _feed(decoder, 3)
+    assert _counters(decoder) == dict(lost=2, duplicates=1, reordered=1, resets=0)
+
+
+def test_duplicates_of_newest_and_of_already_seen_packets():
+    decoder = TelemetryDecoder()
+    _feed(decoder, 10, 11)
+    assert not _feed(decoder, 11)
+    assert not _feed(decoder, 10)
+    # 同步点之前的序号视为已到达：迟到的旧帧计为重复，丢失数不会减成负数
+    assert not _feed(decoder, 9)
+    assert _counters(decoder) == dict(lost=0, duplicates=3, reordered=0, resets=0)
+    assert _published_seq(decoder) == 11
+
+
+def test_mixed_batch_publishes_newest_admitted_packet():
+    decoder = TelemetryDecoder()
+    _feed(decoder, 1)
+    # 4 跳号，2 迟到（乱序），4 重复，6 为最新
+    assert _feed(decoder, 4, 2, 4, 6)
+    assert _published_seq(decoder) == 6
+    assert decoder.superseded == 1
+    assert _counters(decoder) == dict(lost=2, duplicates=1, reordered=1, resets=0)
+
+
+def test_large_gap_then_late_packet_inside_window():
+    decoder = TelemetryDecoder()
+    _feed(decoder, 1)
+    _feed(decoder, 101)
+    assert _counters(decoder)["lost"] == 99
+    assert not _feed(decoder, 90)
+    assert _counters(decoder) == dict(lost=98, duplicates=0, reordered=1, resets=0)
+    # 落后 64 帧以上的旧序号超出窗口，另行处理（见下）；窗口边缘（落后 63）仍计为乱序
+    assert not _feed(decoder, 101 - 63)
+    assert _counters(decoder) == dict(lost=97, duplicates=0, reordered=2, resets=0)
+
+
+def test_late_packet_outside_window_resyncs_as_sender_restart():
+    decoder = TelemetryDecoder()
+    _feed(decoder, 200)
+    assert _feed(decoder, 200 - 64)
+    assert _published_seq(decoder) == 136
+    assert _counters(decoder) == dict(lost=0, duplicates=0, reordered=0, resets=1)
+    # 同步后按新序号继续
+    assert _feed(decoder, 137)
+    assert _counters(decoder) == dict(lost=0, duplicates=0, reordered=0, resets=1)
+
+
+def test_sender_restart_resets_sequence():
+    decoder = TelemetryDecoder()
+    _feed(decoder, 5000, 5001)
+    assert _feed(decoder, 0, 1)
+    assert _published_seq(decoder) == 1
+    assert _counters(decoder) == dict(lost=0, duplicates=0, reordered=0, resets=1)
+    # 重启后按新序号去重
+    assert not _feed(decoder, 1)
+    assert _counters(decoder)["duplicates"] == 1
+
+
+def test_seq_wraps_around_u32():
+    decoder = TelemetryDecoder()
+    _feed(decoder, 0xFFFFFFFE)
+    assert _feed(decoder, 0xFFFFFFFF, 0)
+    assert _published_seq(decoder) == 0
+    assert _feed(decoder, 3)
+    assert _counters(decoder) == dict(lost=2, duplicates=0, reordered=0, resets=0)
+    # 回绕前的帧迟到：仍在窗口内
+    assert not _feed(decoder, 0xFFFFFFFF)
+    assert _counters(decoder)["duplicates"] == 1
+    assert not _feed(decoder, 1)
+    assert _counters(decoder) == dict(lost=1, duplicates=1, reordered=1, resets=0)
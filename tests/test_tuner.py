@@ -0,0 +1,21 @@
+import pytest
+
+import tuner
+
+
+def test_random_candidates_need_gains_to_vary():
+    base = tuner.default_gains()
+    with pytest.raises(ValueError):
+        tuner.make_candidates(base, {}, 2, [], 0.3, 0)
+    with pytest.raises(SystemExit):
+        tuner.main(["--random", "2"])
+
+
+def test_random_candidates_perturb_only_varied_gains():
+    base = tuner.default_gains()
+    key = "cyclic.right_v_pid.Ki"
+    candidates = tuner.make_candidates(base, {}, 3, [key], 0.3, 0)
+    assert candidates[0] == {}
+    assert len(candidates) == 4
+    assert all(list(c) == [key] for c in candidates[1:])
+    assert len({c[key] for c in candidates[1:]}) == 3
@@ -0,0 +1,326 @@
+"""
+离线增益整定：对候选增益在模拟（heli_sim）或回放场景中评估，按稳定时间、超调、
+操纵量打分，用进程池并行评估，输出排名表与可在启动时加载的增益文件（见 gains.py）。
+
+场景（模拟器闭环，dt=0.02）：
+  hover_hold   悬停模式，初始水平漂移 + 阵风：水平速度稳定时间、反向超调
+  heading_hold 方向舵辅助，初始偏航角速度：角速度稳定时间、反向超调
+  stick_release 周期杆 ON 模式，压杆 3 秒后松杆：松杆后角速度稳定时间、超调
+  回放（--replay FILE）：无被控对象，只计操纵量
+
+候选：基线 + --sweep 网格 + --random 随机扰动（对 --vary 中的参数按对数均匀缩放）。
+参数名形如 cyclic.roll_rate_pid.Kp_base（见 gains.flatten_gains）。
+
+用法：
+  python tuner.py --sweep cyclic.roll_rate_pid.Kp_base=0.03,0.04,0.06 --out gains.json
+  python tuner.py --random 64 --vary cyclic.pitch_rate_pid.Kp_base,cyclic.pitch_rate_pid.Kd --spread 0.5
+"""
+import argparse
+import itertools
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cyclic_helper
+import rudder_helper
+from assist_core import AssistCore
+from gains import flatten_gains, load_gains, merge_gains, save_gains, unflatten_gains
+from heli_sim import HeliSim
+
+DT = 0.02
+
+# 姿态超过该值（rad）视为发散
+DIVERGED_ATTITUDE = 1.2
+
+# 打分权重：稳定时间按场景时长归一化
+WEIGHTS = {"settling": 1.0, "overshoot": 1.0, "effort": 0.5}
+
+
+def default_gains() -> dict:
+    return {
+        "cyclic": merge_gains(cyclic_helper.DEFAULT_GAINS),
+        "rudder": merge_gains(rudder_helper.DEFAULT_GAINS),
+    }
+
+
+class _Effort:
+    """操纵量统计：输出均方根 + 每秒平均变化量"""
+
+    def __init__(self):
+        self.n = 0
+        self.sq = 0.0
+        self.delta = 0.0
+        self.prev = None
+
+    def add(self, *outputs):
+        self.n += 1
+        self.sq += sum(u * u for u in outputs)
+        if self.prev is not None:
+            self.delta += sum(abs(u - p) for u, p in zip(outputs, self.prev))
+        self.prev = outputs
+
+    def value(self) -> float:
+        if self.n == 0:
+            return 0.0
+        return math.sqrt(self.sq / self.n) + self.delta / (self.n * DT) * 0.1
+
+
+def _result(duration, settle_time, overshoot, effort, diverged):
+    return {
+        "settling": settle_time / duration,
+        "settle_time": settle_time,
+        "overshoot": overshoot,
+        "effort": effort,
+        "diverged": diverged,
+    }
+
+
+def _unstable(sim, outputs) -> bool:
+    return (
+        not all(math.isfinite(u) for u in outputs)
+        or abs(sim.pitch) > DIVERGED_ATTITUDE
+        or abs(sim.roll) > DIVERGED_ATTITUDE
+    )
+
+
+def hover_hold(gains, seed, duration=60.0):
+    sim = HeliSim(gust_sigma=0.3, seed=seed)
+    sim.vx, sim.vz, sim.p = 2.0, -1.5, 0.1
+    v0 = math.hypot(sim.vx, sim.vz)
+    dir_x, dir_z = sim.vx / v0, sim.vz / v0
+
+    core = AssistCore(gains)
+    core.set_cyclic_mode(2)
+    core.set_rudder_enabled(True)
+    effort = _Effort()
+    settle_time = 0.0
+    reverse = 0.0
+    outputs = (0.0, 0.0, 0.0)
+    for k in range(int(duration / DT)):
+        sim.step(*outputs, DT)
+        sim.fill_snapshot(core.snapshot)
+        outputs = core.step(core.snapshot, True, DT)
+        if _unstable(sim, outputs):
+            return _result(duration, duration, 0.0, 0.0, True)
+        effort.add(outputs[0], outputs[1])
+        if math.hypot(sim.vx, sim.vz) > 0.5:
+            settle_time = (k + 1) * DT
+        reverse = max(reverse, -(sim.vx * dir_x + sim.vz * dir_z))
+    return _result(duration, settle_time, reverse / v0, effort.value(), False)
+
+
+def heading_hold(gains, seed, duration=30.0):
+    sim = HeliSim(gust_sigma=0.3, seed=seed)
+    r0 = 0.4 if seed % 2 == 0 else -0.4
+    sim.r = r0
+
+    core = AssistCore(gains)
+    core.set_cyclic_mode(2)
+    core.set_rudder_enabled(True)
+    effort = _Effort()
+    settle_time = 0.0
+    reverse = 0.0
+    outputs = (0.0, 0.0, 0.0)
+    for k in range(int(duration / DT)):
+        sim.step(*outputs, DT)
+        sim.fill_snapshot(core.snapshot)
+        outputs = core.step(core.snapshot, True, DT)
+        if _unstable(sim, outputs):
+            return _result(duration, duration, 0.0, 0.0, True)
+        effort.add(outputs[2])
+        if abs(sim.r) > 0.02:
+            settle_time = (k + 1) * DT
+        reverse = max(reverse, -sim.r * r0 / abs(r0))
+    return _result(duration, settle_time, reverse / abs(r0), effort.value(), False)
+
+
+def stick_release(gains, seed, duration=20.0, hold=3.0):
+    sim = HeliSim(gust_sigma=0.3, seed=seed)
+    rng = random.Random(seed)
+    stick = (rng.uniform(0.15, 0.3) * rng.choice((-1, 1)), rng.uniform(0.1, 0.2) * rng.choice((-1, 1)))
+
+    core = AssistCore(gains)
+    core.set_cyclic_mode(1)
+    core.set_rudder_enabled(True)
+    effort = _Effort()
+    settle_time = 0.0
+    held_rate = 1e-3
+    peak_rate = 0.0
+    outputs = (0.0, 0.0, 0.0)
+    steps_hold = int(hold / DT)
+    for k in range(int((hold + duration) / DT)):
+        core.manual_cyclic_x, core.manual_cyclic_y = stick if k < steps_hold else (0.0, 0.0)
+        sim.step(*outputs, DT)
+        sim.fill_snapshot(core.snapshot)
+        outputs = core.step(core.snapshot, True, DT)
+        if _unstable(sim, outputs):
+            return _result(duration, duration, 0.0, 0.0, True)
+        rate = max(abs(sim.p), abs(sim.q))
+        if k < steps_hold:
+            held_rate = max(held_rate, rate)
+            continue
+        effort.add(outputs[0], outputs[1])
+        if rate > 0.03:
+            settle_time = (k + 1 - steps_hold) * DT
+        # 松杆 1 秒后的角速度峰值视为回弹
+        if k >= steps_hold + int(1.0 / DT):
+            peak_rate = max(peak_rate, rate)
+    return _result(duration, settle_time, peak_rate / held_rate, effort.value(), False)
+
+
+SCENARIOS = {
+    "hover_hold": hover_hold,
+    "heading_hold": heading_hold,
+    "stick_release": stick_release,
+}
+
+
+def replay_effort(gains, path):
+    """回放场景：按录制中的模式与飞行员输入驱动，只评估操纵量"""
+    from replay import ReplayEngine, load_frames
+
+    engine = ReplayEngine(AssistCore(gains), cyclic_mode=2, rudder_enabled=True)
+    effort = _Effort()
+    for frame in load_frames(path):
+        outputs = engine.feed(frame)
+        if not all(math.isfinite(u) for u in outputs):
+            return _result(1.0, 0.0, 0.0, 0.0, True)
+        effort.add(*outputs)
+    return _result(1.0, 0.0, 0.0, effort.value(), False)
+
+
+def score(results) -> float:
+    total = 0.0
+    for metrics in results.values():
+        if metrics["diverged"]:
+            return math.inf
+        total += sum(WEIGHTS[k] * metrics[k] for k in WEIGHTS)
+    return total
+
+
+def evaluate(job):
+    """进程池任务：job = (候选序号, 覆盖参数, 基准增益, 场景名列表, 种子列表, 回放文件列表)"""
+    index, overrides, base, scenarios, seeds, replays = job
+    flat = dict(flatten_gains(base))
+    flat.update(overrides)
+    gains = unflatten_gains(flat)
+
+    results = {}
+    for name in scenarios:
+        runs = [SCENARIOS[name](gains, seed) for seed in seeds]
+        results[name] = {
+            key: (any(r[key] for r in runs) if key == "diverged" else sum(r[key] for r in runs) / len(runs))
+            for key in runs[0]
+        }
+    for path in replays:
+        results[f"replay:{os.path.basename(path)}"] = replay_effort(gains, path)
+    return index, overrides, results, score(results)
+
+
+def make_candidates(base, sweeps, random_count, vary, spread, seed):
+    """返回覆盖参数字典列表；第一个为基线（空覆盖）。随机候选（random_count > 0）需要非空的 vary"""
+    flat = flatten_gains(base)
+    if random_count > 0 and not vary:
+        raise ValueError("random candidates need at least one gain to vary")
+    for key in list(sweeps) + list(vary):
+        if key not in flat:
+            raise ValueError(f"unknown gain: {key}")
+
+    candidates = [{}]
+    if sweeps:
+        keys = list(sweeps)
+        for values in itertools.product(*(sweeps[k] for k in keys)):
+            candidates.append(dict(zip(keys, values)))
+
+    rng = random.Random(seed)
+    for _ in range(random_count):
+        candidate = {}
+        for key in vary:
+            value = flat[key] * math.exp(rng.uniform(-spread, spread))
+            candidate[key] = max(1, round(value)) if key.endswith(".skip") else value
+        candidates.append(candidate)
+    return candidates
+
+
+def _parse_sweep(items):
+    sweeps = {}
+    for item in items:
+        key, _, values = item.partition("=")
+        sweeps[key] = [float(v) for v in values.split(",") if v]
+    return sweeps
+
+
+def print_table(ranked, top):
+    names = list(ranked[0][2]) if ranked else []
+    header = f"{'rank':>4} {'cand':>4} {'score':>8}  " + "  ".join(f"{n[:14]:>22}" for n in names) + "  overrides"
+    print(header)
+    print(f"{'':>19}  " + "  ".join(f"{'settle/over/effort':>22}" for _ in names))
+    for rank, (index, overrides, results, total) in enumerate(ranked[:top], 1):
+        cells = []
+        for n in names:
+            m = results[n]
+            cells.append(f"{'DIVERGED':>22}" if m["diverged"] else f"{m['settle_time']:6.2f}/{m['overshoot']:6.3f}/{m['effort']:6.3f}")
+        desc = " ".join(f"{k}={v:.4g}" for k, v in overrides.items()) or "(baseline)"
+        print(f"{rank:>4} {index:>4} {total:>8.3f}  " + "  ".join(cells) + f"  {desc}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline gain sweep / tuning for the cyclic and rudder cascades")
+    parser.add_argument("--base", help="gain file to start from (default: built-in gains)")
+    parser.add_argument("--sweep", action="append", default=[], metavar="KEY=V1,V2,...", help="grid values for a gain")
+    parser.add_argument("--random", type=int, default=0, help="number of random candidates (needs --vary)")
+    parser.add_argument("--vary", default="", help="comma-separated gains perturbed by --random")
+    parser.add_argument("--spread", type=float, default=0.3, help="log-scale perturbation range for --random")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated scenario names")
+    parser.add_argument("--seeds", type=int, default=3, help="simulator seeds per scenario")
+    parser.add_argument("--replay", action="append", default=[], help="also score control effort on a capture")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--seed", type=int, default=0, help="seed for --random")
+    parser.add_argument("--top", type=int, default=20, help="rows in the ranked table")
+    parser.add_argument("--out", help="write the best gain set to this file")
+    args = parser.parse_args(argv)
+
+    base = default_gains()
+    if args.base:
+        overrides = load_gains(args.base)
+        base = {
+            "cyclic": merge_gains(base["cyclic"], overrides.get("cyclic")),
+            "rudder": merge_gains(base["rudder"], overrides.get("rudder")),
+        }
+
+    scenarios = [s for s in args.scenarios.split(",") if s]
+    for name in scenarios:
+        if name not in SCENARIOS:
+            parser.error(f"unknown scenario: {name}")
+    vary = [v for v in args.vary.split(",") if v]
+    if args.random > 0 and not vary:
+        parser.error("--random needs --vary (the gains to perturb); without it every candidate is the baseline")
+    candidates = make_candidates(base, _parse_sweep(args.sweep), args.random, vary, args.spread, args.seed)
+    jobs = [(i, c, base, scenarios, list(range(args.seeds)), args.replay) for i, c in enumerate(candidates)]
+
+    print(f"[INFO] {len(candidates)} candidates x {len(scenarios)} scenarios x {args.seeds} seeds on {args.jobs} workers")
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        results = list(pool.map(evaluate, jobs, chunksize=max(1, len(jobs) // (4 * args.jobs))))
+    elapsed = time.perf_counter() - start
+    print(f"[INFO] evaluated in {elapsed:.1f}s")
+
+    ranked = sorted(results, key=lambda r: r[3])
+    print_table(ranked, args.top)
+
+    if args.out:
+        best = ranked[0]
+        if math.isinf(best[3]):
+            print("[WARN] every candidate diverged; no gain file written")
+            sys.exit(1)
+        flat = flatten_gains(base)
+        flat.update(best[1])
+        save_gains(args.out, unflatten_gains(flat))
+        print(f"[INFO] best candidate {best[0]} -> {args.out}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])